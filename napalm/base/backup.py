@@ -0,0 +1,258 @@
+"""
+Incremental backups of the configurations of the devices.
+
+Each version of a configuration is stored as the line deltas against the previous version of the
+same device, so that a configuration changing by a few lines a day takes a few lines a day. A
+full copy is stored every ``snapshot_interval`` versions, to bound the number of deltas applied
+to rebuild a version. The copies are compressed with zlib and addressed by the SHA-1 of their
+content: devices with identical configurations share them::
+
+    >>> backup = ConfigBackup('/var/backups/napalm.sqlite')
+    >>> with device:
+    ...     backup.backup(device, stores=('running', 'startup'))
+    {'running': {'version': 12, 'sha1': '3f0b...', 'changed': True}, 'startup': {...}}
+
+The changes since a point in time are read from the deltas, without rebuilding the
+configurations::
+
+    >>> for change in backup.changes('pe01', since=time.time() - 86400):
+    ...     print(change['timestamp'], change['added'], change['removed'])
+    1539900000.0 ['ntp server 192.0.2.1\\n'] []
+"""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+import difflib
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+# local modules
+from napalm.base.cache import _connect
+
+
+DEFAULT_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "napalm", "backups.sqlite"
+)
+
+# versions stored as deltas between two full copies of a configuration
+DEFAULT_SNAPSHOT_INTERVAL = 50
+
+
+def _pack(data):
+    return zlib.compress(json.dumps(data).encode("utf-8"))
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def delta(old, new):
+    """
+    Return the operations turning the lines `old` into the lines `new`: ``["=", count]`` copying
+    lines of `old`, ``["-", lines]`` skipping them and ``["+", lines]`` inserting `lines`.
+    """
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old, new)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", i2 - i1])
+            continue
+        if i2 > i1:
+            ops.append(["-", old[i1:i2]])
+        if j2 > j1:
+            ops.append(["+", new[j1:j2]])
+    return ops
+
+
+def patch(old, ops):
+    """Return the lines of `old` changed by the operations returned by `delta`."""
+    new = []
+    position = 0
+    for op, value in ops:
+        if op == "=":
+            new.extend(old[position : position + value])
+            position += value
+        elif op == "-":
+            position += len(value)
+        else:
+            new.extend(value)
+    return new
+
+
+class ConfigBackup(object):
+    """
+    SQLite store of the versions of the configurations of the devices.
+
+    :param path (optional): Path of the database, created when missing.
+    :param snapshot_interval (optional): Number of versions of a configuration between two full
+        copies of it.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL):
+        if snapshot_interval < 1:
+            raise ValueError("snapshot_interval must be at least 1")
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._db = _connect(path)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS configs (sha1 TEXT PRIMARY KEY, config BLOB)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                "hostname TEXT, store TEXT, version INTEGER, timestamp REAL, sha1 TEXT, "
+                "snapshot INTEGER, delta BLOB, PRIMARY KEY (hostname, store, version))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS versions_timestamp "
+                "ON versions (hostname, store, timestamp)"
+            )
+
+    def _latest(self, hostname, store, until=None):
+        query = "SELECT version, timestamp, sha1 FROM versions WHERE hostname = ? AND store = ?"
+        args = [hostname, store]
+        if until is not None:
+            query += " AND timestamp <= ?"
+            args.append(until)
+        return self._db.execute(
+            query + " ORDER BY version DESC LIMIT 1", args
+        ).fetchone()
+
+    def _lines(self, hostname, store, version):
+        """Return the lines of a version, applying the deltas following the last full copy."""
+        snapshot, sha1 = self._db.execute(
+            "SELECT version, sha1 FROM versions WHERE hostname = ? AND store = ? "
+            "AND version <= ? AND snapshot = 1 ORDER BY version DESC LIMIT 1",
+            (hostname, store, version),
+        ).fetchone()
+        (config,) = self._db.execute(
+            "SELECT config FROM configs WHERE sha1 = ?", (sha1,)
+        ).fetchone()
+        lines = zlib.decompress(config).decode("utf-8").splitlines(True)
+        for (ops,) in self._db.execute(
+            "SELECT delta FROM versions WHERE hostname = ? AND store = ? "
+            "AND version > ? AND version <= ? ORDER BY version",
+            (hostname, store, snapshot, version),
+        ):
+            lines = patch(lines, _unpack(ops))
+        return lines
+
+    def save(self, hostname, config, store="running", timestamp=None):
+        """
+        Store a configuration of a device, when it changed since its last version.
+
+        :param hostname: Hostname of the device.
+        :param config: Configuration, as text.
+        :param store (optional): Type of the configuration, ``running``, ``startup`` or
+            ``candidate``.
+        :param timestamp (optional): Time the configuration was retrieved, now by default.
+
+        Returns a dictionary with the ``version`` of the configuration, its ``sha1`` and whether
+        it ``changed``.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        data = config.encode("utf-8")
+        sha1 = hashlib.sha1(data).hexdigest()
+        with self._lock, self._db:
+            latest = self._latest(hostname, store)
+            if latest is not None and latest[2] == sha1:
+                return {"version": latest[0], "sha1": sha1, "changed": False}
+            version = 1 if latest is None else latest[0] + 1
+            lines = config.splitlines(True)
+            ops = None
+            if latest is not None:
+                ops = _pack(delta(self._lines(hostname, store, latest[0]), lines))
+            snapshot = (version - 1) % self.snapshot_interval == 0
+            if snapshot:
+                self._db.execute(
+                    "INSERT OR IGNORE INTO configs VALUES (?, ?)",
+                    (sha1, zlib.compress(data)),
+                )
+            self._db.execute(
+                "INSERT INTO versions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (hostname, store, version, timestamp, sha1, snapshot, ops),
+            )
+        return {"version": version, "sha1": sha1, "changed": True}
+
+    def backup(self, device, stores=("running",), section=None):
+        """
+        Store the configurations of a device, opened, retrieving them one at a time.
+
+        :param device: Driver instance.
+        :param stores (optional): Types of the configurations to store.
+        :param section (optional): Part of the configurations to store, see `get_config`.
+
+        Returns the result of `save` for each type of configuration.
+        """
+        result = {}
+        for store in stores:
+            config = device.get_config(retrieve=store, section=section)[store]
+            result[store] = self.save(device.hostname, config, store)
+            del config
+        return result
+
+    def get(self, hostname, store="running", at=None):
+        """Return the configuration of a device at a time, the latest by default, or None."""
+        with self._lock:
+            latest = self._latest(hostname, store, at)
+            if latest is None:
+                return None
+            return "".join(self._lines(hostname, store, latest[0]))
+
+    def versions(self, hostname, store="running", since=None):
+        """Return the ``version``, ``timestamp`` and ``sha1`` of the versions of a device."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT version, timestamp, sha1 FROM versions WHERE hostname = ? "
+                "AND store = ? AND timestamp > ? ORDER BY version",
+                (hostname, store, -1 if since is None else since),
+            ).fetchall()
+        return [
+            {"version": version, "timestamp": timestamp, "sha1": sha1}
+            for version, timestamp, sha1 in rows
+        ]
+
+    def changes(self, hostname, since, store="running"):
+        """
+        Return the changes of the configuration of a device stored after `since`, a timestamp.
+
+        Each change is a dictionary with the ``version``, the ``timestamp``, and the lines
+        ``added`` and ``removed`` compared to the previous version. The lines of the first
+        version of a device are all added.
+        """
+        changes = []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT version, timestamp, delta FROM versions WHERE hostname = ? "
+                "AND store = ? AND timestamp > ? ORDER BY version",
+                (hostname, store, since),
+            ).fetchall()
+            for version, timestamp, ops in rows:
+                if ops is None:
+                    ops = [["+", self._lines(hostname, store, version)]]
+                else:
+                    ops = _unpack(ops)
+                changes.append(
+                    {
+                        "version": version,
+                        "timestamp": timestamp,
+                        "added": [
+                            line for op, lines in ops if op == "+" for line in lines
+                        ],
+                        "removed": [
+                            line for op, lines in ops if op == "-" for line in lines
+                        ],
+                    }
+                )
+        return changes
+
+    def close(self):
+        self._db.close()
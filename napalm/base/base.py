@@ -16,17 +16,41 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+# std libs
+import collections
+from contextlib import contextmanager
+import gzip
+import hashlib
+from multiprocessing.pool import ThreadPool
+import queue
+
 # local modules
 import napalm.base.exceptions
 from napalm.base.exceptions import ConnectionException
 import napalm.base.helpers
 from napalm.base import constants as c
+from napalm.base import cache
+from napalm.base import commit
+from napalm.base import parse_cache
+from napalm.base import tracing
 from napalm.base import validate
+from napalm.base.utils import py23_compat
 
+from netaddr import IPNetwork
 from netmiko import ConnectHandler, NetMikoTimeoutException
 
 
 class NetworkDriver(object):
+
+    # methods of self.device timed when tracing is enabled, see `trace`
+    _TRACED_TRANSPORT_METHODS = ()
+    # methods returning the raw output parsed by the getters, see `enable_parse_cache`
+    _PARSE_CACHE_METHODS = ()
+    # method saving the configuration at the end of `commit_config` when `_save_on_commit` is
+    # set, for the platforms where committing does not save it, see `commit_config_async`
+    _SAVE_CONFIG_METHOD = None
+    _save_on_commit = True
+
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         """
         This is the base class you have to inherit from when writing your own Network Driver to
@@ -73,12 +97,105 @@ class NetworkDriver(object):
         except Exception:
             pass
 
+    def add_trace_callback(self, callback):
+        """
+        Registers a callable receiving a timing record for every getter call.
+
+        The record contains the commands or RPCs sent to the device, the wall time and payload
+        size of each transport call and the time spent parsing the output.
+        See :mod:`napalm.base.tracing` for the format of the record.
+
+        :param callback: Callable taking the record as only argument.
+        """
+        if not getattr(self, "_trace_callbacks", None):
+            self._trace_callbacks = []
+            tracing.install(self)
+        self._trace_callbacks.append(callback)
+
+    def remove_trace_callback(self, callback):
+        """
+        Unregisters a callable previously registered using `add_trace_callback`. Does nothing
+        when the callable is not registered.
+
+        :param callback: The callable to remove.
+        """
+        callbacks = getattr(self, "_trace_callbacks", None)
+        if not callbacks or callback not in callbacks:
+            return
+        callbacks.remove(callback)
+        if not self._trace_callbacks:
+            tracing.uninstall(self)
+
+    @contextmanager
+    def trace(self, callback=None):
+        """
+        Context manager timing the getters called inside the block.
+
+        Example::
+
+            with device.trace() as tracer:
+                device.get_facts()
+                device.get_interfaces()
+            for record in tracer.records:
+                print(record['method'], record['wall_time'], record['parse_cpu_time'])
+
+        :param callback (optional): Callable invoked as well with each record.
+        :return: A :class:`napalm.base.tracing.Tracer` collecting the records.
+        """
+        tracer = tracing.Tracer(callback=callback)
+        self.add_trace_callback(tracer)
+        try:
+            yield tracer
+        finally:
+            self.remove_trace_callback(tracer)
+
+    def enable_parse_cache(self):
+        """
+        Reuses the result of a getter when the raw output of its commands did not change.
+
+        The commands of the getter are still sent to the device, but their output is parsed
+        again only when its fingerprint differs from the previous call with the same arguments.
+        See :mod:`napalm.base.parse_cache`.
+
+        :return: The :class:`napalm.base.parse_cache.ParseCache`, reporting the hits and misses.
+        """
+        if not self._PARSE_CACHE_METHODS:
+            raise NotImplementedError
+        return parse_cache.install(self)
+
+    def enable_getter_cache(self, path=cache.DEFAULT_PATH, ttls=None):
+        """
+        Serves the getters returning data that rarely changes from a persistent cache.
+
+        The results are reused until their TTL expires, or until the configuration is changed
+        using `commit_config` or `rollback`. The configuration is also retrieved again after a
+        candidate configuration is loaded or discarded. See :mod:`napalm.base.cache`.
+
+        :param path (optional): Path of the SQLite database storing the results.
+        :param ttls (optional): Dictionary mapping the names of the getters to cache to their TTL,
+            in seconds (default: ``napalm.base.cache.DEFAULT_TTLS``). The results JSON does not
+            preserve, e.g. having integer keys, are not cached.
+        :return: The :class:`napalm.base.cache.GetterCache`. When the cache is already enabled,
+            the one in use is returned, `path` and `ttls` being ignored.
+        """
+        if getattr(self, "getter_cache", None) is not None:
+            return self.getter_cache
+        return cache.install(self, cache.GetterCache(path, ttls))
+
     def _netmiko_open(self, device_type, netmiko_optional_args=None):
         """Standardized method of creating a Netmiko connection using napalm attributes."""
         if netmiko_optional_args is None:
             netmiko_optional_args = {}
+        # remembered so that additional sessions can be opened later on
+        self._netmiko_device_type = device_type
+        self._netmiko_optional_args = netmiko_optional_args
+        self._netmiko_device = self._netmiko_connect(device_type, netmiko_optional_args)
+        return self._netmiko_device
+
+    def _netmiko_connect(self, device_type, netmiko_optional_args):
+        """Open a new Netmiko session, in enable mode, using napalm attributes."""
         try:
-            self._netmiko_device = ConnectHandler(
+            netmiko_device = ConnectHandler(
                 device_type=device_type,
                 host=self.hostname,
                 username=self.username,
@@ -90,8 +207,8 @@ class NetworkDriver(object):
             raise ConnectionException("Cannot connect to {}".format(self.hostname))
 
         # ensure in enable mode
-        self._netmiko_device.enable()
-        return self._netmiko_device
+        netmiko_device.enable()
+        return netmiko_device
 
     def _netmiko_close(self):
         """Standardized method of closing a Netmiko connection."""
@@ -99,6 +216,52 @@ class NetworkDriver(object):
         self._netmiko_device = None
         self.device = None
 
+    def _netmiko_send_parallel(self, commands, workers, **send_kwargs):
+        """
+        Execute a list of commands using up to `workers` concurrent Netmiko sessions.
+
+        The current session is reused, the additional sessions are opened for the duration of
+        the call and disconnected afterwards.
+
+        :param commands: List of commands to be sent via `send_command`.
+        :param workers: Maximum number of SSH sessions used at the same time.
+        :param send_kwargs: Additional arguments passed to `send_command`.
+        :return: List with the output of each command, in the same order as `commands`.
+        """
+        workers = max(1, min(workers, len(commands)))
+        if workers == 1:
+            return [
+                self.device.send_command(command, **send_kwargs) for command in commands
+            ]
+
+        sessions = queue.Queue()
+        sessions.put(self.device)
+        extra_sessions = []
+
+        def _open_session(_):
+            session = self._netmiko_connect(
+                self._netmiko_device_type, self._netmiko_optional_args
+            )
+            extra_sessions.append(session)
+            sessions.put(session)
+
+        def _send(command):
+            session = sessions.get()
+            try:
+                return session.send_command(command, **send_kwargs)
+            finally:
+                sessions.put(session)
+
+        pool = ThreadPool(workers)
+        try:
+            pool.map(_open_session, range(workers - 1))
+            return pool.map(_send, commands)
+        finally:
+            pool.close()
+            pool.join()
+            for session in extra_sessions:
+                session.disconnect()
+
     def open(self):
         """
         Opens a connection to the device.
@@ -217,6 +380,27 @@ class NetworkDriver(object):
         """
         raise NotImplementedError
 
+    def commit_config_async(
+        self, message="", health_checks=(), rollback_unhealthy=True
+    ):
+        """
+        Commits the candidate configuration in a background thread, then verifies the device.
+
+        Returns immediately, so that several devices can be committed concurrently. Once
+        committed, the health checks are run: when one of them fails the device is rolled back,
+        otherwise the configuration is saved, on the platforms where ``commit_config`` saves it.
+        The device must not be used until the commit is done. See :mod:`napalm.base.commit`.
+
+        :param message (optional): Commit message.
+        :param health_checks (optional): Functions called with the device once committed,
+            returning whether it is healthy, e.g. using getters.
+        :param rollback_unhealthy (optional): Whether to roll back the device when a health
+            check fails.
+        :return: The :class:`napalm.base.commit.CommitHandle` of the commit, reporting its
+            status and timings.
+        """
+        return commit.CommitHandle(self, message, health_checks, rollback_unhealthy)
+
     def discard_config(self):
         """
         Discards the configuration loaded into the candidate.
@@ -986,7 +1170,7 @@ class NetworkDriver(object):
         """
         raise NotImplementedError
 
-    def get_route_to(self, destination="", protocol=""):
+    def get_route_to(self, destination="", protocol="", vrf=""):
 
         """
         Returns a dictionary of dictionaries containing details of all available routes to a
@@ -994,6 +1178,7 @@ class NetworkDriver(object):
 
         :param destination: The destination prefix to be used when filtering the routes.
         :param protocol (optional): Retrieve the routes only for a specific protocol.
+        :param vrf (optional): Routing instance, or list of routing instances, to look up.
 
         Each inner dictionary contains the following fields:
 
@@ -1058,6 +1243,66 @@ class NetworkDriver(object):
         """
         raise NotImplementedError
 
+    def iter_routes(self, destination="", protocol="", vrf=""):
+        """
+        Generator yielding the routes to a destination one at a time, e.g. to export full routing
+        tables. The drivers able to look the routing table up in chunks keep the memory bounded
+        regardless of the number of routes; by default, the routes of `get_route_to` are yielded.
+
+        :param destination (optional): The destination prefix, all the routes by default.
+        :param protocol (optional): Retrieve the routes only for a specific protocol.
+        :param vrf (optional): Routing instance, or list of routing instances, to look up.
+
+        Yields a (prefix, route) tuple per route, the route being a dictionary with the same
+        fields as the routes returned by `get_route_to`.
+
+        Example::
+
+            >>> for prefix, route in device.iter_routes(protocol="bgp"):
+            ...     print(prefix, route["next_hop"])
+            1.0.0.0/24 172.17.17.17
+            1.0.4.0/22 172.17.17.17
+        """
+        routes = self.get_route_to(destination=destination, protocol=protocol, vrf=vrf)
+        for prefix, prefix_routes in routes.items():
+            for route in prefix_routes:
+                yield prefix, route
+
+    def _iter_routes_paged(self, destination, get_page):
+        """
+        Yield the routes to `destination` looked up one chunk of the routing table at a time,
+        see `napalm.base.helpers.prefix_pages`. `get_page` takes the prefix of a chunk and
+        returns its routes in the format of `get_route_to`. A chunk timing out is split in two.
+        """
+        pages = collections.deque(napalm.base.helpers.prefix_pages(destination))
+        covering = set()
+        while pages:
+            page = pages.popleft()
+            network = IPNetwork(page)
+            try:
+                routes = get_page(page)
+            except napalm.base.exceptions.CommandTimeoutException:
+                if "/" not in page or network.size == 1:
+                    raise
+                pages.extendleft(
+                    reversed(
+                        [
+                            py23_compat.text_type(half)
+                            for half in network.cidr.subnet(network.prefixlen + 1)
+                        ]
+                    )
+                )
+                continue
+            for prefix in list(routes):
+                prefix_routes = routes.pop(prefix)
+                if IPNetwork(prefix).prefixlen < network.prefixlen:
+                    # covering route, returned with the other chunks as well
+                    if prefix in covering:
+                        continue
+                    covering.add(prefix)
+                for route in prefix_routes:
+                    yield prefix, route
+
     def get_snmp_information(self):
 
         """
@@ -1395,6 +1640,107 @@ class NetworkDriver(object):
             """
         raise NotImplementedError
 
+    def ping_many(
+        self,
+        destinations,
+        source=c.PING_SOURCE,
+        ttl=c.PING_TTL,
+        timeout=c.PING_TIMEOUT,
+        size=c.PING_SIZE,
+        count=c.PING_COUNT,
+        vrf=c.PING_VRF,
+        workers=c.PROBE_WORKERS,
+    ):
+        """
+        Executes ping towards several destinations and returns a dictionary with the results.
+
+        The default implementation calls :meth:`ping` for each destination, one after another.
+        Drivers can override this method to run the probes concurrently, when the platform
+        allows it.
+
+        :param destinations: List of hosts or IP Addresses to ping
+        :param source (optional): Source address of echo request
+        :param ttl (optional): Maximum number of hops
+        :param timeout (optional): Maximum seconds to wait after sending final packet
+        :param size (optional): Size of request (bytes)
+        :param count (optional): Number of ping request to send
+        :param vrf (optional): VRF to execute the ping from
+        :param workers (optional): Maximum number of probes executed at the same time
+
+        The keys of the output dictionary are the destinations, while the values have the same
+        structure as the dictionary returned by :meth:`ping`.
+
+        Example::
+
+            {
+                '8.8.8.8': {
+                    'success': {
+                        'probes_sent': 5,
+                        'packet_loss': 0,
+                        'rtt_min': 72.158,
+                        'rtt_max': 72.433,
+                        'rtt_avg': 72.268,
+                        'rtt_stddev': 0.094,
+                        'results': [
+                            {
+                                'ip_address': u'8.8.8.8',
+                                'rtt': 72.248
+                            }
+                        ]
+                    }
+                },
+                '8.8.8.8.8': {
+                    'error': 'unknown host 8.8.8.8.8'
+                }
+            }
+        """
+        return {
+            destination: self.ping(
+                destination,
+                source=source,
+                ttl=ttl,
+                timeout=timeout,
+                size=size,
+                count=count,
+                vrf=vrf,
+            )
+            for destination in destinations
+        }
+
+    def traceroute_many(
+        self,
+        destinations,
+        source=c.TRACEROUTE_SOURCE,
+        ttl=c.TRACEROUTE_TTL,
+        timeout=c.TRACEROUTE_TIMEOUT,
+        vrf=c.TRACEROUTE_VRF,
+        workers=c.PROBE_WORKERS,
+    ):
+        """
+        Executes traceroute towards several destinations and returns a dictionary with the
+        results.
+
+        The default implementation calls :meth:`traceroute` for each destination, one after
+        another. Drivers can override this method to run the probes concurrently, when the
+        platform allows it.
+
+        :param destinations: List of hosts or IP Addresses
+        :param source (optional): Use a specific IP Address to execute the traceroute
+        :param ttl (optional): Maimum number of hops
+        :param timeout (optional): Number of seconds to wait for response
+        :param vrf (optional): VRF to execute the traceroute from
+        :param workers (optional): Maximum number of probes executed at the same time
+
+        The keys of the output dictionary are the destinations, while the values have the same
+        structure as the dictionary returned by :meth:`traceroute`.
+        """
+        return {
+            destination: self.traceroute(
+                destination, source=source, ttl=ttl, timeout=timeout, vrf=vrf
+            )
+            for destination in destinations
+        }
+
     def get_users(self):
         """
         Returns a dictionary with the configured users.
@@ -1491,13 +1837,19 @@ class NetworkDriver(object):
         """
         raise NotImplementedError
 
-    def get_config(self, retrieve="all"):
+    def get_config(self, retrieve="all", section=None):
         """
         Return the configuration of a device.
 
         Args:
             retrieve(string): Which configuration type you want to populate, default is all of them.
                               The rest will be set to "".
+            section(string): Part of the configurations to return, the whole configurations by
+                             default. On most platforms, a regular expression matching the first
+                             line of the sections to return, e.g. "router bgp", applied by the
+                             section filter of the device where there is one (IOS, EOS, NX-OS).
+                             On Junos, the hierarchy to return instead, e.g. "protocols/bgp":
+                             a regular expression is rejected with a ValueError.
 
         Returns:
           The object returned is a dictionary with a key for each configuration store:
@@ -1512,6 +1864,77 @@ class NetworkDriver(object):
         """
         raise NotImplementedError
 
+    def write_config(self, sinks, section=None, compress=False):
+        """
+        Writes configurations of the device to file-like objects, e.g. for backups.
+
+        The configurations are retrieved with `get_config` one at a time, and written in chunks,
+        so that a single configuration is held in memory at once. A configuration identical to
+        one written before, e.g. the startup configuration identical to the running one, is not
+        written again.
+
+        Args:
+            sinks(dict): File-like objects, opened in binary mode, to write each configuration
+                         type ("running", "startup" or "candidate") to.
+            section(string): Part of the configurations to write, see `get_config`.
+            compress(bool): Whether to write the configurations compressed with gzip.
+
+        Returns:
+            A dictionary with a key for each configuration type written:
+
+            - sha1(string) - SHA-1 of the configuration, encoded as UTF-8 and not compressed
+            - size(int) - Size of the configuration, in bytes, not compressed
+            - same_as(string) - Configuration type identical to this one, whose sink contains
+              it, when not written again
+
+        Example::
+
+            >>> with open("running.gz", "wb") as running, open("startup.gz", "wb") as startup:
+            ...     device.write_config({"running": running, "startup": startup}, compress=True)
+            {
+                'running': {'sha1': '3f0b...', 'size': 31854022, 'same_as': None},
+                'startup': {'sha1': '3f0b...', 'size': 31854022, 'same_as': 'running'}
+            }
+        """
+
+        def _encoded(config):
+            for start in range(0, len(config), c.CONFIG_WRITE_CHUNK_SIZE):
+                yield config[start : start + c.CONFIG_WRITE_CHUNK_SIZE].encode("utf-8")
+
+        written = {}
+        for store in ("running", "startup", "candidate"):
+            if store not in sinks:
+                continue
+            config = self.get_config(retrieve=store, section=section)[store]
+            digest = hashlib.sha1()
+            size = 0
+            for chunk in _encoded(config):
+                digest.update(chunk)
+                size += len(chunk)
+            result = written[store] = {
+                "sha1": digest.hexdigest(),
+                "size": size,
+                "same_as": None,
+            }
+            for other, other_result in written.items():
+                if other != store and other_result["sha1"] == result["sha1"]:
+                    result["same_as"] = other_result["same_as"] or other
+                    break
+            if result["same_as"] is None:
+                sink = sinks[store]
+                if compress:
+                    # no timestamp, so that identical configurations compress identically
+                    sink = gzip.GzipFile(fileobj=sink, mode="wb", mtime=0)
+                try:
+                    for chunk in _encoded(config):
+                        sink.write(chunk)
+                finally:
+                    if compress:
+                        sink.close()
+            # release the configuration before retrieving the next one
+            del config
+        return written
+
     def get_network_instances(self, name=""):
         """
         Return a dictionary of network instances (VRFs) configured, including default/global
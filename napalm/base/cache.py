@@ -0,0 +1,265 @@
+"""
+Persistent cache of the results of the getters returning data that rarely changes.
+
+The results are stored in a SQLite database, keyed by the hostname, the platform of the driver,
+the name of the getter and its arguments, so that the processes polling the same devices share
+them. Each getter has its own time to live::
+
+    >>> device.enable_getter_cache('/var/cache/napalm.sqlite', ttls={'get_facts': 86400})
+    >>> device.get_facts()  # retrieved from the device
+    >>> device.get_facts()  # retrieved from the cache, until it expires
+
+Only the getters having a TTL are cached, ``DEFAULT_TTLS`` by default. The results of the
+device are discarded after each call of ``commit_config`` and ``rollback``, its configuration
+after each candidate configuration loaded or discarded.
+
+The same database records the MD5 of the last file uploaded to each destination of the
+devices, see ``UploadCache``.
+"""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "napalm", "getters.sqlite"
+)
+
+# seconds during which the result of each getter is reused
+DEFAULT_TTLS = {
+    "get_config": 3600,
+    "get_facts": 3600,
+    "get_network_instances": 3600,
+    "get_optics": 3600,
+    "get_snmp_information": 3600,
+    "get_users": 3600,
+}
+
+# methods changing the configuration, mapped to the getter whose cached results of the device
+# they invalidate, None for all of them
+INVALIDATING_METHODS = {
+    "commit_config": None,
+    "rollback": None,
+    "load_merge_candidate": "get_config",
+    "load_replace_candidate": "get_config",
+    "discard_config": "get_config",
+}
+
+
+def _connect(path):
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    return sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+
+class GetterCache(object):
+    """
+    SQLite store of the results of the getters.
+
+    :param path (optional): Path of the database, created when missing.
+    :param ttls (optional): Dictionary mapping the names of the getters to cache to their TTL,
+        in seconds. The results are stored as JSON: the results that JSON does not preserve,
+        e.g. having integer keys or tuples, are not cached.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttls=None):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = _connect(path)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS getters ("
+                "hostname TEXT, driver TEXT, getter TEXT, arguments TEXT, expires REAL, "
+                "result TEXT, PRIMARY KEY (hostname, driver, getter, arguments))"
+            )
+
+    @staticmethod
+    def _arguments(args, kwargs):
+        return json.dumps([args, kwargs], sort_keys=True, default=repr)
+
+    def get(self, hostname, driver, getter, args=(), kwargs=None):
+        """Return the cached result of a getter, None when missing or expired."""
+        key = (hostname, driver, getter, self._arguments(args, kwargs or {}))
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires, result FROM getters WHERE hostname = ? AND driver = ? "
+                "AND getter = ? AND arguments = ?",
+                key,
+            ).fetchone()
+            if row is None or row[0] < time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[1])
+
+    def set(self, hostname, driver, getter, result, args=(), kwargs=None):
+        """
+        Store the result of a getter, for the TTL of the getter. Return whether it was stored,
+        i.e. whether the result is identical once loaded from JSON.
+        """
+        try:
+            serialized = json.dumps(result)
+        except (TypeError, ValueError):
+            return False
+        if json.loads(serialized) != result:
+            return False
+        expires = time.time() + self.ttls.get(getter, 0)
+        key = (hostname, driver, getter, self._arguments(args, kwargs or {}))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO getters VALUES (?, ?, ?, ?, ?, ?)",
+                key + (expires, serialized),
+            )
+        return True
+
+    def invalidate(self, hostname=None, driver=None, getter=None):
+        """Discard the cached results matching all the criteria given, all of them by default."""
+        criteria = [
+            (column, value)
+            for column, value in (
+                ("hostname", hostname),
+                ("driver", driver),
+                ("getter", getter),
+            )
+            if value is not None
+        ]
+        query = "DELETE FROM getters"
+        if criteria:
+            query += " WHERE " + " AND ".join(
+                "{} = ?".format(column) for column, _ in criteria
+            )
+        with self._lock, self._db:
+            self._db.execute(query, [value for _, value in criteria])
+
+    def purge(self):
+        """Discard the expired results."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM getters WHERE expires < ?", (time.time(),))
+
+    def close(self):
+        self._db.close()
+
+
+class UploadCache(object):
+    """
+    SQLite record of the MD5 of the last file uploaded to each destination of the devices.
+
+    The drivers transferring the candidate configuration as a file skip the upload, and the
+    checks of the remote file, when the same content was uploaded last to the same destination.
+    The record of a destination is discarded when the driver overwrites or deletes the file,
+    but not when it is changed by anything else: do not enable it on devices whose files are
+    changed by other means.
+
+    :param path (optional): Path of the database, created when missing.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = _connect(path)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "hostname TEXT, file_system TEXT, filename TEXT, md5 TEXT, "
+                "PRIMARY KEY (hostname, file_system, filename))"
+            )
+
+    def get(self, hostname, file_system, filename):
+        """Return the MD5 of the last file uploaded to the destination, None if unknown."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT md5 FROM uploads WHERE hostname = ? AND file_system = ? "
+                "AND filename = ?",
+                (hostname, file_system, filename),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, hostname, file_system, filename, md5):
+        """Record the MD5 of the file uploaded to the destination."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?)",
+                (hostname, file_system, filename, md5),
+            )
+
+    def invalidate(self, hostname, file_system, filename):
+        """Forget the file uploaded to the destination."""
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM uploads WHERE hostname = ? AND file_system = ? "
+                "AND filename = ?",
+                (hostname, file_system, filename),
+            )
+
+    def close(self):
+        self._db.close()
+
+    @classmethod
+    def from_optional_arg(cls, value):
+        """
+        Return the cache selected by the ``upload_cache`` optional argument: the path of the
+        database, or True for the default one. None when disabled.
+        """
+        if not value:
+            return None
+        return cls() if value is True else cls(value)
+
+
+def _platform(driver):
+    return getattr(driver, "platform", driver.__class__.__name__)
+
+
+def _cached_getter(driver, name, method):
+    cache = driver.getter_cache
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        result = cache.get(driver.hostname, _platform(driver), name, args, kwargs)
+        if result is None:
+            result = method(*args, **kwargs)
+            cache.set(driver.hostname, _platform(driver), name, result, args, kwargs)
+        return result
+
+    return wrapper
+
+
+def _invalidating(driver, method, getter=None):
+    cache = driver.getter_cache
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        finally:
+            # even on failure, the configuration may have been partially changed
+            cache.invalidate(
+                hostname=driver.hostname, driver=_platform(driver), getter=getter
+            )
+
+    return wrapper
+
+
+def install(driver, cache):
+    """Serve the getters of the driver having a TTL in `cache` from it."""
+    if getattr(driver, "getter_cache", None) is not None:
+        return driver.getter_cache
+    driver.getter_cache = cache
+    for name in cache.ttls:
+        if callable(getattr(driver.__class__, name, None)):
+            setattr(driver, name, _cached_getter(driver, name, getattr(driver, name)))
+    for name, getter in INVALIDATING_METHODS.items():
+        setattr(driver, name, _invalidating(driver, getattr(driver, name), getter))
+    return cache
@@ -4,15 +4,22 @@ from __future__ import unicode_literals
 
 # import helpers
 from napalm.base import get_network_driver
+from napalm.base import rollout
+from napalm.base import tracing
 from napalm.base.clitools import helpers
 
 # stdlib
+import sys
 import json
+import pstats
+import cProfile
 import logging
 import argparse
 import getpass
 import pkg_resources
+from functools import partial
 from functools import wraps
+from multiprocessing.pool import ThreadPool
 
 
 def debugging(name):
@@ -40,7 +47,9 @@ def debugging(name):
                     logger.debug("{} - Not implemented".format(name))
             except Exception as e:
                 logger.error("{} - Failed: {}".format(name, e))
-                print("\n================= Traceback =================\n")
+                print(
+                    "\n================= Traceback =================\n", file=sys.stderr
+                )
                 raise
 
         return wrapper
@@ -60,7 +69,8 @@ def build_help():
     parser.add_argument(
         dest="hostname",
         action="store",
-        help="Host where you want to deploy the configuration.",
+        help="Host where you want to deploy the configuration. Several hosts can be given "
+        "as a comma separated list or as the path to an inventory file (.yml, .yaml or .csv).",
     )
     parser.add_argument(
         "--user",
@@ -84,7 +94,7 @@ def build_help():
         dest="vendor",
         action="store",
         required=True,
-        help="Host Operating System.",
+        help="Host Operating System. Hosts in an inventory file can override it.",
     )
     parser.add_argument(
         "--optional_args",
@@ -99,6 +109,42 @@ def build_help():
         action="store_true",
         help="Enables debug mode; more verbosity.",
     )
+    parser.add_argument(
+        "--timings",
+        dest="timings",
+        action="store_true",
+        help="Print to stderr the connection setup time and, for each method called, "
+        "the round-trip time of every command sent to the device and the parse time.",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store",
+        metavar="FILE",
+        help="Profile the action with cProfile and save the stats in FILE. The stats "
+        "can be loaded with pstats or converted into a flamegraph (e.g. flameprof).",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        dest="workers",
+        action="store",
+        type=int,
+        default=10,
+        help="Number of hosts handled concurrently when several hosts are given. Default: 10.",
+    )
+    parser.add_argument(
+        "--format",
+        "-f",
+        dest="format",
+        action="store",
+        choices=helpers.OUTPUT_FORMATS,
+        default=None,
+        help="Output format of the results: indented JSON, JSON Lines (one line per item of "
+        "the result, printed as they are encoded), single line JSON or MessagePack. "
+        "With several hosts, there is one document per host, on one line with jsonl and "
+        "compact. Default: json, compact with several hosts.",
+    )
     subparser = parser.add_subparsers(title="actions")
 
     config = subparser.add_parser("configure", help="Perform a configuration operation")
@@ -146,7 +192,26 @@ def build_help():
     )
     args = parser.parse_args()
 
-    if args.password is None:
+    try:
+        args.hosts = helpers.parse_hosts(args.hostname)
+    except (IOError, OSError, ValueError) as e:
+        parser.error("could not read the hosts from {}: {}".format(args.hostname, e))
+    if not args.hosts:
+        parser.error("no host given")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if is_multi_host(args) and args.profile:
+        parser.error("--profile is only supported for a single host")
+    if args.format is None:
+        # one line per host, unless a single report is printed
+        multi_line = is_multi_host(args) and not (
+            getattr(args, "which", None) == "config" and args.dry_run
+        )
+        args.format = "compact" if multi_line else "json"
+    if args.format == "msgpack" and helpers.msgpack is None:
+        parser.error("the msgpack format requires the msgpack package")
+
+    if args.password is None and not all("password" in h for h in args.hosts):
         password = getpass.getpass("Enter password: ")
         setattr(args, "password", password)
 
@@ -222,7 +287,6 @@ def call_load_merge_candidate(device, *args, **kwargs):
 def call_compare_config(device, *args, **kwargs):
     diff = device.compare_config(*args, **kwargs)
     logger.debug("Gathered diff:")
-    print(diff)
     return diff
 
 
@@ -231,7 +295,12 @@ def call_commit_config(device, *args, **kwargs):
     return device.commit_config(*args, **kwargs)
 
 
-def configuration_change(device, config_file, strategy, dry_run):
+@debugging("discard_config")
+def call_discard_config(device):
+    return device.discard_config()
+
+
+def configuration_change(device, config_file, strategy, dry_run, print_diff=True):
     if strategy == "replace":
         strategy_method = call_load_replace_candidate
     elif strategy == "merge":
@@ -240,8 +309,12 @@ def configuration_change(device, config_file, strategy, dry_run):
     strategy_method(device, filename=config_file)
 
     diff = call_compare_config(device)
+    if print_diff:
+        print(diff)
 
-    if not dry_run:
+    if dry_run:
+        call_discard_config(device)
+    else:
         call_commit_config(device)
     return diff
 
@@ -255,14 +328,158 @@ def call_getter(device, method, **kwargs):
     )
     r = func(**kwargs)
     logger.debug("{} - Response".format(method))
-    print(json.dumps(r, indent=4))
+    return r
 
 
 @debugging("compliance_report")
 def call_compliance_report(device, validation_file):
-    result = device.compliance_report(validation_file)
-    print(json.dumps(result, indent=4))
-    return result
+    return device.compliance_report(validation_file)
+
+
+@debugging("add_trace_callback")
+def call_enable_tracing(device):
+    tracer = tracing.Tracer()
+    device.add_trace_callback(tracer)
+    return tracer
+
+
+def print_timings(tracer):
+    """Print to stderr a report of the records collected by the tracer."""
+    for record in tracer.records:
+        print(
+            "{:<30} {:9.3f}s  transport {:9.3f}s  parse {:9.3f}s (cpu {:.3f}s)  "
+            "{} bytes".format(
+                record["method"] or "-",
+                record["wall_time"],
+                record["transport_time"],
+                record["parse_time"],
+                record["parse_cpu_time"],
+                record["payload_size"],
+            ),
+            file=sys.stderr,
+        )
+        for call in record["calls"]:
+            print(
+                "    {:9.3f}s  {:>10} bytes  {}: {}".format(
+                    call["wall_time"],
+                    call["payload_size"],
+                    call["method"],
+                    call["command"],
+                ),
+                file=sys.stderr,
+            )
+
+
+def print_profile(profiler, profile_file):
+    """Save the cProfile stats and print to stderr the most expensive functions."""
+    profiler.dump_stats(profile_file)
+    stats = pstats.Stats(profiler, stream=sys.stderr)
+    stats.sort_stats("cumulative").print_stats(20)
+
+
+def is_multi_host(args):
+    """Whether the hostname argument selects more than one host (or an inventory file)."""
+    return len(args.hosts) != 1 or args.hosts[0]["hostname"] != args.hostname
+
+
+def run_action(device, args, print_diff=True):
+    """Run the action selected on the command line and return its result."""
+    if args.which == "call":
+        method_kwargs = helpers.parse_optional_args(args.method_kwargs)
+        return call_getter(device, args.method, **method_kwargs)
+    elif args.which == "config":
+        return configuration_change(
+            device, args.config_file, args.strategy, args.dry_run, print_diff=print_diff
+        )
+    elif args.which == "validate":
+        return call_compliance_report(device, args.validation_file)
+
+
+def instantiate_host(args, host):
+    """Return the driver instance of one of the hosts given on the command line."""
+    driver = call_get_network_driver(host.get("vendor", args.vendor))
+    optional_args = host.get("optional_args")
+    if optional_args is None:
+        optional_args = helpers.parse_optional_args(args.optional_args)
+    return call_instantiating_object(
+        driver,
+        host["hostname"],
+        host.get("username", args.user),
+        password=host.get("password", args.password),
+        timeout=60,
+        optional_args=optional_args,
+    )
+
+
+def run_host(args, host):
+    """
+    Run the action against one of the hosts given on the command line.
+
+    Never raises: the error, if any, is reported in the returned dictionary.
+    """
+    output = {"hostname": host["hostname"], "result": None, "error": None}
+    try:
+        device = instantiate_host(args, host)
+        tracer = None
+        if args.timings:
+            tracer = call_enable_tracing(device)
+        call_open_device(device)
+        try:
+            output["result"] = run_action(device, args, print_diff=False)
+        finally:
+            call_close(device)
+        if tracer is not None:
+            output["timings"] = tracer.summary()
+    except Exception as e:
+        output["error"] = "{}: {}".format(e.__class__.__name__, e)
+    return output
+
+
+def run_inventory(args):
+    """
+    Run the action against all the hosts, `args.workers` at a time, and print one document
+    per host, in the format `args.format`, as soon as its result is available. With ``jsonl``
+    the document of each host is a single line, as with ``compact``.
+
+    Returns the number of hosts that failed.
+    """
+    # the lines are hosts, not the items of their results
+    fmt = "compact" if args.format == "jsonl" else args.format
+    failed = 0
+    pool = ThreadPool(min(args.workers, len(args.hosts)))
+    try:
+        for output in pool.imap_unordered(partial(run_host, args), args.hosts):
+            if output["error"] is not None:
+                failed += 1
+            helpers.write_result(output, fmt)
+    finally:
+        pool.close()
+        pool.join()
+    return failed
+
+
+def run_dry_run(args):
+    """
+    Compare the configuration on all the hosts, `args.workers` at a time, and print the report
+    of the distinct diffs, each with the hosts having it, and of the errors.
+
+    Returns the number of hosts that failed.
+    """
+    with open(args.config_file) as stream:
+        config = stream.read()
+    devices = []
+    errors = {}
+    for host in args.hosts:
+        try:
+            devices.append(instantiate_host(args, host))
+        except Exception as e:
+            errors[host["hostname"]] = "{}: {}".format(e.__class__.__name__, e)
+    report = rollout.dry_run(
+        devices, config, strategy=args.strategy, max_in_flight=args.workers
+    )
+    report["errors"].update(errors)
+    helpers.write_result(report, args.format)
+    return len(report["errors"])
 
 
 def run_tests(args):
@@ -281,28 +498,49 @@ def run_tests(args):
     if args.debug:
         call_pre_connection(device)
 
+    tracer = None
+    if args.timings:
+        tracer = call_enable_tracing(device)
+
     call_open_device(device)
 
     if args.debug:
         call_connection(device)
         call_facts(device)
 
-    if args.which == "call":
-        method_kwargs = helpers.parse_optional_args(args.method_kwargs)
-        call_getter(device, args.method, **method_kwargs)
-    elif args.which == "config":
-        configuration_change(device, args.config_file, args.strategy, args.dry_run)
-    elif args.which == "validate":
-        call_compliance_report(device, args.validation_file)
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    result = run_action(device, args)
+    if args.which in ("call", "validate"):
+        helpers.write_result(result, args.format)
+
+    if profiler is not None:
+        profiler.disable()
 
     call_close(device)
 
     if args.debug:
         call_post_connection(device)
 
+    if tracer is not None:
+        print_timings(tracer)
+    if profiler is not None:
+        print_profile(profiler, args.profile)
+
 
 def main():
     args = build_help()
+    if is_multi_host(args):
+        # stdout is reserved to the JSON Lines
+        helpers.configure_logging(logger, debug=args.debug, stream=sys.stderr)
+        logger.debug("Starting napalm's debugging tool")
+        check_installed_packages()
+        if args.which == "config" and args.dry_run:
+            sys.exit(1 if run_dry_run(args) else 0)
+        sys.exit(1 if run_inventory(args) else 0)
     helpers.configure_logging(logger, debug=args.debug)
     logger.debug("Starting napalm's debugging tool")
     check_installed_packages()
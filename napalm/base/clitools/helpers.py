@@ -11,12 +11,33 @@ from __future__ import unicode_literals
 
 # stdlib
 import ast
+import csv
+import io
+import json
+import os
 import sys
 import logging
 import getpass
 import argparse
 import warnings
 
+# third party libs
+import yaml
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+INVENTORY_EXTENSIONS = (".yml", ".yaml", ".csv")
+INVENTORY_FIELDS = ("hostname", "vendor", "username", "password", "optional_args")
+OUTPUT_FORMATS = ("json", "jsonl", "compact", "msgpack")
+
 
 def warning():
     warnings.simplefilter("always", DeprecationWarning)
@@ -115,13 +136,13 @@ def build_help(connect_test=False, validate=False, configure=False, napalm_cli=F
     return args
 
 
-def configure_logging(logger, debug):
+def configure_logging(logger, debug, stream=None):
     if debug:
         logger.setLevel(logging.DEBUG)
     else:
         logger.setLevel(logging.INFO)
 
-    ch = logging.StreamHandler(sys.stdout)
+    ch = logging.StreamHandler(stream or sys.stdout)
     formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
@@ -137,3 +158,121 @@ def parse_optional_args(optional_args):
             for x in optional_args.split(",")
         }
     return {}
+
+
+def _inventory_host(entry):
+    if not isinstance(entry, dict):
+        return {"hostname": "{}".format(entry)}
+    # the empty fields fall back to the defaults of the command line
+    host = {k: v for k, v in entry.items() if v not in (None, "")}
+    unknown = set(host) - set(INVENTORY_FIELDS)
+    if unknown:
+        raise ValueError(
+            "Unknown inventory field(s) {}, expected: {}".format(
+                ", ".join(sorted(unknown)), ", ".join(INVENTORY_FIELDS)
+            )
+        )
+    if not host.get("hostname"):
+        raise ValueError("Inventory entry without hostname: {}".format(entry))
+    if not isinstance(host.get("optional_args", {}), dict):
+        host["optional_args"] = parse_optional_args(host["optional_args"])
+    return host
+
+
+def load_inventory(path):
+    """
+    Read the hosts from a YAML or CSV inventory file.
+
+    The YAML file contains either a list of hosts or a mapping from hostname to host parameters.
+    The CSV file has a header row with a ``hostname`` column. Besides the hostname, each host
+    can override ``vendor``, ``username``, ``password`` and ``optional_args`` (a mapping in YAML,
+    the same format as ``--optional_args`` in CSV).
+
+    Returns a list of dictionaries, one per host, having at least the ``hostname`` key.
+    """
+    if path.endswith(".csv"):
+        with io.open(path, newline="") as stream:
+            entries = [
+                # the fields missing from short rows are None
+                {k.strip(): (v or "").strip() for k, v in row.items() if k}
+                for row in csv.DictReader(stream)
+            ]
+    else:
+        with io.open(path) as stream:
+            entries = yaml.safe_load(stream) or []
+        if isinstance(entries, dict):
+            entries = [
+                dict(params or {}, hostname=hostname)
+                for hostname, params in entries.items()
+            ]
+    return [_inventory_host(entry) for entry in entries]
+
+
+def parse_hosts(hostname):
+    """
+    Return the list of hosts selected on the command line.
+
+    `hostname` is a single host, a comma separated list of hosts or the path to an inventory
+    file (see `load_inventory`).
+    """
+    if hostname.lower().endswith(INVENTORY_EXTENSIONS) and os.path.isfile(hostname):
+        return load_inventory(hostname)
+    return [{"hostname": h.strip()} for h in hostname.split(",") if h.strip()]
+
+
+def json_dumps(obj, pretty=False):
+    """
+    Serialize `obj` to a JSON string, on a single line unless `pretty` is set.
+
+    The compact encoding uses orjson when it is installed, being much faster than the standard
+    library on the large outputs of getters such as get_route_to or get_mac_address_table.
+    """
+    if pretty:
+        return json.dumps(obj, indent=4, default=str)
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj, default=str, option=orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
+        except TypeError:
+            # e.g. integers too large for orjson
+            pass
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+def _records(result):
+    """Split a result into records: the items of a list, the entries of a dictionary."""
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict):
+        return ({key: value} for key, value in result.items())
+    return [result]
+
+
+def write_result(result, fmt="json", stream=None):
+    """
+    Write `result` to `stream` (stdout by default) in the format `fmt`:
+
+    * ``json``: indented JSON document.
+    * ``compact``: JSON document on a single line.
+    * ``jsonl``: JSON Lines, one line per item of a list or per key of a dictionary, written as
+      they are encoded so that the consumer can start working before the end of the output.
+    * ``msgpack``: MessagePack document (requires the msgpack package).
+    """
+    stream = stream or sys.stdout
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("The msgpack format requires the msgpack package")
+        # binary output, bypassing the text layer on Python 3
+        stream.flush()
+        getattr(stream, "buffer", stream).write(
+            msgpack.packb(result, use_bin_type=True, default=str)
+        )
+    elif fmt == "jsonl":
+        for record in _records(result):
+            stream.write(json_dumps(record))
+            stream.write("\n")
+    else:
+        stream.write(json_dumps(result, pretty=fmt == "json"))
+        stream.write("\n")
+    stream.flush()
@@ -0,0 +1,148 @@
+"""
+Commits running in the background, followed by the verification of the device.
+
+``commit_config_async`` returns a :class:`CommitHandle` immediately, the commit running in a
+thread, so that many devices can be committed concurrently::
+
+    >>> handles = [device.commit_config_async(health_checks=[bgp_up]) for device in devices]
+    >>> for handle in handles:
+    ...     print(handle.device.hostname, handle.result(), handle.timings)
+    pe01 committed {'commit': 2.1, 'checks': 0.4, 'save': 14.8}
+    pe02 rolled_back {'commit': 2.3, 'checks': 0.5, 'rollback': 3.2}
+
+After the commit, the health checks (functions receiving the device and returning whether it is
+healthy) are run. When a check fails, the device is rolled back. Otherwise the configuration is
+saved: for the drivers whose ``commit_config`` saves the configuration (``write memory``), the
+save is deferred until the checks passed, so that an unhealthy configuration never reaches the
+startup configuration.
+
+The device must not be used by the caller until the commit is done. The commit runs in a
+non-daemon thread: the interpreter waits for it, rather than exiting in the middle of saving or
+rolling back the configuration.
+"""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+import threading
+import time
+
+
+# statuses of the commits that failed, raising their error from `CommitHandle.result`
+FAILED_STATUSES = ("failed", "save_failed", "rollback_failed")
+
+
+class CommitHandle(object):
+    """
+    Commit of the candidate configuration of a device, running in a background thread.
+
+    :param device: Driver instance, opened, with a candidate configuration loaded.
+    :param message (optional): Commit message.
+    :param health_checks (optional): Functions called with the device once committed, returning
+        whether it is healthy. Raising an exception counts as unhealthy.
+    :param rollback_unhealthy (optional): Whether to roll back the device when a check fails.
+        Otherwise the device is left unhealthy, with the configuration not saved.
+
+    Attributes:
+        * status (str) - ``running``, then ``committed``, ``unhealthy``, ``rolled_back``,
+          ``failed`` (the commit failed), ``save_failed`` (committed, but the configuration was
+          not saved) or ``rollback_failed``.
+        * timings (dict) - Duration, in seconds, of each phase completed: ``commit``,
+          ``checks``, ``save`` and ``rollback``.
+        * error (Exception) - Exception raised by the commit, the save or the rollback, if any.
+    """
+
+    def __init__(self, device, message="", health_checks=(), rollback_unhealthy=True):
+        self.device = device
+        self.message = message
+        self.health_checks = list(health_checks)
+        self.rollback_unhealthy = rollback_unhealthy
+        self.status = "running"
+        self.timings = {}
+        self.error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.start()
+
+    def _phase(self, name, func, *args):
+        start = time.time()
+        try:
+            return func(*args)
+        finally:
+            self.timings[name] = time.time() - start
+
+    def _healthy(self):
+        for check in self.health_checks:
+            try:
+                if not check(self.device):
+                    return False
+            except Exception:
+                return False
+        return True
+
+    def _run(self):
+        device = self.device
+        save = device._SAVE_CONFIG_METHOD
+        try:
+            if save is not None:
+                # saved once verified
+                device._save_on_commit = False
+            try:
+                self._phase("commit", device.commit_config, self.message)
+            finally:
+                device._save_on_commit = True
+            self.status = "committed"
+            if not self._phase("checks", self._healthy):
+                self.status = "unhealthy"
+                if self.rollback_unhealthy:
+                    self._rollback()
+            elif save is not None:
+                try:
+                    self._phase("save", getattr(device, save))
+                except Exception:
+                    self.status = "save_failed"
+                    raise
+        except Exception as e:
+            if self.status == "running":
+                self.status = "failed"
+            self.error = e
+        finally:
+            self._done.set()
+
+    def _rollback(self):
+        try:
+            self._phase("rollback", self.device.rollback)
+        except Exception:
+            self.status = "rollback_failed"
+            raise
+        self.status = "rolled_back"
+
+    def done(self):
+        """Return whether the commit, the checks and the save or the rollback are finished."""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wait until the commit is done, at most `timeout` seconds. Return whether it is."""
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        """
+        Wait until the commit is done and return its status.
+
+        Raises the exception of the commit, of the save or of the rollback, if one of them
+        failed.
+        """
+        if not self._done.wait(timeout):
+            raise RuntimeError("The commit is still running")
+        if self.status in FAILED_STATUSES:
+            raise self.error
+        return self.status
+
+    def rollback(self):
+        """Wait until the commit is done and roll the device back."""
+        self._done.wait()
+        if self.status == "rolled_back":
+            return
+        self._rollback()
@@ -0,0 +1,166 @@
+"""
+Hierarchical model of the indentation based configurations, e.g. of IOS, NX-OS or EOS.
+
+Each line is a node of the tree, its children are the lines indented below it::
+
+    >>> tree = ConfigTree.parse('interface Ethernet1\n  description uplink\n  shutdown\n')
+    >>> list(tree.children)
+    [u'interface Ethernet1']
+    >>> list(tree.children['interface Ethernet1'].children)
+    [u'description uplink', u'shutdown']
+
+The children are indexed by their text, without the indentation: a line is looked up among the
+children of its section in constant time, so that comparing configurations is linear in their
+size. This allows to compute the diffs offline, from the running config retrieved once::
+
+    >>> running = ConfigTree.parse(device.get_config(retrieve='running')['running'])
+    >>> print('\n'.join(running.replace_diff(ConfigTree.parse(candidate))))
+    interface Ethernet1
+      +description uplink
+    interface Ethernet1
+      -shutdown
+
+The diffs follow the format of ``show archive config differences`` of IOS: the lines to add,
+prefixed by ``+``, then the lines to remove, prefixed by ``-``, each preceded by the lines of
+the sections containing them. The lines to add are in the order of the candidate config, the
+lines to remove in the order of the running config.
+"""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+import re
+from collections import OrderedDict
+
+
+# first line of a banner: its delimiter ends it, on the same line or on a following one.
+# EOS banners are not delimited, they end with a line containing only "EOF"
+BANNER_RE = re.compile(r"^banner\s+\S+(?:\s+(?P<delimiter>\^C|\S))?")
+
+
+class ConfigTree(object):
+    """Section of a configuration: the lines it contains, each of them a section itself."""
+
+    # indentation of the children of a section, in the rendered diffs, e.g. " " for IOS
+    INDENT = "  "
+
+    __slots__ = ("children",)
+
+    def __init__(self):
+        self.children = OrderedDict()
+
+    def __len__(self):
+        return len(self.children)
+
+    @classmethod
+    def parse(cls, config, comments="!", ignore=None):
+        """
+        Return the tree of a configuration.
+
+        :param config: Configuration, as text.
+        :param comments (optional): Characters starting the lines to ignore.
+        :param ignore (optional): Regular expression matching the beginning of the other lines
+            to ignore, e.g. ``r'Building configuration'``.
+        """
+        ignore = re.compile(ignore) if ignore else None
+        root = cls()
+        # (indentation, section) of the current line and of its parents
+        stack = [(-1, root)]
+        lines = iter(config.splitlines())
+        for line in lines:
+            text = line.strip()
+            if not text or text[0] in comments or (ignore and ignore.match(text)):
+                continue
+            if text.startswith("banner "):
+                text = cls._banner(text, lines)
+            indent = len(line) - len(line.lstrip())
+            while stack[-1][0] >= indent:
+                stack.pop()
+            children = stack[-1][1].children
+            section = children.get(text)
+            if section is None:
+                section = children[text] = cls()
+            stack.append((indent, section))
+        return root
+
+    @staticmethod
+    def _banner(first_line, lines):
+        """Return the whole banner as a single line, consuming its lines."""
+        match = BANNER_RE.match(first_line)
+        delimiter = match.group("delimiter") if match else None
+        banner = [first_line]
+        if delimiter is not None:
+            end = first_line[match.end() :]
+            if delimiter in end:
+                return first_line
+        for line in lines:
+            banner.append(line.rstrip())
+            if (delimiter is None and line.strip() == "EOF") or (
+                delimiter is not None and delimiter in line
+            ):
+                break
+        return "\n".join(banner)
+
+    def lines(self, depth=0, marker=""):
+        """
+        Yield the lines of the configuration, indented by `INDENT` per level.
+
+        :param marker (optional): Prefix of each line, after its indentation.
+        """
+        for text, section in self.children.items():
+            yield self.INDENT * depth + marker + text
+            for line in section.lines(depth + 1, marker):
+                yield line
+
+    def merge_diff(self, candidate, depth=0, marker=""):
+        """
+        Return the lines of `candidate` missing in this tree, preceded by the lines of the
+        sections containing them.
+
+        :param candidate: :class:`ConfigTree` to merge into this one.
+        :param marker (optional): Prefix of the missing lines, after their indentation.
+        """
+        diff = []
+        for text, section in candidate.children.items():
+            existing = self.children.get(text)
+            if existing is None:
+                diff.append(self.INDENT * depth + marker + text)
+                diff.extend(section.lines(depth + 1, marker))
+                continue
+            missing = existing.merge_diff(section, depth + 1, marker)
+            if missing:
+                diff.append(self.INDENT * depth + text)
+                diff.extend(missing)
+        return diff
+
+    def replace_diff(self, candidate):
+        """Return the lines to add and to remove to replace this configuration by `candidate`."""
+        return self.merge_diff(candidate, marker="+") + candidate.merge_diff(
+            self, marker="-"
+        )
+
+    def merge_changes(self, candidate, depth=0):
+        """
+        Return the lines added and removed by merging `candidate` into this configuration, the
+        lines of `candidate` starting with ``no`` removing the lines they negate.
+        """
+        diff = []
+        for text, section in candidate.children.items():
+            existing = self.children.get(text)
+            if existing is not None:
+                changes = existing.merge_changes(section, depth + 1)
+                if changes:
+                    diff.append(self.INDENT * depth + text)
+                    diff.extend(changes)
+                continue
+            if text.startswith("no "):
+                negated = self.children.get(text[3:].lstrip())
+                if negated is not None:
+                    diff.append(self.INDENT * depth + "-" + text[3:].lstrip())
+                    diff.extend(negated.lines(depth + 1, "-"))
+                continue
+            diff.append(self.INDENT * depth + "+" + text)
+            diff.extend(section.lines(depth + 1, "+"))
+        return diff
@@ -60,6 +60,14 @@ PING_SIZE = 100
 PING_COUNT = 5
 PING_VRF = ""
 
+PROBE_WORKERS = 4  # max concurrent probes for ping_many/traceroute_many
+
+# prefix length, per IP version, of the chunks of the routing table looked up by iter_routes
+ROUTE_PAGE_PREFIX_LENGTH = {4: 8, 6: 10}
+
+# characters of configuration encoded and written at a time by write_config
+CONFIG_WRITE_CHUNK_SIZE = 1024 * 1024
+
 NETMIKO_MAP = {
     "ios": "cisco_ios",
     "nxos": "cisco_nxos",
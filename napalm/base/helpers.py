@@ -6,6 +6,7 @@ from __future__ import unicode_literals
 
 # std libs
 import os
+import re
 import sys
 import itertools
 
@@ -15,6 +16,7 @@ import textfsm
 from netaddr import EUI
 from netaddr import mac_unix
 from netaddr import IPAddress
+from netaddr import IPNetwork
 
 # local modules
 import napalm.base.exceptions
@@ -270,6 +272,111 @@ def ip(addr, version=None):
     return py23_compat.text_type(addr_obj)
 
 
+def prefix_pages(destination, prefix_lengths=None):
+    """
+    Split a destination prefix into the chunks a routing table can be looked up by. An empty \
+    destination covers the whole IPv4 and IPv6 routing tables, a destination at least as \
+    specific as the chunks is returned unchanged.
+
+    :param destination: the prefix to split
+    :param prefix_lengths: (optional) prefix length of the chunks, per IP version.
+    :type prefix_lengths: dict.
+    :return: a list of prefixes
+
+    Example:
+
+    .. code-block:: python
+
+        >>> prefix_pages('10.0.0.0/7')
+        [u'10.0.0.0/8', u'11.0.0.0/8']
+    """
+    if prefix_lengths is None:
+        prefix_lengths = constants.ROUTE_PAGE_PREFIX_LENGTH
+    pages = []
+    for prefix in [destination] if destination else ["0.0.0.0/0", "::/0"]:
+        network = IPNetwork(prefix)
+        page_length = prefix_lengths[network.version]
+        if "/" not in prefix or network.prefixlen >= page_length:
+            pages.append(py23_compat.text_type(prefix))
+            continue
+        pages.extend(
+            py23_compat.text_type(subnet) for subnet in network.cidr.subnet(page_length)
+        )
+    return pages
+
+
+def config_chunks(commands, size=None):
+    """
+    Split configuration commands into chunks that can be sent separately: each chunk starts \
+    with the commands entering again the sections containing its first command, e.g. \
+    ``router bgp 65000``.
+
+    :param commands: iterable of (indentation, command) tuples, as in the running config. Only \
+        the commands that are strings can enter a section.
+    :param size: (optional) maximum number of commands per chunk, besides the sections entered \
+        again. All the commands are in a single chunk by default, and when none of them is \
+        indented: the sections of a flat configuration, e.g. ``interface Ethernet1`` followed \
+        by ``description uplink``, cannot be told from the global commands.
+    :return: a generator of lists of commands, yielding at least one list
+
+    Example:
+
+    .. code-block:: python
+
+        >>> list(config_chunks([(0, 'router bgp 1'), (2, 'router-id 1.1.1.1'), \
+        ...                     (2, 'neighbor 2.2.2.2')], size=2))
+        [['router bgp 1', 'router-id 1.1.1.1'], ['router bgp 1', 'neighbor 2.2.2.2']]
+    """
+    if size:
+        commands = list(commands)
+        if not any(indent for indent, _ in commands):
+            size = None
+    chunk = []
+    count = 0
+    # (indentation, command) of the sections containing the current command
+    sections = []
+    for indent, command in commands:
+        while sections and sections[-1][0] >= indent:
+            sections.pop()
+        if size and count >= size:
+            yield chunk
+            chunk = [section for _, section in sections]
+            count = 0
+        chunk.append(command)
+        count += 1
+        if isinstance(command, py23_compat.string_types):
+            sections.append((indent, command))
+    yield chunk
+
+
+def config_section(config, section):
+    """
+    Return the top level sections of a configuration whose first line matches a regular \
+    expression, with the lines indented below them.
+
+    :param config: configuration, as text, indented as the running config of IOS, NX-OS or EOS
+    :param section: regular expression matching the beginning of the first line of the \
+        sections to return, e.g. ``router bgp``
+    :return: the lines of the sections, as text
+
+    Example:
+
+    .. code-block:: python
+
+        >>> config_section('hostname r1\\ninterface Lo0\\n shutdown\\n!\\n', 'interface')
+        u'interface Lo0\\n shutdown\\n'
+    """
+    pattern = re.compile(section)
+    lines = []
+    keep = False
+    for line in config.splitlines():
+        if line[:1].strip():
+            keep = pattern.match(line) is not None
+        if keep and line.strip():
+            lines.append(line)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
 def as_number(as_number_val):
     """Convert AS Number to standardized asplain notation as an integer."""
     as_number_str = py23_compat.text_type(as_number_val)
@@ -194,8 +194,21 @@ class MockDriver(NetworkDriver):
 
     def __getattribute__(self, name):
         if is_mocked_method(name):
-            self._raise_if_closed()
-            count = self._count_calls(name)
-            return mocked_method(self.path, name, count)
+            # the methods wrapped on the instance, e.g. by `add_trace_callback`, come first
+            wrapped = object.__getattribute__(self, "__dict__").get(name)
+            if wrapped is not None:
+                return wrapped
+            return self._mocked_method(name)
         else:
             return object.__getattribute__(self, name)
+
+    def _mocked_method(self, name):
+        """Return the mocked method `name`, checking the connection when it is called."""
+
+        def method(*args, **kwargs):
+            self._raise_if_closed()
+            count = self._count_calls(name)
+            return mocked_method(self.path, name, count)(*args, **kwargs)
+
+        method.__name__ = str(name)
+        return method
@@ -10,8 +10,12 @@
 # License for the specific language governing permissions and limitations under
 # the License.
 from __future__ import unicode_literals
+import hashlib
+import io
+
 from napalm.base.utils import py23_compat
 from netmiko import BaseConnection
+from netmiko.ssh_dispatcher import FILE_TRANSFER_MAP
 
 
 def netmiko_args(optional_args):
@@ -47,3 +51,51 @@ def netmiko_args(optional_args):
 
     # Return these arguments for use with establishing Netmiko SSH connection
     return netmiko_optional_args
+
+
+class _ConfigTransferMixin(object):
+    """SCP transfer of a configuration held in memory, instead of a local file."""
+
+    def __init__(
+        self, ssh_conn, source_config, dest_file, file_system, direction="put"
+    ):
+        if direction != "put":
+            raise ValueError("A configuration can only be uploaded")
+        # the parent classes compute the MD5 and the size from the local file
+        self.ssh_ctl_chan = ssh_conn
+        self.source_file = None
+        self.source_config = source_config.encode("utf-8")
+        self.dest_file = dest_file
+        self.direction = direction
+        self.file_system = file_system
+        self.source_md5 = hashlib.md5(self.source_config).hexdigest()
+        self.file_size = len(self.source_config)
+
+    def put_file(self):
+        destination = "{}/{}".format(self.file_system, self.dest_file)
+        self.scp_conn.scp_client.putfo(
+            io.BytesIO(self.source_config), destination, size=self.file_size
+        )
+        # Must close the SCP connection to get the file written (flush)
+        self.scp_conn.close()
+
+
+_config_transfer_classes = {}
+
+
+def config_transfer(ssh_conn, source_config, dest_file, file_system, direction="put"):
+    """
+    Return the Netmiko SCP transfer of `source_config` to `dest_file`, streamed from memory
+    without writing it to a temporary file.
+
+    It has the same interface as the object returned by ``netmiko.FileTransfer``.
+    """
+    file_transfer_class = FILE_TRANSFER_MAP[ssh_conn.device_type]
+    transfer_class = _config_transfer_classes.get(file_transfer_class)
+    if transfer_class is None:
+        transfer_class = _config_transfer_classes[file_transfer_class] = type(
+            str("Config" + file_transfer_class.__name__),
+            (_ConfigTransferMixin, file_transfer_class),
+            {},
+        )
+    return transfer_class(ssh_conn, source_config, dest_file, file_system, direction)
@@ -0,0 +1,164 @@
+"""
+Reuse of the parsed results of the getters whose raw output did not change.
+
+While the cache is enabled on a driver, the outputs returned by the methods listed in the
+``_PARSE_CACHE_METHODS`` attribute of the driver (e.g. ``_send_command``) are fingerprinted
+during each getter call. On the next call of the getter with the same arguments, the same
+commands are sent again: when the fingerprints of all their outputs match, the result parsed
+previously is returned without parsing the outputs again. Otherwise the getter runs normally,
+using the outputs already retrieved.
+
+The cache counts the hits and misses, per getter::
+
+    >>> cache = device.enable_parse_cache()
+    >>> device.get_lldp_neighbors_detail()
+    >>> device.get_lldp_neighbors_detail()
+    >>> cache.metrics()
+    {
+        'hits': 1,
+        'misses': 1,
+        'entries': 1,
+        'getters': {u'get_lldp_neighbors_detail': {'hits': 1, 'misses': 1}},
+    }
+"""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+import copy
+import functools
+import hashlib
+import json
+import threading
+
+# local modules
+from napalm.base.utils import py23_compat
+
+
+def fingerprint(output):
+    """Return the fingerprint of the raw output of a command."""
+    if not isinstance(output, py23_compat.string_types):
+        output = json.dumps(output, sort_keys=True, default=py23_compat.text_type)
+    return hashlib.sha1(output.encode("utf-8")).digest()
+
+
+def _call_key(args, kwargs):
+    return json.dumps([args, kwargs], sort_keys=True, default=repr)
+
+
+class ParseCache(object):
+    """
+    Parsed results of the getters of a driver, together with the fingerprints of the outputs
+    they were parsed from.
+    """
+
+    def __init__(self):
+        # (getter, arguments) -> (calls, fingerprints, result)
+        self.entries = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def count(self, getter, hit):
+        with self._lock:
+            counters = self.counters.setdefault(getter, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+
+    def metrics(self):
+        """Return the number of hits and misses, in total and per getter."""
+        with self._lock:
+            getters = {name: dict(counters) for name, counters in self.counters.items()}
+        return {
+            "hits": sum(counters["hits"] for counters in getters.values()),
+            "misses": sum(counters["misses"] for counters in getters.values()),
+            "entries": len(self.entries),
+            "getters": getters,
+        }
+
+    def clear(self):
+        """Forget the parsed results, keeping the metrics."""
+        self.entries.clear()
+
+
+def _cached_getter(driver, name, method):
+    cache = driver.parse_cache
+    state = driver._parse_cache_state
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if getattr(state, "recording", None) is not None:
+            # nested call, e.g. a getter calling another getter: part of the outer entry
+            return method(*args, **kwargs)
+        key = (name, _call_key(args, kwargs))
+        prefetched = {}
+        entry = cache.entries.get(key)
+        if entry is not None:
+            calls, fingerprints, result = entry
+            outputs = [
+                getattr(driver, funnel)(*call_args, **call_kwargs)
+                for funnel, call_args, call_kwargs in calls
+            ]
+            if [fingerprint(output) for output in outputs] == fingerprints:
+                cache.count(name, hit=True)
+                return copy.deepcopy(result)
+            for (funnel, call_args, call_kwargs), output in zip(calls, outputs):
+                prefetched.setdefault(
+                    (funnel, _call_key(call_args, call_kwargs)), []
+                ).append(output)
+        cache.count(name, hit=False)
+
+        recording = []
+        patches = []
+        for funnel in driver._PARSE_CACHE_METHODS:
+            patches.append((funnel, vars(driver).get(funnel)))
+            setattr(
+                driver,
+                funnel,
+                _recorded_funnel(
+                    funnel, getattr(driver, funnel), prefetched, recording
+                ),
+            )
+        state.recording = recording
+        try:
+            result = method(*args, **kwargs)
+        finally:
+            state.recording = None
+            for funnel, original in patches:
+                if original is not None:
+                    setattr(driver, funnel, original)
+                else:
+                    delattr(driver, funnel)
+        calls = [call for call, _ in recording]
+        fingerprints = [fingerprint(output) for _, output in recording]
+        cache.entries[key] = (calls, fingerprints, copy.deepcopy(result))
+        return result
+
+    return wrapper
+
+
+def _recorded_funnel(name, method, prefetched, recording):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        outputs = prefetched.get((name, _call_key(args, kwargs)))
+        output = outputs.pop(0) if outputs else method(*args, **kwargs)
+        recording.append(((name, args, kwargs), output))
+        return output
+
+    return wrapper
+
+
+def install(driver):
+    """Enable the cache of the parsed results on the driver."""
+    if getattr(driver, "parse_cache", None) is not None:
+        return driver.parse_cache
+    driver.parse_cache = ParseCache()
+    driver._parse_cache_state = threading.local()
+    for name in dir(driver.__class__):
+        if not name.startswith("get_"):
+            continue
+        method = getattr(driver, name, None)
+        if not callable(method):
+            continue
+        setattr(driver, name, _cached_getter(driver, name, method))
+    return driver.parse_cache
@@ -0,0 +1,259 @@
+"""
+Change detection for the NAPALM getters.
+
+A :class:`ChangePoller` calls the getters of a driver and returns only what changed since the
+previous call of the same getter, with the same arguments::
+
+    >>> poller = ChangePoller(device)
+    >>> poller.poll('get_bgp_neighbors')  # first poll: everything is added
+    {'added': {u'global': {u'router_id': u'192.0.2.254', u'peers': {...}}}}
+    >>> poller.poll('get_bgp_neighbors')  # nothing changed
+    {}
+    >>> poller.poll('get_bgp_neighbors')
+    {
+        'added': {u'global': {u'peers': {u'192.0.2.2': {...}}}},
+        'removed': {u'global': {u'peers': {u'192.0.2.3': None}}},
+        'changed': {u'global': {u'peers': {u'192.0.2.1': {u'is_up': False, u'uptime': -1}}}},
+    }
+
+The deltas follow the structure of the result of the getter: ``added`` and ``changed`` contain
+the new values, ``removed`` the keys that disappeared. Only the sections that are not empty are
+present. :func:`apply_delta` rebuilds the full result from the previous one and a delta.
+
+The previous results are not kept: only a short digest of each of their values, so that an
+unchanged result is detected by comparing a single digest.
+
+The lists of records, such as the ARP table, are compared record by record when the records
+can be identified by one of the tuples of fields in ``INDEX_KEYS``: they are handled as a
+dictionary keyed by the values of these fields joined with ``|``, e.g. ``u'Ethernet1|10.0.0.1'``.
+The other lists are compared as a whole.
+
+The fields changing on every poll, such as the uptime of the BGP neighbors or the age of the ARP
+entries, would make every poll return a change: the fields in ``VOLATILE_KEYS`` are ignored, and
+absent from the deltas.
+"""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+import hashlib
+import json
+import time
+
+# local modules
+from napalm.base.utils import py23_compat
+
+
+# fields identifying the records of the lists returned by the getters, tried in order
+INDEX_KEYS = (
+    ("interface", "ip"),  # get_arp_table, get_ipv6_neighbors_table
+    ("mac", "vlan"),  # get_mac_address_table
+    ("hostname", "port"),  # get_lldp_neighbors
+    ("remote_chassis_id", "remote_port"),  # get_lldp_neighbors_detail
+    ("routing_table", "protocol", "next_hop"),  # get_route_to
+)
+
+# fields changing on every poll, ignored by default
+VOLATILE_KEYS = (
+    "age",  # get_arp_table, get_ipv6_neighbors_table, get_mac_address_table
+    "last_flapped",  # get_interfaces
+    "uptime",  # get_bgp_neighbors, get_facts
+)
+
+# bytes kept from the digest of each value
+DIGEST_SIZE = 8
+
+
+def _digest(data):
+    return hashlib.sha1(data.encode("utf-8")).digest()[:DIGEST_SIZE]
+
+
+def _index(records, index_keys):
+    """Return the list of records as a dictionary, or None when they can't be identified."""
+    if not records or not all(isinstance(record, dict) for record in records):
+        return None
+    for fields in index_keys:
+        if not all(field in record for record in records for field in fields):
+            continue
+        indexed = {}
+        for record in records:
+            key = "|".join(py23_compat.text_type(record[field]) for field in fields)
+            if key in indexed:
+                break
+            indexed[key] = record
+        else:
+            return indexed
+    return None
+
+
+def normalize(value, index_keys=INDEX_KEYS, ignore_keys=()):
+    """
+    Return the value with the lists of identifiable records turned into dictionaries, and
+    without the fields of the dictionaries in `ignore_keys`.
+    """
+    if isinstance(value, dict):
+        return {
+            key: normalize(item, index_keys, ignore_keys)
+            for key, item in value.items()
+            if key not in ignore_keys
+        }
+    if isinstance(value, list):
+        indexed = _index(value, index_keys)
+        if indexed is not None:
+            return normalize(indexed, index_keys, ignore_keys)
+    return value
+
+
+def snapshot(value):
+    """
+    Return the compact form of a normalized value: a ``(digest, children)`` tuple, children
+    being the snapshots of the items of a dictionary, None for any other value.
+    """
+    if isinstance(value, dict):
+        children = {key: snapshot(item) for key, item in value.items()}
+        # the digest of a dictionary is computed from the digests of its items
+        digest = hashlib.sha1(b"{")
+        for key in sorted(children, key=py23_compat.text_type):
+            digest.update(py23_compat.text_type(key).encode("utf-8") + b"\0")
+            digest.update(children[key][0])
+        return digest.digest()[:DIGEST_SIZE], children
+    return (
+        _digest(json.dumps(value, sort_keys=True, default=py23_compat.text_type)),
+        None,
+    )
+
+
+def diff(previous, current, value):
+    """
+    Compare two snapshots, `value` being the normalized value `current` was taken from.
+
+    :return: The delta, see the module documentation.
+    """
+    if previous is None:
+        return {"added": value}
+    if previous[0] == current[0]:
+        return {}
+    if previous[1] is None or current[1] is None:
+        return {"changed": value}
+    delta = {"added": {}, "removed": {}, "changed": {}}
+    for key, child in current[1].items():
+        previous_child = previous[1].get(key)
+        if previous_child is None:
+            delta["added"][key] = value[key]
+            continue
+        for section, changes in diff(previous_child, child, value[key]).items():
+            delta[section][key] = changes
+    for key in previous[1]:
+        if key not in current[1]:
+            delta["removed"][key] = None
+    return {section: changes for section, changes in delta.items() if changes}
+
+
+def _remove(value, removed):
+    value = dict(value)
+    for key, changes in removed.items():
+        if changes is None:
+            value.pop(key, None)
+        else:
+            value[key] = _remove(value[key], changes)
+    return value
+
+
+def _update(value, changes):
+    value = dict(value)
+    for key, change in changes.items():
+        if isinstance(change, dict) and isinstance(value.get(key), dict):
+            value[key] = _update(value[key], change)
+        else:
+            value[key] = change
+    return value
+
+
+def apply_delta(previous, delta):
+    """
+    Return the normalized result of a getter, from the previous one and the delta returned by
+    the following poll.
+    """
+    if previous is None:
+        return delta.get("added")
+    if not isinstance(previous, dict) or not isinstance(delta.get("changed", {}), dict):
+        return delta.get("changed", previous)
+    value = _remove(previous, delta.get("removed", {}))
+    value = _update(value, delta.get("added", {}))
+    return _update(value, delta.get("changed", {}))
+
+
+class ChangePoller(object):
+    """
+    Poll the getters of a driver, returning only what changed since the previous poll.
+
+    :param device: Instance of the driver, already opened.
+    :param callback (optional): Callable invoked as ``callback(getter, delta)`` for each poll
+        returning a change.
+    :param index_keys (optional): Tuples of fields identifying the records of the lists.
+    :param ignore_keys (optional): Fields ignored, changing on every poll. Empty to compare
+        everything.
+    """
+
+    def __init__(
+        self, device, callback=None, index_keys=INDEX_KEYS, ignore_keys=VOLATILE_KEYS
+    ):
+        self.device = device
+        self.callback = callback
+        self.index_keys = index_keys
+        self.ignore_keys = frozenset(ignore_keys)
+        self._snapshots = {}
+
+    @staticmethod
+    def _key(getter, args, kwargs):
+        return getter, json.dumps([args, kwargs], sort_keys=True, default=repr)
+
+    def poll(self, getter, *args, **kwargs):
+        """
+        Call a getter and return the delta with the result of the previous call.
+
+        :param getter: Name of the getter, e.g. ``'get_interfaces'``.
+        :return: The delta, empty when nothing changed.
+        """
+        value = normalize(
+            getattr(self.device, getter)(*args, **kwargs),
+            self.index_keys,
+            self.ignore_keys,
+        )
+        current = snapshot(value)
+        key = self._key(getter, args, kwargs)
+        delta = diff(self._snapshots.get(key), current, value)
+        self._snapshots[key] = current
+        if delta and self.callback is not None:
+            self.callback(getter, delta)
+        return delta
+
+    def watch(self, getters, interval=60, count=None):
+        """
+        Poll the getters every `interval` seconds, yielding a ``(getter, delta)`` tuple for each
+        change.
+
+        :param getters: List of getter names.
+        :param interval (optional): Seconds between the start of two rounds of polls.
+        :param count (optional): Number of rounds, unlimited by default.
+        """
+        rounds = 0
+        while count is None or rounds < count:
+            start = time.time()
+            for getter in getters:
+                delta = self.poll(getter)
+                if delta:
+                    yield getter, delta
+            rounds += 1
+            if count is None or rounds < count:
+                time.sleep(max(0, interval - (time.time() - start)))
+
+    def reset(self, getter=None):
+        """Forget the previous results, of a single getter or of all of them."""
+        if getter is None:
+            self._snapshots.clear()
+            return
+        for key in [key for key in self._snapshots if key[0] == getter]:
+            del self._snapshots[key]
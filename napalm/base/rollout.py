@@ -0,0 +1,331 @@
+"""
+Staged rollout of a configuration change to many devices.
+
+The devices are changed in waves, a canary wave first and then larger ones. Within a wave, up to
+``max_in_flight`` devices are changed concurrently, each of them going through
+``load_merge_candidate`` (or ``load_replace_candidate``), ``compare_config``, ``commit_config``
+and then the health checks: functions receiving the device, still connected, and returning
+whether it is healthy, usually from the output of getters::
+
+    >>> def bgp_up(device):
+    ...     peers = device.get_bgp_neighbors()['global']['peers']
+    ...     return all(peer['is_up'] for peer in peers.values())
+    >>> rollout = Rollout(devices, config, waves=(1, 0.1, 1.0), health_checks=[bgp_up])
+    >>> result = rollout.run()
+    >>> result['completed']
+    True
+
+When more than ``max_failures`` devices of a wave fail, the devices of that wave already
+changed are rolled back and the rollout stops: the devices not started yet are skipped.
+
+Before the change, ``dry_run`` collects the diffs of all the devices concurrently, discarding
+the candidate configurations, and groups the devices having the same diff::
+
+    >>> report = dry_run(devices, config, max_in_flight=50)
+    >>> [(group['hosts'], group['diff']) for group in report['diffs']]
+    [(['pe01', 'pe03'], '+ntp server 192.0.2.1'), (['pe02'], '')]
+"""
+
+# Python3 support
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+
+logger = logging.getLogger(__name__)
+
+# a single canary device, then 10% of the devices, then all the others
+DEFAULT_WAVES = (1, 0.1, 1.0)
+
+# statuses of the devices counting as failures of their wave
+FAILED_STATUSES = ("failed", "unhealthy")
+
+
+def _error(e):
+    return "{}: {}".format(e.__class__.__name__, e)
+
+
+def _load(device, config, strategy):
+    """Load the configuration of the device as candidate and return the diff."""
+    if isinstance(config, dict):
+        config = config[device.hostname]
+    if strategy == "replace":
+        device.load_replace_candidate(config=config)
+    else:
+        device.load_merge_candidate(config=config)
+    return device.compare_config()
+
+
+def _diff(device, config, strategy):
+    """Return the diff of the device and the error, opening and closing the device."""
+    try:
+        device.open()
+    except Exception as e:
+        return None, _error(e)
+    try:
+        return _load(device, config, strategy), None
+    except Exception as e:
+        return None, _error(e)
+    finally:
+        try:
+            device.discard_config()
+        except Exception:
+            pass
+        device.close()
+
+
+def dry_run(devices, config, strategy="merge", max_in_flight=10):
+    """
+    Return the diffs of the configuration on each device, without changing them.
+
+    :param devices: List of driver instances, not opened.
+    :param config: Configuration, as text, or a dictionary mapping the hostname of each device
+        to its configuration.
+    :param strategy (optional): ``merge`` or ``replace``.
+    :param max_in_flight (optional): Maximum number of devices handled concurrently.
+
+    Returns a dictionary with the following keys:
+        * diffs (list) - The distinct diffs, the most common first, each of them a dictionary
+          with its ``hash`` (SHA-1), the ``diff`` and the ``hosts`` having it.
+        * errors (dict) - The error of each device that could not be compared.
+    """
+    if not devices:
+        return {"diffs": [], "errors": {}}
+    groups = {}
+    errors = {}
+
+    def _compare(device):
+        return (device.hostname,) + _diff(device, config, strategy)
+
+    pool = ThreadPool(min(max_in_flight, len(devices)))
+    try:
+        for hostname, diff, error in pool.imap_unordered(_compare, devices):
+            if error is not None:
+                errors[hostname] = error
+                continue
+            digest = hashlib.sha1(diff.encode("utf-8")).hexdigest()
+            group = groups.setdefault(
+                digest, {"hash": digest, "diff": diff, "hosts": []}
+            )
+            group["hosts"].append(hostname)
+    finally:
+        pool.close()
+        pool.join()
+    for group in groups.values():
+        group["hosts"].sort()
+    return {
+        "diffs": sorted(
+            groups.values(), key=lambda group: (-len(group["hosts"]), group["hosts"])
+        ),
+        "errors": errors,
+    }
+
+
+class Rollout(object):
+    """
+    Change the configuration of `devices` in waves.
+
+    :param devices: List of driver instances, not opened: each device is opened for the
+        duration of its change.
+    :param config: Configuration to load, as text, or a dictionary mapping the hostname of each
+        device to its configuration.
+    :param strategy (optional): ``merge`` or ``replace``.
+    :param waves (optional): Sizes of the successive waves, either numbers of devices or, as
+        floats, fractions of all the devices. The devices left after the last wave form an
+        additional wave.
+    :param max_in_flight (optional): Maximum number of devices changed concurrently.
+    :param health_checks (optional): Functions called with each device changed, returning
+        whether it is healthy. Raising an exception counts as unhealthy.
+    :param max_failures (optional): Number of devices allowed to fail in each wave without
+        rolling it back.
+    :param wait (optional): Seconds to wait between the commit and the health checks.
+    :param callback (optional): Function called with the index and the result of each wave.
+    """
+
+    def __init__(
+        self,
+        devices,
+        config,
+        strategy="merge",
+        waves=DEFAULT_WAVES,
+        max_in_flight=10,
+        health_checks=(),
+        max_failures=0,
+        wait=0,
+        callback=None,
+    ):
+        if strategy not in ("merge", "replace"):
+            raise ValueError("Unknown strategy {}".format(strategy))
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.devices = list(devices)
+        self.config = config
+        self.strategy = strategy
+        self.waves = waves
+        self.max_in_flight = max_in_flight
+        self.health_checks = list(health_checks)
+        self.max_failures = max_failures
+        self.wait = wait
+        self.callback = callback
+
+    def plan(self):
+        """Return the devices of each wave."""
+        remaining = list(self.devices)
+        waves = []
+        for size in self.waves:
+            if not remaining:
+                break
+            if isinstance(size, float):
+                size = int(math.ceil(size * len(self.devices)))
+            waves.append(remaining[: max(1, size)])
+            remaining = remaining[max(1, size) :]
+        if remaining:
+            waves.append(remaining)
+        return waves
+
+    def run(self):
+        """
+        Run the rollout.
+
+        Returns a dictionary with the following keys:
+            * completed (bool) - Whether all the waves succeeded.
+            * waves (list) - For each wave started, the ``hosts`` it contains, the number of
+              ``failures`` and whether it was ``rolled_back``.
+            * devices (dict) - For each hostname, the ``status`` of the device (``committed``,
+              ``unchanged``, ``failed``, ``unhealthy``, ``rolled_back``, ``rollback_failed``
+              or ``skipped``), the ``diff`` applied and the ``error``, if any.
+        """
+        result = {
+            "completed": True,
+            "waves": [],
+            "devices": OrderedDict(
+                (device.hostname, {"status": "skipped", "diff": None, "error": None})
+                for device in self.devices
+            ),
+        }
+        for index, wave in enumerate(self.plan()):
+            wave_result = self._run_wave(wave, result["devices"])
+            result["waves"].append(wave_result)
+            if self.callback is not None:
+                self.callback(index, wave_result)
+            if wave_result["rolled_back"]:
+                result["completed"] = False
+                break
+        return result
+
+    def _run_wave(self, wave, states):
+        logger.info("Changing %d device(s)", len(wave))
+        aborted = threading.Event()
+        failures = []
+
+        def _change(device):
+            if aborted.is_set():
+                return device, None
+            state = self._change(device)
+            if state["status"] in FAILED_STATUSES:
+                failures.append(device.hostname)
+                if len(failures) > self.max_failures:
+                    # no need to change the other devices of the wave, it is rolled back
+                    aborted.set()
+            return device, state
+
+        changed = []
+        pool = ThreadPool(min(self.max_in_flight, len(wave)))
+        try:
+            for device, state in pool.imap_unordered(_change, wave):
+                if state is None:
+                    continue
+                if state.pop("changed"):
+                    changed.append(device)
+                states[device.hostname] = state
+        finally:
+            pool.close()
+            pool.join()
+
+        rolled_back = len(failures) > self.max_failures
+        if rolled_back:
+            logger.warning(
+                "%d device(s) failed, rolling back %d device(s)",
+                len(failures),
+                len(changed),
+            )
+            self._rollback(changed, states)
+        return {
+            "hosts": [device.hostname for device in wave],
+            "failures": len(failures),
+            "rolled_back": rolled_back,
+        }
+
+    def _change(self, device):
+        state = {"status": "failed", "diff": None, "error": None, "changed": False}
+        try:
+            device.open()
+        except Exception as e:
+            state["error"] = _error(e)
+            return state
+        try:
+            state["diff"] = _load(device, self.config, self.strategy)
+            if not state["diff"]:
+                device.discard_config()
+                state["status"] = "unchanged"
+                return state
+            # even when the commit fails, the configuration may have been partially changed
+            state["changed"] = True
+            device.commit_config()
+            state["status"] = "committed"
+            if self.wait:
+                time.sleep(self.wait)
+            for check in self.health_checks:
+                try:
+                    healthy = check(device)
+                except Exception as e:
+                    healthy = False
+                    state["error"] = _error(e)
+                if not healthy:
+                    state["status"] = "unhealthy"
+                    state["error"] = state["error"] or "{} failed".format(
+                        getattr(check, "__name__", check)
+                    )
+                    break
+        except Exception as e:
+            state["error"] = _error(e)
+            if not state["changed"]:
+                try:
+                    device.discard_config()
+                except Exception:
+                    pass
+        finally:
+            device.close()
+        return state
+
+    def _rollback(self, devices, states):
+        def _rollback(device):
+            state = states[device.hostname]
+            try:
+                device.open()
+                try:
+                    device.rollback()
+                finally:
+                    device.close()
+                state["status"] = "rolled_back"
+            except Exception as e:
+                state["status"] = "rollback_failed"
+                state["error"] = _error(e)
+
+        if not devices:
+            return
+        pool = ThreadPool(min(self.max_in_flight, len(devices)))
+        try:
+            pool.map(_rollback, devices)
+        finally:
+            pool.close()
+            pool.join()
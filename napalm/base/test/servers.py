@@ -0,0 +1,584 @@
+"""
+Local stand-ins for the APIs of the devices, replaying the mocked data of the tests.
+
+Unlike the test doubles replacing the device objects, the servers let the real drivers run:
+their transport, the serialization of the requests and the connections are exercised as well,
+e.g. to benchmark a driver under concurrency without any device::
+
+    with EOSServer('test/eos/mocked_data', 'test_get_facts', latency=0.05) as server:
+        device = EOSDriver('127.0.0.1', 'admin', 'admin',
+                           optional_args={'transport': 'http', 'port': server.port})
+        device.open()
+        device.get_facts()
+
+The output of a command is read from the directory of the test case, named as the test doubles
+name it, then from the root of the mocked data, then from ``responses``. The other commands
+fail as invalid commands.
+
+:class:`SSHServer` presents the CLI of the SSH based drivers: the prompt of IOS, NX-OS or IOS-XR,
+the XML agent of IOS-XR and the NETCONF subsystem of Junos, streaming the outputs at a given
+rate::
+
+    with SSHServer('test/ios/mocked_data', 'test_get_facts', rate=10000) as server:
+        device = IOSDriver('127.0.0.1', 'admin', 'admin', optional_args={'port': server.port})
+"""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+from builtins import super
+import base64
+import json
+import os
+import random
+import re
+import socket
+import ssl
+import threading
+import time
+from xml.sax.saxutils import escape
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+# third party libs
+from lxml import etree
+import paramiko
+
+# local modules
+from napalm.base.test.double import BaseTestDouble
+from napalm.base.utils import py23_compat
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server.stand_in
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8")
+        server.wait()
+        if not server.authorized(self.headers.get("Authorization")):
+            status, reply = 401, {"error": "Unauthorized"}
+        else:
+            status, reply = 200, server.reply(json.loads(body))
+        data = json.dumps(reply).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", py23_compat.text_type(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockedDataServer(object):
+    """
+    Base class of the stand-in servers.
+
+    :param mocked_data: Directory of the mocked data, e.g. ``'test/eos/mocked_data'``.
+    :param test (optional): Name of the test, e.g. ``'test_get_facts'``.
+    :param test_case (optional): Name of the test case.
+    :param latency (optional): Seconds waited before replying to each request.
+    :param jitter (optional): Maximum number of seconds randomly added to or removed from the
+        latency.
+    :param responses (optional): Dictionary mapping commands to their output, used when the
+        mocked data has no file for them.
+    :param username (optional): Username required, not checked by default.
+    :param password (optional): Password required with the username.
+    """
+
+    # outputs of the commands the drivers send when opening the connection
+    DEFAULT_RESPONSES = {}
+
+    def __init__(
+        self,
+        mocked_data,
+        test="",
+        test_case="normal",
+        latency=0,
+        jitter=0,
+        responses=None,
+        username=None,
+        password=None,
+    ):
+        self.mocked_data = mocked_data
+        self.test = test
+        self.test_case = test_case
+        self.latency = latency
+        self.jitter = jitter
+        self.responses = dict(self.DEFAULT_RESPONSES)
+        self.responses.update(responses or {})
+        self.username = username
+        self.password = password
+        self.host = "127.0.0.1"
+        self.port = None
+        self.requests = 0
+        self.commands = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+    def start(self):
+        """Start serving on a free port of the loopback interface, see `port`."""
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    def use(self, test, test_case="normal"):
+        """Replay the mocked data of another test case."""
+        self.test = test
+        self.test_case = test_case
+
+    def wait(self):
+        with self._lock:
+            self.requests += 1
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def check_credentials(self, username, password):
+        return self.username is None or (username, password) == (
+            self.username,
+            self.password,
+        )
+
+    def output(self, command, filename, text):
+        """
+        Return the output of the command read from `filename`, as text or parsed from JSON.
+
+        :raise KeyError: When the mocked data has no output for the command.
+        """
+        with self._lock:
+            self.commands.append(command)
+        for directory in (
+            os.path.join(self.mocked_data, self.test, self.test_case),
+            self.mocked_data,
+        ):
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                with open(path) as f:
+                    return f.read() if text else json.load(f)
+        return self.responses[command]
+
+
+class JSONRPCServer(MockedDataServer):
+    """
+    Base class of the stand-ins for the HTTP APIs, see :class:`MockedDataServer`.
+
+    :param certfile (optional): Path of the certificate served over HTTPS, HTTP by default.
+    :param keyfile (optional): Path of the private key of the certificate.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.certfile = kwargs.pop("certfile", None)
+        self.keyfile = kwargs.pop("keyfile", None)
+        super().__init__(*args, **kwargs)
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        self._server = _ThreadingHTTPServer((self.host, 0), _Handler)
+        self._server.stand_in = self
+        if self.certfile:
+            context = ssl.SSLContext(
+                getattr(ssl, "PROTOCOL_TLS_SERVER", ssl.PROTOCOL_SSLv23)
+            )
+            context.load_cert_chain(self.certfile, self.keyfile)
+            self._server.socket = context.wrap_socket(
+                self._server.socket, server_side=True
+            )
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def authorized(self, header):
+        if self.username is None:
+            return True
+        try:
+            scheme, credentials = header.split(" ", 1)
+            username, password = (
+                base64.b64decode(credentials).decode("utf-8").split(":", 1)
+            )
+        except (AttributeError, ValueError, TypeError):
+            return False
+        return scheme == "Basic" and self.check_credentials(username, password)
+
+    def reply(self, request):
+        """Return the reply to the JSON-RPC request."""
+        raise NotImplementedError
+
+
+class EOSServer(JSONRPCServer):
+    """Stand-in for the eAPI of an EOS device, see :class:`JSONRPCServer`."""
+
+    DEFAULT_RESPONSES = {"show clock": "Thu Jan  1 00:00:00 1970\n"}
+
+    def reply(self, request):
+        params = request["params"]
+        text = params.get("format") == "text"
+        result = []
+        for index, command in enumerate(params["cmds"]):
+            if isinstance(command, dict):
+                command = command["cmd"]
+            if command == "enable":
+                result.append({})
+                continue
+            filename = "{}.{}".format(
+                BaseTestDouble.sanitize_text(command), "text" if text else "json"
+            )
+            try:
+                output = self.output(command, filename, text)
+            except KeyError:
+                message = "CLI command {} of {} '{}' failed: invalid command".format(
+                    index + 1, len(params["cmds"]), command
+                )
+                data = result + [{"errors": ["Invalid input (at token 0: '')"]}]
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request.get("id"),
+                    "error": {"code": 1002, "message": message, "data": data},
+                }
+            result.append({"output": output} if text else output)
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+
+class NXOSServer(JSONRPCServer):
+    """Stand-in for the NX-API (JSON-RPC) of an NX-OS device, see :class:`JSONRPCServer`."""
+
+    DEFAULT_RESPONSES = {"show hostname": {"hostname": "localhost"}}
+
+    def _reply(self, request):
+        command = request["params"]["cmd"]
+        text = request["method"] == "cli_ascii"
+        filename = "{}.json".format(command.replace(" ", "_"))
+        try:
+            output = self.output(command, filename, text)
+        except KeyError:
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "error": {
+                    "code": -32602,
+                    "message": "Invalid params",
+                    "data": {"msg": "% Invalid command\n"},
+                },
+            }
+        result = {"msg": output} if text else {"body": output}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def reply(self, request):
+        if isinstance(request, dict):
+            return self._reply(request)
+        return [self._reply(item) for item in request]
+
+
+class _SSHInterface(paramiko.ServerInterface):
+    def __init__(self, server):
+        self.server = server
+        self.subsystem = None
+        self.requested = threading.Event()
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if self.server.check_credentials(username, password):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.requested.set()
+        return True
+
+    def check_channel_subsystem_request(self, channel, name):
+        if name != "netconf":
+            return False
+        self.subsystem = name
+        self.requested.set()
+        return True
+
+
+class SSHServer(MockedDataServer):
+    """
+    Stand-in for the SSH server of a device, see :class:`MockedDataServer`.
+
+    The latency is applied to each command, or RPC.
+
+    :param platform (optional): ``ios``, ``nxos_ssh`` and ``iosxr`` present the prompt of the CLI,
+        ``iosxr`` answers the requests sent to the XML agent as well. ``junos`` answers the
+        RPCs sent to the NETCONF subsystem.
+    :param hostname (optional): Hostname in the prompt.
+    :param rate (optional): Bytes sent per second, unlimited by default.
+    :param host_key (optional): ``paramiko.PKey`` of the server, generated by default.
+    """
+
+    PROMPTS = {
+        "ios": "{hostname}#",
+        "nxos_ssh": "{hostname}#",
+        "iosxr": "RP/0/RSP0/CPU0:{hostname}#",
+    }
+    XML_PROMPT = "XML> "
+    INVALID_INPUT = "% Invalid input detected at '^' marker."
+    NETCONF_DELIMITER = "]]>]]>"
+    NETCONF_NS = "urn:ietf:params:xml:ns:netconf:base:1.0"
+
+    def __init__(self, *args, **kwargs):
+        self.platform = kwargs.pop("platform", "ios")
+        self.hostname = kwargs.pop("hostname", "router")
+        self.rate = kwargs.pop("rate", None)
+        self.host_key = kwargs.pop("host_key", None)
+        super().__init__(*args, **kwargs)
+        self.sessions = 0
+        self._socket = None
+        self._thread = None
+        self._transports = []
+        self._stopped = threading.Event()
+
+    def start(self):
+        if self.host_key is None:
+            self.host_key = paramiko.RSAKey.generate(2048)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, 0))
+        self._socket.listen(128)
+        self._socket.settimeout(0.1)
+        self._stopped.clear()
+        self.port = self._socket.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self._socket.close()
+        with self._lock:
+            transports = list(self._transports)
+        for transport in transports:
+            transport.close()
+
+    def _accept(self):
+        while not self._stopped.is_set():
+            try:
+                client, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            client.settimeout(None)
+            thread = threading.Thread(target=self._serve, args=(client,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, client):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        interface = _SSHInterface(self)
+        with self._lock:
+            self._transports.append(transport)
+        try:
+            transport.start_server(server=interface)
+            channel = transport.accept(30)
+            if channel is None or not interface.requested.wait(30):
+                return
+            with self._lock:
+                self.sessions += 1
+            if interface.subsystem == "netconf":
+                self._netconf(channel)
+            else:
+                self._shell(channel)
+        except (EOFError, socket.error, paramiko.SSHException):
+            pass
+        finally:
+            transport.close()
+            with self._lock:
+                self._transports.remove(transport)
+
+    def _send(self, channel, data):
+        """Send the data, at `rate` bytes per second."""
+        data = data.encode("utf-8")
+        if not self.rate:
+            channel.sendall(data)
+            return
+        # chunks sent every 10ms
+        size = max(1, int(self.rate / 100))
+        for index in range(0, len(data), size):
+            chunk = data[index : index + size]
+            start = time.time()
+            channel.sendall(chunk)
+            time.sleep(max(0, len(chunk) / float(self.rate) - (time.time() - start)))
+
+    def _lines(self, channel):
+        """Yield the lines received, terminated by CR, LF or CRLF."""
+        line = ""
+        previous = ""
+        while True:
+            data = channel.recv(4096)
+            if not data:
+                return
+            for char in data.decode("utf-8", "replace"):
+                if char in "\r\n":
+                    if not (char == "\n" and previous == "\r"):
+                        yield line
+                        line = ""
+                else:
+                    line += char
+                previous = char
+
+    def _shell(self, channel):
+        prompt = self.PROMPTS[self.platform].format(hostname=self.hostname)
+        xml_mode = False
+        self._send(channel, "\r\n" + prompt)
+        for line in self._lines(channel):
+            command = line.strip()
+            if xml_mode:
+                if command == "exit":
+                    xml_mode = False
+                    self._send(channel, "\r\n" + prompt)
+                elif command:
+                    self.wait()
+                    self._send(
+                        channel, self._xml_agent(command) + "\n" + self.XML_PROMPT
+                    )
+                else:
+                    self._send(channel, self.XML_PROMPT)
+                continue
+            if not command:
+                self._send(channel, "\r\n" + prompt)
+                continue
+            self.wait()
+            if command in ("exit", "logout"):
+                return
+            if command == "xml" and self.platform == "iosxr":
+                xml_mode = True
+                self._send(channel, line + "\r\n" + self.XML_PROMPT)
+                continue
+            self._send(channel, line + "\r\n" + self._cli(command) + "\r\n" + prompt)
+
+    def _cli(self, command):
+        if command == "enable" or command.startswith("terminal "):
+            return ""
+        filename = "{}.txt".format(BaseTestDouble.sanitize_text(command))
+        try:
+            return self.output(command, filename, text=True)
+        except KeyError:
+            return self.INVALID_INPUT
+
+    def _xml_agent(self, request):
+        try:
+            command = "".join(
+                etree.tostring(child).decode("utf-8")
+                for child in etree.fromstring(request.encode("utf-8"))
+            )
+        except etree.XMLSyntaxError:
+            command = request
+        filename = "{}.txt".format(BaseTestDouble.sanitize_text(command))
+        try:
+            return self.output(command, filename, text=True)
+        except KeyError:
+            return (
+                '<?xml version="1.0" encoding="UTF-8"?><Response MajorVersion="1" '
+                'MinorVersion="0"><ResultSummary ErrorCount="1"/></Response>'
+            )
+
+    def _netconf(self, channel):
+        hello = (
+            '<?xml version="1.0" encoding="UTF-8"?><hello xmlns="{ns}"><capabilities>'
+            "<capability>urn:ietf:params:netconf:base:1.0</capability>"
+            "<capability>http://xml.juniper.net/netconf/junos/1.0</capability>"
+            "</capabilities><session-id>{session}</session-id></hello>"
+        ).format(ns=self.NETCONF_NS, session=self.sessions)
+        self._send(channel, hello + self.NETCONF_DELIMITER)
+        buffer = ""
+        while True:
+            data = channel.recv(65536)
+            if not data:
+                return
+            buffer += data.decode("utf-8", "replace")
+            while self.NETCONF_DELIMITER in buffer:
+                message, buffer = buffer.split(self.NETCONF_DELIMITER, 1)
+                rpc = etree.fromstring(message.strip().encode("utf-8"))
+                if etree.QName(rpc).localname != "rpc":
+                    continue  # hello of the client
+                operation = rpc[0]
+                self.wait()
+                reply = self._rpc(operation)
+                self._send(
+                    channel,
+                    '<rpc-reply xmlns="{}" message-id="{}">{}</rpc-reply>{}'.format(
+                        self.NETCONF_NS,
+                        rpc.get("message-id", ""),
+                        reply,
+                        self.NETCONF_DELIMITER,
+                    ),
+                )
+                if etree.QName(operation).localname == "close-session":
+                    return
+
+    def _rpc(self, operation):
+        name = etree.QName(operation).localname
+        if name == "close-session":
+            return "<ok/>"
+        if name == "command":
+            command = operation.text or ""
+            filename = "{}.txt".format(BaseTestDouble.sanitize_text(command))
+            try:
+                return "<output>{}</output>".format(
+                    escape(self.output(command, filename, text=True))
+                )
+            except KeyError:
+                return self._rpc_error("syntax error")
+        if name == "get-configuration" and len(operation):
+            filename = BaseTestDouble.sanitize_text(
+                etree.tostring(operation[0]).decode("utf-8")
+            )
+        elif name == "get-configuration":
+            filename = "get_config__" + "__".join(
+                "{}_{}".format(k, v) for k, v in sorted(operation.attrib.items())
+            )
+        else:
+            filename = name + (operation.findtext("instance") or "")
+        try:
+            output = self.output(name, "{}.xml".format(filename[0:150]), text=True)
+        except KeyError:
+            return self._rpc_error("syntax error, expecting <rpc> element")
+        return re.sub(r"^\s*<\?xml[^>]*\?>", "", output)
+
+    @staticmethod
+    def _rpc_error(message):
+        return (
+            "<rpc-error><error-type>protocol</error-type><error-tag>operation-failed"
+            "</error-tag><error-severity>error</error-severity><error-message>{}"
+            "</error-message></rpc-error>"
+        ).format(message)
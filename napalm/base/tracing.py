@@ -0,0 +1,333 @@
+"""
+Timing instrumentation for the NAPALM drivers.
+
+While a trace callback is registered on a driver, every getter (and the other methods listed in
+``TRACED_METHODS``) is timed, together with the transport calls it issues: the methods listed
+in the ``_TRACED_TRANSPORT_METHODS`` attribute of the driver, looked up on ``driver.device``.
+
+For every traced method call the callbacks receive one record::
+
+    {
+        'hostname': u'edge01.bjm01',
+        'method': u'get_facts',
+        'args': [],
+        'kwargs': {},
+        'start': 1545836210.58,       # epoch
+        'wall_time': 1.32,            # seconds
+        'cpu_time': 0.21,             # seconds of CPU used by the process
+        'transport_time': 1.11,       # seconds spent waiting for the device
+        'parse_time': 0.21,           # wall_time - transport_time
+        'parse_cpu_time': 0.19,       # cpu_time minus the CPU time of the transport calls
+        'payload_size': 45221,        # bytes received from the device
+        'error': None,
+        'calls': [
+            {
+                'method': u'run_commands',
+                'command': [u'show version'],
+                'wall_time': 0.52,
+                'cpu_time': 0.01,
+                'payload_size': 893,
+                'error': None,
+            },
+            ...
+        ]
+    }
+
+Transport calls issued outside a traced method produce a record whose ``method`` is ``None``.
+The payload sizes are computed once the method returned, outside the timings.
+"""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+# std libs
+import functools
+import json
+import threading
+import time
+
+try:
+    from time import process_time
+except ImportError:  # Python 2
+    from time import clock as process_time
+
+# local modules
+from napalm.base.utils import py23_compat
+
+
+# methods timed besides the getters
+TRACED_METHODS = (
+    "open",
+    "close",
+    "cli",
+    "ping",
+    "traceroute",
+    "ping_many",
+    "traceroute_many",
+    "load_merge_candidate",
+    "load_replace_candidate",
+    "compare_config",
+    "commit_config",
+    "discard_config",
+    "rollback",
+    "compliance_report",
+)
+
+
+class Tracer(object):
+    """
+    Trace callback collecting the records emitted by a driver.
+
+    :param callback (optional): Callable invoked as well with each record.
+    """
+
+    def __init__(self, callback=None):
+        self.records = []
+        self.callback = callback
+
+    def __call__(self, record):
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def summary(self):
+        """
+        Aggregate the collected records per method.
+
+        Example::
+
+            {
+                u'get_facts': {
+                    'count': 2,
+                    'wall_time': 2.64,
+                    'transport_time': 2.22,
+                    'parse_cpu_time': 0.38,
+                    'payload_size': 90442,
+                    'transport_calls': 8,
+                }
+            }
+        """
+        summary = {}
+        for record in self.records:
+            entry = summary.setdefault(
+                record["method"],
+                {
+                    "count": 0,
+                    "wall_time": 0.0,
+                    "transport_time": 0.0,
+                    "parse_cpu_time": 0.0,
+                    "payload_size": 0,
+                    "transport_calls": 0,
+                },
+            )
+            entry["count"] += 1
+            entry["wall_time"] += record["wall_time"]
+            entry["transport_time"] += record["transport_time"]
+            entry["parse_cpu_time"] += record["parse_cpu_time"]
+            entry["payload_size"] += record["payload_size"]
+            entry["transport_calls"] += len(record["calls"])
+        return summary
+
+
+def payload_size(payload):
+    """Best effort estimation of the size, in bytes, of the data returned by the device."""
+    if payload is None:
+        return 0
+    if isinstance(payload, bytes):
+        return len(payload)
+    if isinstance(payload, py23_compat.string_types):
+        return len(payload.encode("utf-8"))
+    if hasattr(payload, "xpath"):
+        from lxml import etree
+
+        return len(etree.tostring(payload))
+    try:
+        return len(json.dumps(payload, default=py23_compat.text_type))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _command_repr(args, kwargs):
+    """Return the command or RPC passed to a transport call, in a printable format."""
+    command = args[0] if args else next(iter(kwargs.values()), None)
+    if hasattr(command, "xpath"):
+        from lxml import etree
+
+        return py23_compat.text_type(etree.tostring(command).decode("utf-8"))
+    if isinstance(command, (list, tuple)):
+        return [py23_compat.text_type(c) for c in command]
+    if command is None:
+        return None
+    return py23_compat.text_type(command)
+
+
+def _error_repr(exc):
+    return "{}: {}".format(exc.__class__.__name__, exc)
+
+
+def _new_record(driver, method, args, kwargs):
+    return {
+        "hostname": getattr(driver, "hostname", None),
+        "method": method,
+        "args": list(args),
+        "kwargs": dict(kwargs),
+        "start": time.time(),
+        "wall_time": 0.0,
+        "cpu_time": 0.0,
+        "transport_time": 0.0,
+        "parse_time": 0.0,
+        "parse_cpu_time": 0.0,
+        "payload_size": 0,
+        "error": None,
+        "calls": [],
+    }
+
+
+def _close_record(record, wall_time, cpu_time):
+    for call in record["calls"]:
+        # sized after the timings were taken, serializing the payload takes time
+        call["payload_size"] = payload_size(call.pop("_payload", None))
+    record["wall_time"] = wall_time
+    record["cpu_time"] = cpu_time
+    record["transport_time"] = sum(call["wall_time"] for call in record["calls"])
+    record["payload_size"] = sum(call["payload_size"] for call in record["calls"])
+    record["parse_time"] = max(0.0, wall_time - record["transport_time"])
+    record["parse_cpu_time"] = max(
+        0.0, cpu_time - sum(call["cpu_time"] for call in record["calls"])
+    )
+    return record
+
+
+def _emit(driver, record):
+    for callback in list(driver._trace_callbacks):
+        callback(record)
+
+
+def _trace_method(driver, name, method):
+    state, patches = driver._trace_state, driver._trace_patches
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if driver._trace_patches is not patches:
+            # uninstalled, while wrapped by another wrapper left in place
+            return method(*args, **kwargs)
+        if getattr(state, "record", None) is not None:
+            # nested call, e.g. a getter calling another getter: accounted in the outer record
+            return method(*args, **kwargs)
+        _instrument_transport(driver)
+        record = _new_record(driver, name, args, kwargs)
+        state.record = record
+        start_wall, start_cpu = time.time(), process_time()
+        try:
+            return method(*args, **kwargs)
+        except Exception as e:
+            record["error"] = _error_repr(e)
+            raise
+        finally:
+            state.record = None
+            _close_record(record, time.time() - start_wall, process_time() - start_cpu)
+            # the connection might have been (re)opened by this method
+            _instrument_transport(driver)
+            _emit(driver, record)
+
+    wrapper._napalm_trace = True
+    return wrapper
+
+
+def _trace_transport(driver, name, method):
+    state, patches = driver._trace_state, driver._trace_patches
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if driver._trace_patches is not patches or getattr(
+            state, "in_transport", False
+        ):
+            # uninstalled, or transport method implemented on top of another traced one
+            return method(*args, **kwargs)
+        call = {
+            "method": name,
+            "command": _command_repr(args, kwargs),
+            "wall_time": 0.0,
+            "cpu_time": 0.0,
+            "payload_size": 0,
+            "error": None,
+        }
+        state.in_transport = True
+        start_wall, start_cpu = time.time(), process_time()
+        try:
+            result = method(*args, **kwargs)
+            call["_payload"] = result
+            return result
+        except Exception as e:
+            call["error"] = _error_repr(e)
+            raise
+        finally:
+            state.in_transport = False
+            call["wall_time"] = time.time() - start_wall
+            call["cpu_time"] = process_time() - start_cpu
+            record = getattr(state, "record", None)
+            if record is not None:
+                record["calls"].append(call)
+            else:
+                record = _new_record(driver, None, (), {})
+                record["calls"].append(call)
+                _emit(
+                    driver, _close_record(record, call["wall_time"], call["cpu_time"])
+                )
+
+    wrapper._napalm_trace = True
+    return wrapper
+
+
+def _instrument_transport(driver):
+    """Wrap the transport methods of the device object currently used by the driver."""
+    device = getattr(driver, "device", None)
+    if device is None or any(device is d for d, _, _ in driver._trace_patches):
+        return
+    for name in driver._TRACED_TRANSPORT_METHODS:
+        method = getattr(device, name, None)
+        if method is None:
+            continue
+        original = vars(device).get(name)
+        try:
+            setattr(device, name, _trace_transport(driver, name, method))
+        except AttributeError:
+            continue
+        driver._trace_patches.append((device, name, original))
+
+
+def install(driver):
+    """Start timing the getters and the transport calls of the driver."""
+    if getattr(driver, "_trace_patches", None) is not None:
+        return
+    driver._trace_state = threading.local()
+    driver._trace_patches = []
+    for name in dir(driver.__class__):
+        if not (name.startswith("get_") or name in TRACED_METHODS):
+            continue
+        if not callable(getattr(driver.__class__, name, None)):
+            continue
+        # wrap the bound method, possibly already wrapped, e.g. by the parse cache
+        original = vars(driver).get(name)
+        setattr(driver, name, _trace_method(driver, name, getattr(driver, name)))
+        driver._trace_patches.append((driver, name, original))
+    _instrument_transport(driver)
+
+
+def uninstall(driver):
+    """
+    Restore the methods wrapped by `install`. The methods wrapped again since, e.g. by the
+    parse cache, are left in place: the tracing wrappers they call are disabled.
+    """
+    for obj, name, original in reversed(getattr(driver, "_trace_patches", None) or []):
+        if not getattr(vars(obj).get(name), "_napalm_trace", False):
+            continue
+        if original is not None:
+            setattr(obj, name, original)
+        else:
+            try:
+                delattr(obj, name)
+            except AttributeError:
+                pass
+    driver._trace_patches = None
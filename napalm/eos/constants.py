@@ -10,3 +10,9 @@ LLDP_CAPAB_TRANFORM_TABLE = {
     "docsis": "docsis-cable-device",
     "station": "station",
 }
+
+# seconds during which get_route_to reuses the list of VRFs of the device
+VRF_CACHE_TTL = 300
+
+# VRFs, and BGP prefixes, looked up with a single eAPI request by get_route_to
+ROUTE_TO_BATCH_SIZE = 50
@@ -21,9 +21,13 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 # std libs
+import logging
+import queue
 import re
 import time
 
+from multiprocessing.pool import ThreadPool
+
 from datetime import datetime
 from collections import defaultdict
 from netaddr import IPAddress
@@ -47,19 +51,28 @@ from napalm.base.exceptions import (
     SessionLockedException,
     CommandErrorException,
 )
-from napalm.eos.constants import LLDP_CAPAB_TRANFORM_TABLE
+from napalm.eos.constants import (
+    LLDP_CAPAB_TRANFORM_TABLE,
+    ROUTE_TO_BATCH_SIZE,
+    VRF_CACHE_TTL,
+)
 import napalm.base.constants as c
 
 # local modules
 # here add local imports
 # e.g. import napalm.eos.helpers etc.
 
+logger = logging.getLogger(__name__)
+
 
 class EOSDriver(NetworkDriver):
     """Napalm driver for Arista EOS."""
 
     SUPPORTED_OC_MODELS = []
 
+    _TRACED_TRANSPORT_METHODS = ("run_commands",)
+    _SAVE_CONFIG_METHOD = "_save_config"
+
     HEREDOC_COMMANDS = [
         ("banner login", 1),
         ("banner motd", 1),
@@ -114,25 +127,44 @@ class EOSDriver(NetworkDriver):
         self.profile = [self.platform]
 
         self.eos_autoComplete = optional_args.get("eos_autoComplete", None)
+        # maximum number of commands sent per request when loading a config, None for all
+        self.config_chunk_size = optional_args.get("config_chunk_size", None)
+
+        self.vrf_cache_ttl = optional_args.get("vrf_cache_ttl", VRF_CACHE_TTL)
+        self.route_to_batch_size = optional_args.get(
+            "route_to_batch_size", ROUTE_TO_BATCH_SIZE
+        )
+        self.route_to_workers = optional_args.get("route_to_workers", 1)
+        # additional eAPI nodes of the get_route_to workers, kept until the session is closed
+        self._route_to_devices = []
+        # (timestamp, VRF names) of the last `show vrf`
+        self._vrfs_cache = None
+
+    def _connect(self):
+        """Return a new pyeapi connection to the device."""
+        if self.transport in ("http", "https"):
+            return pyeapi.client.connect(
+                transport=self.transport,
+                host=self.hostname,
+                username=self.username,
+                password=self.password,
+                port=self.port,
+                timeout=self.timeout,
+            )
+        elif self.transport == "socket":
+            return pyeapi.client.connect(transport=self.transport)
+        raise ConnectionException("Unknown transport: {}".format(self.transport))
+
+    def _new_device(self):
+        """Return a new eAPI node, e.g. for the commands run from another thread."""
+        return pyeapi.client.Node(self._connect(), enablepwd=self.enablepwd)
 
     def open(self):
         """Implementation of NAPALM method open."""
+        self._vrfs_cache = None
+        self._route_to_devices = []
         try:
-            if self.transport in ("http", "https"):
-                connection = pyeapi.client.connect(
-                    transport=self.transport,
-                    host=self.hostname,
-                    username=self.username,
-                    password=self.password,
-                    port=self.port,
-                    timeout=self.timeout,
-                )
-            elif self.transport == "socket":
-                connection = pyeapi.client.connect(transport=self.transport)
-            else:
-                raise ConnectionException(
-                    "Unknown transport: {}".format(self.transport)
-                )
+            connection = self._connect()
 
             if self.device is None:
                 self.device = pyeapi.client.Node(connection, enablepwd=self.enablepwd)
@@ -148,6 +180,7 @@ class EOSDriver(NetworkDriver):
 
     def close(self):
         """Implementation of NAPALM method close."""
+        self._route_to_devices = []
         self.discard_config()
 
     def is_alive(self):
@@ -164,105 +197,98 @@ class EOSDriver(NetworkDriver):
         ]:
             raise SessionLockedException("Session is already in use")
 
-    @staticmethod
-    def _multiline_convert(config, start="banner login", end="EOF", depth=1):
-        """Converts running-config HEREDOC into EAPI JSON dict"""
-        ret = list(config)  # Don't modify list in-place
-        try:
-            s = ret.index(start)
-            e = s
-            while depth:
-                e = ret.index(end, e + 1)
-                depth = depth - 1
-        except ValueError:  # Couldn't find end, abort
-            return ret
-        ret[s] = {"cmd": ret[s], "input": "\n".join(ret[s + 1 : e])}
-        del ret[s + 1 : e + 1]
-
-        return ret
-
-    @staticmethod
-    def _mode_comment_convert(commands):
+    @classmethod
+    def _config_commands(cls, lines):
         """
-        EOS has the concept of multi-line mode comments, shown in the running-config
-        as being inside a config stanza (router bgp, ACL definition, etc) and beginning
-        with the normal level of spaces and '!!', followed by comments.
-
-        Unfortunately, pyeapi does not accept mode comments in this format, and have to be
-        converted to a specific type of pyeapi call that accepts multi-line input
+        Convert the lines of a configuration into pyeapi commands, in a single pass.
 
-        Copy the config list into a new return list, converting consecutive lines starting with
-        "!!" into a single multiline comment command
+        Blank lines and comments are skipped. The HEREDOC commands (`HEREDOC_COMMANDS`) and
+        the consecutive lines of multi-line mode comments, starting with "!!", are converted
+        into a single command with multi-line input, as pyeapi does not accept them as lines.
 
-        :param commands: List of commands to be sent to pyeapi
-        :return: Converted list of commands to be sent to pyeapi
+        :param lines: Iterable of configuration lines.
+        :return: Generator of (indentation, command) tuples, the indentation being the one of
+            the line starting the command.
         """
-
-        ret = []
-        comment_count = 0
-        for idx, element in enumerate(commands):
-            # Check first for stringiness, as we may have dicts in the command list already
-            if isinstance(element, py23_compat.string_types) and element.startswith(
-                "!!"
-            ):
-                comment_count += 1
-                continue
-            else:
-                if comment_count > 0:
-                    # append the previous comment
-                    ret.append(
-                        {
-                            "cmd": "comment",
-                            "input": "\n".join(
-                                map(
-                                    lambda s: s.lstrip("! "),
-                                    commands[idx - comment_count : idx],
-                                )
-                            ),
-                        }
-                    )
-                    comment_count = 0
-                ret.append(element)
-
-        return ret
-
-    def _load_config(self, filename=None, config=None, replace=True):
-        commands = []
-
-        self._lock()
-        commands.append("configure session {}".format(self.config_session))
-        if replace:
-            commands.append("rollback clean-config")
-
-        if filename is not None:
-            with open(filename, "r") as f:
-                lines = f.readlines()
-        else:
-            if isinstance(config, list):
-                lines = config
-            else:
-                lines = config.splitlines()
-
+        heredocs = dict(cls.HEREDOC_COMMANDS)
+        # [indentation, command, "EOF" lines left, input lines] of the current HEREDOC
+        heredoc = None
+        # (indentation, lines) of the current mode comment
+        comment = None
         for line in lines:
-            line = line.strip()
-            if line == "":
+            text = line.strip()
+            if heredoc is not None:
+                if text == "EOF":
+                    heredoc[2] -= 1
+                    if not heredoc[2]:
+                        yield heredoc[0], {
+                            "cmd": heredoc[1],
+                            "input": "\n".join(heredoc[3]),
+                        }
+                        heredoc = None
+                        continue
+                heredoc[3].append(text)
                 continue
-            if line.startswith("!") and not line.startswith("!!"):
+            if not text or (text.startswith("!") and not text.startswith("!!")):
                 continue
-            commands.append(line)
+            indent = len(line) - len(line.lstrip())
+            if text.startswith("!!"):
+                if comment is None:
+                    comment = (indent, [])
+                comment[1].append(text.lstrip("! "))
+                continue
+            if comment is not None:
+                yield comment[0], {"cmd": "comment", "input": "\n".join(comment[1])}
+                comment = None
+            if text in heredocs:
+                heredoc = [indent, text, heredocs[text], []]
+                continue
+            yield indent, text
+        if comment is not None:
+            yield comment[0], {"cmd": "comment", "input": "\n".join(comment[1])}
+        if heredoc is not None:
+            # no end found, sent as regular lines
+            yield heredoc[0], heredoc[1]
+            for command in cls._config_commands(heredoc[3]):
+                yield command
+
+    def _run_config_chunk(self, commands):
+        if self.eos_autoComplete is not None:
+            self.device.run_commands(commands, autoComplete=self.eos_autoComplete)
+        else:
+            self.device.run_commands(commands)
 
-        for start, depth in [
-            (s, d) for (s, d) in self.HEREDOC_COMMANDS if s in commands
-        ]:
-            commands = self._multiline_convert(commands, start=start, depth=depth)
+    def _send_config(self, lines, replace):
+        """
+        Send the configuration lines to the config session.
 
-        commands = self._mode_comment_convert(commands)
+        With the `config_chunk_size` optional argument, the commands are sent in chunks of at
+        most that many commands (plus the sections entered again), a chunk being sent once the
+        previous one succeeded. Otherwise they are sent with a single request.
+        """
+        session = "configure session {}".format(self.config_session)
+        sent = 0
+        for chunk in napalm.base.helpers.config_chunks(
+            self._config_commands(lines), self.config_chunk_size
+        ):
+            if replace and not sent:
+                chunk.insert(0, "rollback clean-config")
+            # each request starts in the configuration mode
+            self._run_config_chunk([session] + chunk)
+            sent += len(chunk)
+            logger.debug("%d commands sent to %s in %s", sent, self.hostname, session)
+
+    def _load_config(self, filename=None, config=None, replace=True):
+        self._lock()
 
         try:
-            if self.eos_autoComplete is not None:
-                self.device.run_commands(commands, autoComplete=self.eos_autoComplete)
+            if filename is not None:
+                with open(filename, "r") as f:
+                    self._send_config(f, replace)
+            elif isinstance(config, list):
+                self._send_config(config, replace)
             else:
-                self.device.run_commands(commands)
+                self._send_config(config.splitlines(), replace)
         except pyeapi.eapilib.CommandError as e:
             self.discard_config()
             msg = py23_compat.text_type(e)
@@ -301,11 +327,17 @@ class EOSDriver(NetworkDriver):
             "copy startup-config flash:rollback-0",
             "configure session {}".format(self.config_session),
             "commit",
-            "write memory",
         ]
+        if self._save_on_commit:
+            commands.append("write memory")
 
         self.device.run_commands(commands)
         self.config_session = None
+        self._vrfs_cache = None
+
+    def _save_config(self):
+        """Save the running config to startup."""
+        self.device.run_commands(["write memory"])
 
     def discard_config(self):
         """Implementation of NAPALM method discard_config."""
@@ -318,6 +350,7 @@ class EOSDriver(NetworkDriver):
         """Implementation of NAPALM method rollback."""
         commands = ["configure replace flash:rollback-0", "write memory"]
         self.device.run_commands(commands)
+        self._vrfs_cache = None
 
     def get_facts(self):
         """Implementation of NAPALM method get_facts."""
@@ -1138,18 +1171,10 @@ class EOSDriver(NetworkDriver):
 
         return mac_table
 
-    def get_route_to(self, destination="", protocol=""):
+    def get_route_to(self, destination="", protocol="", vrf=""):
         routes = {}
 
-        # Placeholder for vrf arg
-        vrf = ""
-
-        # Right not iterating through vrfs is necessary
-        # show ipv6 route doesn't support vrf 'all'
-        if vrf == "":
-            vrfs = sorted(self._get_vrfs())
-        else:
-            vrfs = [vrf]
+        vrfs = self._route_to_vrfs(vrf)
 
         if protocol.lower() == "direct":
             protocol = "connected"
@@ -1158,6 +1183,106 @@ class EOSDriver(NetworkDriver):
         if IPNetwork(destination).version == 6:
             ipv = "v6"
 
+        # the VRFs are looked up in batches, so that only the output of one
+        # batch at a time is held in memory before being parsed
+        batch_size = max(1, self.route_to_batch_size)
+        batches = [vrfs[i : i + batch_size] for i in range(0, len(vrfs), batch_size)]
+        workers = max(1, min(self.route_to_workers, len(batches)))
+
+        if workers == 1:
+            batches_routes = (
+                self._get_route_to_batch(self.device, batch, destination, protocol, ipv)
+                for batch in batches
+            )
+            for batch_routes in batches_routes:
+                for prefix, prefix_routes in batch_routes.items():
+                    routes.setdefault(prefix, []).extend(prefix_routes)
+            return routes
+
+        # eAPI connections can't be shared between threads: each worker uses its own, opened
+        # by the first call needing it and reused by the next ones
+        devices = queue.Queue()
+        devices.put(self.device)
+        for device in self._route_to_devices[: workers - 1]:
+            devices.put(device)
+
+        def _open_device(_):
+            device = self._new_device()
+            self._route_to_devices.append(device)
+            devices.put(device)
+
+        def _lookup(batch):
+            device = devices.get()
+            try:
+                return self._get_route_to_batch(
+                    device, batch, destination, protocol, ipv
+                )
+            finally:
+                devices.put(device)
+
+        pool = ThreadPool(workers)
+        try:
+            pool.map(_open_device, range(workers - 1 - len(self._route_to_devices)))
+            # imap keeps the order of the VRFs, and hands each batch over as soon as parsed
+            for batch_routes in pool.imap(_lookup, batches):
+                for prefix, prefix_routes in batch_routes.items():
+                    routes.setdefault(prefix, []).extend(prefix_routes)
+        finally:
+            pool.close()
+            pool.join()
+
+        return routes
+
+    def iter_routes(self, destination="", protocol="", vrf=""):
+        """Yield the routes to a destination, looking the routing table up in chunks."""
+        vrfs = self._route_to_vrfs(vrf)
+
+        if protocol.lower() == "direct":
+            protocol = "connected"
+
+        batch_size = max(1, self.route_to_batch_size)
+
+        def _get_page(page):
+            ipv = "v6" if IPNetwork(page).version == 6 else ""
+            routes = {}
+            for i in range(0, len(vrfs), batch_size):
+                batch_routes = self._get_route_to_batch(
+                    self.device,
+                    vrfs[i : i + batch_size],
+                    page,
+                    protocol,
+                    ipv,
+                    longer_prefixes="/" in page,
+                )
+                for prefix, prefix_routes in batch_routes.items():
+                    routes.setdefault(prefix, []).extend(prefix_routes)
+            return routes
+
+        return self._iter_routes_paged(destination, _get_page)
+
+    def _route_to_vrfs(self, vrf):
+        """Return the list of VRFs to look the routes up in, all of them by default."""
+        # Right now iterating through vrfs is necessary
+        # show ipv6 route doesn't support vrf 'all'
+        if not vrf:
+            return sorted(self._get_vrfs())
+        elif isinstance(vrf, py23_compat.string_types):
+            return [vrf]
+        return list(vrf)
+
+    def _get_route_to_batch(
+        self, device, vrfs, destination, protocol, ipv, longer_prefixes=False
+    ):
+        """
+        Look up and parse the routes to `destination` in a batch of VRFs, or the routes
+        within `destination` when `longer_prefixes` is set.
+        """
+        routes = {}
+        batch_size = max(1, self.route_to_batch_size)
+
+        if longer_prefixes:
+            destination = "{} longer-prefixes".format(destination)
+
         commands = []
         for _vrf in vrfs:
             commands.append(
@@ -1166,7 +1291,7 @@ class EOSDriver(NetworkDriver):
                 )
             )
 
-        commands_output = self.device.run_commands(commands)
+        commands_output = device.run_commands(commands)
 
         for _vrf, command_output in zip(vrfs, commands_output):
             if ipv == "v6":
@@ -1176,119 +1301,141 @@ class EOSDriver(NetworkDriver):
                     command_output.get("vrfs", {}).get(_vrf, {}).get("routes", {})
                 )
 
-            for prefix, route_details in routes_out.items():
-                if prefix not in routes.keys():
-                    routes[prefix] = []
-                route_protocol = route_details.get("routeType")
-                preference = route_details.get("preference", 0)
-
-                route = {
-                    "current_active": True,
-                    "last_active": True,
-                    "age": 0,
-                    "next_hop": "",
-                    "protocol": route_protocol,
-                    "outgoing_interface": "",
-                    "preference": preference,
-                    "inactive_reason": "",
-                    "routing_table": _vrf,
-                    "selected_next_hop": True,
-                    "protocol_attributes": {},
-                }
-                if protocol == "bgp" or route_protocol.lower() in ("ebgp", "ibgp"):
-                    nexthop_interface_map = {}
-                    for next_hop in route_details.get("vias"):
-                        nexthop_ip = napalm.base.helpers.ip(next_hop.get("nexthopAddr"))
-                        nexthop_interface_map[nexthop_ip] = next_hop.get("interface")
-                    metric = route_details.get("metric")
-                    command = "show ip{ipv} bgp {destination} detail vrf {_vrf}".format(
-                        ipv=ipv, destination=prefix, _vrf=_vrf
-                    )
-                    vrf_details = (
-                        self.device.run_commands([command])[0]
-                        .get("vrfs", {})
-                        .get(_vrf, {})
-                    )
-                    local_as = vrf_details.get("asn")
-                    bgp_routes = (
-                        vrf_details.get("bgpRouteEntries", {})
-                        .get(prefix, {})
-                        .get("bgpRoutePaths", [])
-                    )
-                    for bgp_route_details in bgp_routes:
-                        bgp_route = route.copy()
-                        as_path = bgp_route_details.get("asPathEntry", {}).get(
-                            "asPath", ""
-                        )
-                        remote_as = int(as_path.strip("()").split()[-1])
-                        remote_address = napalm.base.helpers.ip(
-                            bgp_route_details.get("routeDetail", {})
-                            .get("peerEntry", {})
-                            .get("peerAddr", "")
-                        )
-                        local_preference = bgp_route_details.get("localPreference")
-                        next_hop = napalm.base.helpers.ip(
-                            bgp_route_details.get("nextHop")
-                        )
-                        active_route = bgp_route_details.get("routeType", {}).get(
-                            "active", False
-                        )
-                        last_active = active_route  # should find smth better
-                        communities = bgp_route_details.get("routeDetail", {}).get(
-                            "communityList", []
+            # the BGP details of the prefixes are retrieved with a request per chunk of
+            #   `route_to_batch_size` prefixes, parsed before retrieving the next chunk
+            routes_items = list(routes_out.items())
+            for start in range(0, len(routes_items), batch_size):
+                chunk = routes_items[start : start + batch_size]
+                bgp_prefixes = [
+                    prefix
+                    for prefix, route_details in chunk
+                    if protocol == "bgp"
+                    or route_details.get("routeType", "").lower() in ("ebgp", "ibgp")
+                ]
+                bgp_outputs = {}
+                if bgp_prefixes:
+                    bgp_commands = [
+                        "show ip{ipv} bgp {destination} detail vrf {_vrf}".format(
+                            ipv=ipv, destination=prefix, _vrf=_vrf
                         )
-                        preference2 = bgp_route_details.get("weight")
-                        inactive_reason = bgp_route_details.get("reasonNotBestpath", "")
-                        bgp_route.update(
-                            {
-                                "current_active": active_route,
-                                "inactive_reason": inactive_reason,
-                                "last_active": last_active,
-                                "next_hop": next_hop,
-                                "outgoing_interface": nexthop_interface_map.get(
-                                    next_hop
-                                ),
-                                "selected_next_hop": active_route,
-                                "protocol_attributes": {
-                                    "metric": metric,
-                                    "as_path": as_path,
-                                    "local_preference": local_preference,
-                                    "local_as": local_as,
-                                    "remote_as": remote_as,
-                                    "remote_address": remote_address,
-                                    "preference2": preference2,
-                                    "communities": communities,
-                                },
-                            }
+                        for prefix in bgp_prefixes
+                    ]
+                    bgp_outputs = dict(
+                        zip(bgp_prefixes, device.run_commands(bgp_commands))
+                    )
+
+                for prefix, route_details in chunk:
+                    if prefix not in routes.keys():
+                        routes[prefix] = []
+                    route_protocol = route_details.get("routeType")
+                    preference = route_details.get("preference", 0)
+
+                    route = {
+                        "current_active": True,
+                        "last_active": True,
+                        "age": 0,
+                        "next_hop": "",
+                        "protocol": route_protocol,
+                        "outgoing_interface": "",
+                        "preference": preference,
+                        "inactive_reason": "",
+                        "routing_table": _vrf,
+                        "selected_next_hop": True,
+                        "protocol_attributes": {},
+                    }
+                    if protocol == "bgp" or route_protocol.lower() in ("ebgp", "ibgp"):
+                        nexthop_interface_map = {}
+                        for next_hop in route_details.get("vias"):
+                            nexthop_ip = napalm.base.helpers.ip(
+                                next_hop.get("nexthopAddr")
+                            )
+                            nexthop_interface_map[nexthop_ip] = next_hop.get(
+                                "interface"
+                            )
+                        metric = route_details.get("metric")
+                        vrf_details = bgp_outputs[prefix].get("vrfs", {}).get(_vrf, {})
+                        local_as = vrf_details.get("asn")
+                        bgp_routes = (
+                            vrf_details.get("bgpRouteEntries", {})
+                            .get(prefix, {})
+                            .get("bgpRoutePaths", [])
                         )
-                        routes[prefix].append(bgp_route)
-                else:
-                    if route_details.get("routeAction") in ("drop",):
-                        route["next_hop"] = "NULL"
-                    if route_details.get("routingDisabled") is True:
-                        route["last_active"] = False
-                        route["current_active"] = False
-                    for next_hop in route_details.get("vias"):
-                        route_next_hop = route.copy()
-                        if next_hop.get("nexthopAddr") is None:
-                            route_next_hop.update(
-                                {
-                                    "next_hop": "",
-                                    "outgoing_interface": next_hop.get("interface"),
-                                }
+                        for bgp_route_details in bgp_routes:
+                            bgp_route = route.copy()
+                            as_path = bgp_route_details.get("asPathEntry", {}).get(
+                                "asPath", ""
                             )
-                        else:
-                            route_next_hop.update(
+                            remote_as = int(as_path.strip("()").split()[-1])
+                            remote_address = napalm.base.helpers.ip(
+                                bgp_route_details.get("routeDetail", {})
+                                .get("peerEntry", {})
+                                .get("peerAddr", "")
+                            )
+                            local_preference = bgp_route_details.get("localPreference")
+                            next_hop = napalm.base.helpers.ip(
+                                bgp_route_details.get("nextHop")
+                            )
+                            active_route = bgp_route_details.get("routeType", {}).get(
+                                "active", False
+                            )
+                            last_active = active_route  # should find smth better
+                            communities = bgp_route_details.get("routeDetail", {}).get(
+                                "communityList", []
+                            )
+                            preference2 = bgp_route_details.get("weight")
+                            inactive_reason = bgp_route_details.get(
+                                "reasonNotBestpath", ""
+                            )
+                            bgp_route.update(
                                 {
-                                    "next_hop": napalm.base.helpers.ip(
-                                        next_hop.get("nexthopAddr")
+                                    "current_active": active_route,
+                                    "inactive_reason": inactive_reason,
+                                    "last_active": last_active,
+                                    "next_hop": next_hop,
+                                    "outgoing_interface": nexthop_interface_map.get(
+                                        next_hop
                                     ),
-                                    "outgoing_interface": next_hop.get("interface"),
+                                    "selected_next_hop": active_route,
+                                    "protocol_attributes": {
+                                        "metric": metric,
+                                        "as_path": as_path,
+                                        "local_preference": local_preference,
+                                        "local_as": local_as,
+                                        "remote_as": remote_as,
+                                        "remote_address": remote_address,
+                                        "preference2": preference2,
+                                        "communities": communities,
+                                    },
                                 }
                             )
-                        routes[prefix].append(route_next_hop)
-                    if route_details.get("vias") == []:  # empty list
-                        routes[prefix].append(route)
+                            routes[prefix].append(bgp_route)
+                    else:
+                        if route_details.get("routeAction") in ("drop",):
+                            route["next_hop"] = "NULL"
+                        if route_details.get("routingDisabled") is True:
+                            route["last_active"] = False
+                            route["current_active"] = False
+                        for next_hop in route_details.get("vias"):
+                            route_next_hop = route.copy()
+                            if next_hop.get("nexthopAddr") is None:
+                                route_next_hop.update(
+                                    {
+                                        "next_hop": "",
+                                        "outgoing_interface": next_hop.get("interface"),
+                                    }
+                                )
+                            else:
+                                route_next_hop.update(
+                                    {
+                                        "next_hop": napalm.base.helpers.ip(
+                                            next_hop.get("nexthopAddr")
+                                        ),
+                                        "outgoing_interface": next_hop.get("interface"),
+                                    }
+                                )
+                            routes[prefix].append(route_next_hop)
+                        if route_details.get("vias") == []:  # empty list
+                            routes[prefix].append(route)
         return routes
 
     def get_snmp_information(self):
@@ -1362,7 +1509,107 @@ class EOSDriver(NetworkDriver):
         timeout=c.TRACEROUTE_TIMEOUT,
         vrf=c.TRACEROUTE_VRF,
     ):
+        commands = []
+
+        if vrf:
+            commands.append("routing-context vrf {vrf}".format(vrf=vrf))
+
+        commands.append(
+            self._traceroute_command(
+                destination, source=source, ttl=ttl, timeout=timeout
+            )
+        )
+
+        try:
+            traceroute_raw_output = self.device.run_commands(commands, encoding="text")[
+                -1
+            ].get("output")
+        except CommandErrorException:
+            return {
+                "error": "Cannot execute traceroute on the device: {}".format(
+                    commands[0]
+                )
+            }
+        return self._parse_traceroute_output(traceroute_raw_output, timeout)
+
+    def traceroute_many(
+        self,
+        destinations,
+        source=c.TRACEROUTE_SOURCE,
+        ttl=c.TRACEROUTE_TTL,
+        timeout=c.TRACEROUTE_TIMEOUT,
+        vrf=c.TRACEROUTE_VRF,
+        workers=c.PROBE_WORKERS,
+    ):
+        """
+        Execute traceroute towards several destinations, batched in a single eAPI request.
+
+        Returns a dictionary keyed by destination, having the same structure as `traceroute`.
+        The `workers` argument is not used, as the probes are executed by eAPI.
+        """
+        if not destinations:
+            return {}
+        commands = []
+
+        if vrf:
+            commands.append("routing-context vrf {vrf}".format(vrf=vrf))
+
+        commands.extend(
+            [
+                self._traceroute_command(
+                    destination, source=source, ttl=ttl, timeout=timeout
+                )
+                for destination in destinations
+            ]
+        )
+
+        try:
+            outputs = self.device.run_commands(commands, encoding="text")[
+                -len(destinations) :
+            ]
+        except (CommandErrorException, pyeapi.eapilib.CommandError):
+            # one of the probes failed: find out which one, tracing one at a time
+            return super(EOSDriver, self).traceroute_many(
+                destinations, source=source, ttl=ttl, timeout=timeout, vrf=vrf
+            )
+        return {
+            destination: self._parse_traceroute_output(output.get("output"), timeout)
+            for destination, output in zip(destinations, outputs)
+        }
+
+    @staticmethod
+    def _traceroute_command(destination, source, ttl, timeout):
+        """Build the traceroute command for a single destination."""
+        source_opt = ""
+        ttl_opt = ""
+        timeout_opt = ""
+
+        # if not ttl:
+        #     ttl = 20
 
+        if source:
+            source_opt = "-s {source}".format(source=source)
+        if ttl:
+            ttl_opt = "-m {ttl}".format(ttl=ttl)
+        if timeout:
+            timeout_opt = "-w {timeout}".format(timeout=timeout)
+        total_timeout = timeout * ttl
+        # `ttl`, `source` and `timeout` are not supported by default CLI
+        # so we need to go through the bash and set a specific timeout
+        return (
+            "bash timeout {total_timeout} traceroute {destination} "
+            "{source_opt} {ttl_opt} {timeout_opt}"
+        ).format(
+            total_timeout=total_timeout,
+            destination=destination,
+            source_opt=source_opt,
+            ttl_opt=ttl_opt,
+            timeout_opt=timeout_opt,
+        )
+
+    @staticmethod
+    def _parse_traceroute_output(traceroute_raw_output, timeout):
+        """Parse the output of the traceroute command into the napalm traceroute structure."""
         _HOP_ENTRY_PROBE = [
             r"\s+",
             r"(",  # beginning of host_name (ip_address) RTT group
@@ -1383,54 +1630,9 @@ class EOSDriver(NetworkDriver):
 
         traceroute_result = {}
 
-        source_opt = ""
-        ttl_opt = ""
-        timeout_opt = ""
-
-        # if not ttl:
-        #     ttl = 20
-
         probes = 3
         # in case will be added one further param to adjust the number of probes/hop
 
-        commands = []
-
-        if vrf:
-            commands.append("routing-context vrf {vrf}".format(vrf=vrf))
-
-        if source:
-            source_opt = "-s {source}".format(source=source)
-        if ttl:
-            ttl_opt = "-m {ttl}".format(ttl=ttl)
-        if timeout:
-            timeout_opt = "-w {timeout}".format(timeout=timeout)
-        total_timeout = timeout * ttl
-        # `ttl`, `source` and `timeout` are not supported by default CLI
-        # so we need to go through the bash and set a specific timeout
-        commands.append(
-            (
-                "bash timeout {total_timeout} traceroute {destination} "
-                "{source_opt} {ttl_opt} {timeout_opt}"
-            ).format(
-                total_timeout=total_timeout,
-                destination=destination,
-                source_opt=source_opt,
-                ttl_opt=ttl_opt,
-                timeout_opt=timeout_opt,
-            )
-        )
-
-        try:
-            traceroute_raw_output = self.device.run_commands(commands, encoding="text")[
-                -1
-            ].get("output")
-        except CommandErrorException:
-            return {
-                "error": "Cannot execute traceroute on the device: {}".format(
-                    commands[0]
-                )
-            }
-
         hop_regex = "".join(_HOP_ENTRY + _HOP_ENTRY_PROBE * probes)
 
         traceroute_result["success"] = {}
@@ -1691,8 +1893,20 @@ class EOSDriver(NetworkDriver):
 
         return optics_detail
 
-    def get_config(self, retrieve="all"):
+    def get_config(self, retrieve="all", section=None):
         """get_config implementation for EOS."""
+        return self._get_config(retrieve, section)
+
+    def _get_config(self, retrieve, section=None):
+        # the sections are filtered by the device
+        running = "show running-config"
+        pipe = ""
+        if section:
+            running += " section {}".format(section)
+            pipe = " | section {}".format(section)
+        startup = "show startup-config" + pipe
+        candidate = "show session-config named {}{}".format(self.config_session, pipe)
+
         get_startup = retrieve == "all" or retrieve == "startup"
         get_running = retrieve == "all" or retrieve == "running"
         get_candidate = (
@@ -1700,12 +1914,10 @@ class EOSDriver(NetworkDriver):
         ) and self.config_session
 
         if retrieve == "all":
-            commands = ["show startup-config", "show running-config"]
+            commands = [startup, running]
 
             if self.config_session:
-                commands.append(
-                    "show session-config named {}".format(self.config_session)
-                )
+                commands.append(candidate)
 
             output = self.device.run_commands(commands, encoding="text")
             return {
@@ -1720,7 +1932,7 @@ class EOSDriver(NetworkDriver):
                 else "",
             }
         elif get_startup or get_running:
-            commands = ["show {}-config".format(retrieve)]
+            commands = [startup if get_startup else running]
             output = self.device.run_commands(commands, encoding="text")
             return {
                 "startup": py23_compat.text_type(output[0]["output"])
@@ -1732,7 +1944,7 @@ class EOSDriver(NetworkDriver):
                 "candidate": "",
             }
         elif get_candidate:
-            commands = ["show session-config named {}".format(self.config_session)]
+            commands = [candidate]
             output = self.device.run_commands(commands, encoding="text")
             return {
                 "startup": "",
@@ -1758,13 +1970,21 @@ class EOSDriver(NetworkDriver):
         return output
 
     def _get_vrfs(self):
+        # the list of VRFs is reused for `vrf_cache_ttl` seconds
+        if self._vrfs_cache is not None:
+            cached_at, vrfs = self._vrfs_cache
+            if time.time() - cached_at < self.vrf_cache_ttl:
+                return list(vrfs)
+
         output = self._show_vrf()
 
         vrfs = [py23_compat.text_type(vrf["name"]) for vrf in output]
 
         vrfs.append("default")
 
-        return vrfs
+        self._vrfs_cache = (time.time(), vrfs)
+
+        return list(vrfs)
 
     def get_network_instances(self, name=""):
         """get_network_instances implementation for EOS."""
@@ -1842,22 +2062,91 @@ class EOSDriver(NetworkDriver):
             * ip_address (str)
             * rtt (float)
         """
-        ping_dict = {}
         commands = []
 
         if vrf:
             commands.append("routing-context vrf {vrf}".format(vrf=vrf))
 
+        commands.append(
+            self._ping_command(
+                destination, source=source, timeout=timeout, size=size, count=count
+            )
+        )
+        try:
+            output = self.device.run_commands(commands, encoding="text")[-1]["output"]
+        except (CommandErrorException, pyeapi.eapilib.CommandError):
+            return {
+                "error": "Cannot execute ping on the device: {}".format(commands[-1])
+            }
+        return self._parse_ping_output(output)
+
+    def ping_many(
+        self,
+        destinations,
+        source=c.PING_SOURCE,
+        ttl=c.PING_TTL,
+        timeout=c.PING_TIMEOUT,
+        size=c.PING_SIZE,
+        count=c.PING_COUNT,
+        vrf=c.PING_VRF,
+        workers=c.PROBE_WORKERS,
+    ):
+        """
+        Execute ping towards several destinations, batched in a single eAPI request.
+
+        Returns a dictionary keyed by destination, having the same structure as `ping`.
+        The `workers` argument is not used, as the probes are executed by eAPI.
+        """
+        if not destinations:
+            return {}
+        commands = []
+
+        if vrf:
+            commands.append("routing-context vrf {vrf}".format(vrf=vrf))
+
+        commands.extend(
+            [
+                self._ping_command(
+                    destination, source=source, timeout=timeout, size=size, count=count
+                )
+                for destination in destinations
+            ]
+        )
+        try:
+            outputs = self.device.run_commands(commands, encoding="text")[
+                -len(destinations) :
+            ]
+        except (CommandErrorException, pyeapi.eapilib.CommandError):
+            # one of the probes failed: find out which one, pinging one at a time
+            return super(EOSDriver, self).ping_many(
+                destinations,
+                source=source,
+                ttl=ttl,
+                timeout=timeout,
+                size=size,
+                count=count,
+                vrf=vrf,
+            )
+        return {
+            destination: self._parse_ping_output(output["output"])
+            for destination, output in zip(destinations, outputs)
+        }
+
+    @staticmethod
+    def _ping_command(destination, source, timeout, size, count):
+        """Build the ping command for a single destination."""
         command = "ping {}".format(destination)
         command += " timeout {}".format(timeout)
         command += " size {}".format(size)
         command += " repeat {}".format(count)
         if source != "":
             command += " source {}".format(source)
+        return command
 
-        commands.append(command)
-        output = self.device.run_commands(commands, encoding="text")[-1]["output"]
-
+    @staticmethod
+    def _parse_ping_output(output):
+        """Parse the output of the ping command into the napalm ping structure."""
+        ping_dict = {}
         if "connect:" in output:
             ping_dict["error"] = output
         elif "PING" in output:
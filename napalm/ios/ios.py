@@ -31,6 +31,8 @@ from netmiko import FileTransfer, InLineTransfer
 import napalm.base.constants as C
 import napalm.base.helpers
 from napalm.base.base import NetworkDriver
+from napalm.base.cache import UploadCache
+from napalm.base.config_tree import ConfigTree
 from napalm.base.exceptions import (
     ReplaceConfigException,
     MergeConfigException,
@@ -42,7 +44,7 @@ from napalm.base.helpers import (
     transform_lldp_capab,
     textfsm_extractor,
 )
-from napalm.base.netmiko_helpers import netmiko_args
+from napalm.base.netmiko_helpers import config_transfer, netmiko_args
 from napalm.base.utils import py23_compat
 
 # Easier to store these as constants
@@ -79,6 +81,11 @@ IOS_COMMANDS = {
     "show_mac_address": ["show mac-address-table", "show mac address-table"]
 }
 
+# lines of the configs left out of the diffs computed offline, see `compare_config`
+CONFIG_DIFF_IGNORE = (
+    r"Building configuration|Current configuration|end$|ntp clock-period"
+)
+
 AFI_COMMAND_MAP = {
     "IPv4 Unicast": "ipv4 unicast",
     "IPv6 Unicast": "ipv6 unicast",
@@ -94,9 +101,24 @@ AFI_COMMAND_MAP = {
 }
 
 
+class IOSConfigTree(ConfigTree):
+    """Tree of an IOS configuration, see :class:`napalm.base.config_tree.ConfigTree`."""
+
+    INDENT = " "
+
+
 class IOSDriver(NetworkDriver):
     """NAPALM Cisco IOS Handler."""
 
+    _TRACED_TRANSPORT_METHODS = (
+        "send_command",
+        "send_command_timing",
+        "send_command_expect",
+        "send_config_set",
+    )
+    _PARSE_CACHE_METHODS = ("_send_command",)
+    _SAVE_CONFIG_METHOD = "_save_config"
+
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         """NAPALM Cisco IOS Handler."""
         if optional_args is None:
@@ -119,6 +141,10 @@ class IOSDriver(NetworkDriver):
 
         # None will cause autodetection of dest_file_system
         self._dest_file_system = optional_args.get("dest_file_system", None)
+        # MD5 of the files uploaded, to skip uploading the same candidate again
+        self.upload_cache = UploadCache.from_optional_arg(
+            optional_args.get("upload_cache")
+        )
         self.auto_rollback_on_error = optional_args.get("auto_rollback_on_error", True)
 
         # Control automatic toggling of 'file prompt quiet' for file operations
@@ -137,8 +163,17 @@ class IOSDriver(NetworkDriver):
         self.profile = [self.platform]
         self.use_canonical_interface = optional_args.get("canonical_int", False)
 
+        # compute the diffs locally, from the running config, see `compare_config`
+        self.offline_diff = optional_args.get("offline_diff", False)
+        self._candidate = None
+        self._running_config_tree = None
+
+        if optional_args.get("parse_cache", False):
+            self.enable_parse_cache()
+
     def open(self):
         """Open a connection to the device."""
+        self._running_config_tree = None
         device_type = "cisco_ios"
         if self.transport == "telnet":
             device_type = "cisco_ios_telnet"
@@ -235,13 +270,13 @@ class IOSDriver(NetworkDriver):
                     file_system=file_system,
                 )
             else:
-                # Use SCP
-                tmp_file = self._create_tmp_file(source_config)
-                (return_status, msg) = self._scp_file(
-                    source_file=tmp_file, dest_file=dest_file, file_system=file_system
+                # Use SCP, streaming the config from memory
+                (return_status, msg) = self._xfer_file(
+                    source_config=source_config,
+                    dest_file=dest_file,
+                    file_system=file_system,
+                    TransferClass=config_transfer,
                 )
-                if tmp_file and os.path.isfile(tmp_file):
-                    os.remove(tmp_file)
         if source_file:
             if self.inline_transfer:
                 (return_status, msg) = self._inline_tcl_xfer(
@@ -275,6 +310,7 @@ class IOSDriver(NetworkDriver):
         )
         if not return_status:
             raise ReplaceConfigException(msg)
+        self._keep_candidate(filename, config)
 
     def load_merge_candidate(self, filename=None, config=None):
         """
@@ -291,6 +327,16 @@ class IOSDriver(NetworkDriver):
         )
         if not return_status:
             raise MergeConfigException(msg)
+        self._keep_candidate(filename, config)
+
+    def _keep_candidate(self, filename=None, config=None):
+        """Keep a copy of the candidate config loaded, to compare it offline."""
+        if not self.offline_diff:
+            return
+        if config is None:
+            with open(filename) as f:
+                config = f.read()
+        self._candidate = config
 
     def _normalize_compare_config(self, diff):
         """Filter out strings that should not show up in the diff."""
@@ -368,7 +414,12 @@ class IOSDriver(NetworkDriver):
         show archive config differences <base_file> <new_file>.
 
         Default operation is to compare system:running-config to self.candidate_cfg
+
+        With the offline_diff optional argument, the diff is computed locally instead, from
+        the running config retrieved once until the config is changed.
         """
+        if self.offline_diff:
+            return self._compare_config_offline()
         # Set defaults
         base_file = "running-config"
         base_file_system = "system:"
@@ -411,6 +462,21 @@ class IOSDriver(NetworkDriver):
 
         return diff.strip()
 
+    def _compare_config_offline(self):
+        if self._candidate is None:
+            return ""
+        if self._running_config_tree is None:
+            self._running_config_tree = IOSConfigTree.parse(
+                self.get_config(retrieve="running")["running"],
+                ignore=CONFIG_DIFF_IGNORE,
+            )
+        candidate = IOSConfigTree.parse(self._candidate, ignore=CONFIG_DIFF_IGNORE)
+        if self.config_replace:
+            diff = self._running_config_tree.replace_diff(candidate)
+        else:
+            diff = self._running_config_tree.merge_changes(candidate)
+        return "\n".join(diff)
+
     def _file_prompt_quiet(f):
         """Decorator to toggle 'file prompt quiet' around methods that perform file operations."""
 
@@ -483,6 +549,7 @@ class IOSDriver(NetworkDriver):
             )
         # Always generate a rollback config on commit
         self._gen_rollback_cfg()
+        self._running_config_tree = None
 
         if self.config_replace:
             # Replace operation
@@ -521,10 +588,16 @@ class IOSDriver(NetworkDriver):
                 raise MergeConfigException(merge_error)
 
         # Save config to startup (both replace and merge)
-        output += self.device.save_config()
+        if self._save_on_commit:
+            output += self._save_config()
+
+    def _save_config(self):
+        """Save the running config to startup."""
+        return self.device.save_config()
 
     def discard_config(self):
         """Discard loaded candidate configurations."""
+        self._candidate = None
         self._discard_config()
 
     @_file_prompt_quiet
@@ -534,6 +607,11 @@ class IOSDriver(NetworkDriver):
             self._gen_full_path(self.candidate_cfg)
         )
         discard_merge = "copy null: {}".format(self._gen_full_path(self.merge_cfg))
+        if self.upload_cache is not None:
+            for filename in (self.candidate_cfg, self.merge_cfg):
+                self.upload_cache.invalidate(
+                    self.hostname, self.dest_file_system, filename
+                )
         self.device.send_command_expect(discard_candidate)
         self.device.send_command_expect(discard_merge)
 
@@ -544,6 +622,7 @@ class IOSDriver(NetworkDriver):
         if not self._check_file_exists(cfg_file):
             raise ReplaceConfigException("Rollback config file does not exist")
         cmd = "configure replace {} force".format(cfg_file)
+        self._running_config_tree = None
         self.device.send_command_expect(cmd)
 
         # Save config to startup
@@ -633,10 +712,23 @@ class IOSDriver(NetworkDriver):
         if self.inline_transfer:
             use_scp = False
 
-        with TransferClass(**kwargs) as transfer:
+        transfer = TransferClass(**kwargs)
+        if self.upload_cache is not None:
+            uploaded_md5 = self.upload_cache.get(self.hostname, file_system, dest_file)
+            if uploaded_md5 == transfer.source_md5:
+                msg = "File already uploaded with the same MD5: no transfer needed"
+                return (True, msg)
+            # uploading, the file is changed whatever the outcome
+            self.upload_cache.invalidate(self.hostname, file_system, dest_file)
+
+        with transfer:
 
-            # Check if file already exists and has correct MD5
-            if transfer.check_file_exists() and transfer.compare_md5():
+            # Check if file already exists and has correct MD5, unless it is known to differ
+            if (
+                self.upload_cache is None
+                and transfer.check_file_exists()
+                and transfer.compare_md5()
+            ):
                 msg = "File already exists and has correct MD5: no SCP needed"
                 return (True, msg)
             if not transfer.verify_space_available():
@@ -659,6 +751,10 @@ class IOSDriver(NetworkDriver):
 
             # Compares MD5 between local-remote files
             if transfer.verify_file():
+                if self.upload_cache is not None:
+                    self.upload_cache.set(
+                        self.hostname, file_system, dest_file, transfer.source_md5
+                    )
                 msg = "File successfully transferred to remote device"
                 return (True, msg)
             else:
@@ -1549,6 +1645,146 @@ class IOSDriver(NetworkDriver):
                 }
         return bgp_neighbor_data
 
+    def _bgp_neighbor_detail(self, neigh, raw_bgp_neigh):
+        """
+        Build the details of a BGP neighbor from its entry in ``show ip bgp all summary`` and
+        its ``show ip bgp <afi> neighbors`` output.
+        """
+        bgp_neigh = napalm.base.helpers.textfsm_extractor(
+            self, "ip_bgp_neigh", raw_bgp_neigh
+        )[0]
+        details = {
+            "up": neigh["up"] != "never",
+            "local_as": napalm.base.helpers.as_number(neigh["local_as"]),
+            "remote_as": napalm.base.helpers.as_number(neigh["remote_as"]),
+            "router_id": napalm.base.helpers.ip(bgp_neigh["router_id"])
+            if bgp_neigh["router_id"]
+            else "",
+            "local_address": napalm.base.helpers.ip(bgp_neigh["local_address"])
+            if bgp_neigh["local_address"]
+            else "",
+            "local_address_configured": False,
+            "local_port": napalm.base.helpers.as_number(bgp_neigh["local_port"])
+            if bgp_neigh["local_port"]
+            else 0,
+            "routing_table": bgp_neigh["vrf"] if bgp_neigh["vrf"] else "global",
+            "remote_address": napalm.base.helpers.ip(bgp_neigh["neighbor"]),
+            "remote_port": napalm.base.helpers.as_number(bgp_neigh["remote_port"])
+            if bgp_neigh["remote_port"]
+            else 0,
+            "multihop": False,
+            "multipath": False,
+            "remove_private_as": False,
+            "import_policy": "",
+            "export_policy": "",
+            "input_messages": napalm.base.helpers.as_number(bgp_neigh["msg_total_in"])
+            if bgp_neigh["msg_total_in"]
+            else 0,
+            "output_messages": napalm.base.helpers.as_number(bgp_neigh["msg_total_out"])
+            if bgp_neigh["msg_total_out"]
+            else 0,
+            "input_updates": napalm.base.helpers.as_number(bgp_neigh["msg_update_in"])
+            if bgp_neigh["msg_update_in"]
+            else 0,
+            "output_updates": napalm.base.helpers.as_number(bgp_neigh["msg_update_out"])
+            if bgp_neigh["msg_update_out"]
+            else 0,
+            "messages_queued_out": napalm.base.helpers.as_number(neigh["out_q"]),
+            "connection_state": bgp_neigh["bgp_state"],
+            "previous_connection_state": "",
+            "last_event": "",
+            "suppress_4byte_as": (
+                bgp_neigh["four_byte_as"] != "advertised and received"
+                if bgp_neigh["four_byte_as"]
+                else False
+            ),
+            "local_as_prepend": False,
+            "holdtime": napalm.base.helpers.as_number(bgp_neigh["holdtime"])
+            if bgp_neigh["holdtime"]
+            else 0,
+            "configured_holdtime": 0,
+            "keepalive": napalm.base.helpers.as_number(bgp_neigh["keepalive"])
+            if bgp_neigh["keepalive"]
+            else 0,
+            "configured_keepalive": 0,
+            "active_prefix_count": 0,
+            "received_prefix_count": 0,
+            "accepted_prefix_count": 0,
+            "suppressed_prefix_count": 0,
+            "advertised_prefix_count": 0,
+            "flap_count": 0,
+        }
+
+        bgp_neigh_afi = napalm.base.helpers.textfsm_extractor(
+            self, "ip_bgp_neigh_afi", raw_bgp_neigh
+        )
+        if len(bgp_neigh_afi) > 1:
+            bgp_neigh_afi = bgp_neigh_afi[1]
+            details.update(
+                {
+                    "local_address_configured": bgp_neigh_afi["local_addr_conf"] != "",
+                    "multipath": bgp_neigh_afi["multipaths"] != "0",
+                    "import_policy": bgp_neigh_afi["policy_in"],
+                    "export_policy": bgp_neigh_afi["policy_out"],
+                    "last_event": (
+                        bgp_neigh_afi["last_event"]
+                        if bgp_neigh_afi["last_event"] != "never"
+                        else ""
+                    ),
+                    "active_prefix_count": napalm.base.helpers.as_number(
+                        bgp_neigh_afi["bestpaths"]
+                    ),
+                    "received_prefix_count": napalm.base.helpers.as_number(
+                        bgp_neigh_afi["prefix_curr_in"]
+                    )
+                    + napalm.base.helpers.as_number(
+                        bgp_neigh_afi["rejected_prefix_in"]
+                    ),
+                    "accepted_prefix_count": napalm.base.helpers.as_number(
+                        bgp_neigh_afi["prefix_curr_in"]
+                    ),
+                    "suppressed_prefix_count": napalm.base.helpers.as_number(
+                        bgp_neigh_afi["rejected_prefix_in"]
+                    ),
+                    "advertised_prefix_count": napalm.base.helpers.as_number(
+                        bgp_neigh_afi["prefix_curr_out"]
+                    ),
+                    "flap_count": napalm.base.helpers.as_number(
+                        bgp_neigh_afi["flap_count"]
+                    ),
+                }
+            )
+        else:
+            bgp_neigh_afi = bgp_neigh_afi[0]
+            details.update(
+                {
+                    "import_policy": bgp_neigh_afi["policy_in"],
+                    "export_policy": bgp_neigh_afi["policy_out"],
+                }
+            )
+        return details
+
+    @staticmethod
+    def _split_bgp_neighbors(raw_bgp_neighs):
+        """
+        Split the output of ``show ip bgp <afi> neighbors`` per neighbor.
+
+        Returns a dictionary mapping each neighbor address to the list of its outputs, in the
+        order of the device: the same address can be used by neighbors in different VRFs.
+        """
+        neighbors = defaultdict(list)
+        lines = None
+        for line in raw_bgp_neighs.splitlines():
+            if line.startswith("BGP neighbor is "):
+                lines = []
+                neighbors[line.split()[3].rstrip(",")].append(lines)
+            if lines is not None:
+                lines.append(line)
+        return {
+            address: ["\n".join(lines) for lines in outputs]
+            for address, outputs in neighbors.items()
+        }
+
     def get_bgp_neighbors_detail(self, neighbor_address=""):
         bgp_detail = defaultdict(lambda: defaultdict(lambda: []))
 
@@ -1556,135 +1792,37 @@ class IOSDriver(NetworkDriver):
         bgp_sum = napalm.base.helpers.textfsm_extractor(
             self, "ip_bgp_all_sum", raw_bgp_sum
         )
-        for neigh in bgp_sum:
-            if neighbor_address and neighbor_address != neigh["neighbor"]:
-                continue
-            raw_bgp_neigh = self._send_command(
-                "show ip bgp {} neigh {}".format(
-                    AFI_COMMAND_MAP[neigh["addr_family"]], neigh["neighbor"]
-                )
-            )
-            bgp_neigh = napalm.base.helpers.textfsm_extractor(
-                self, "ip_bgp_neigh", raw_bgp_neigh
-            )[0]
-            details = {
-                "up": neigh["up"] != "never",
-                "local_as": napalm.base.helpers.as_number(neigh["local_as"]),
-                "remote_as": napalm.base.helpers.as_number(neigh["remote_as"]),
-                "router_id": napalm.base.helpers.ip(bgp_neigh["router_id"])
-                if bgp_neigh["router_id"]
-                else "",
-                "local_address": napalm.base.helpers.ip(bgp_neigh["local_address"])
-                if bgp_neigh["local_address"]
-                else "",
-                "local_address_configured": False,
-                "local_port": napalm.base.helpers.as_number(bgp_neigh["local_port"])
-                if bgp_neigh["local_port"]
-                else 0,
-                "routing_table": bgp_neigh["vrf"] if bgp_neigh["vrf"] else "global",
-                "remote_address": napalm.base.helpers.ip(bgp_neigh["neighbor"]),
-                "remote_port": napalm.base.helpers.as_number(bgp_neigh["remote_port"])
-                if bgp_neigh["remote_port"]
-                else 0,
-                "multihop": False,
-                "multipath": False,
-                "remove_private_as": False,
-                "import_policy": "",
-                "export_policy": "",
-                "input_messages": napalm.base.helpers.as_number(
-                    bgp_neigh["msg_total_in"]
-                )
-                if bgp_neigh["msg_total_in"]
-                else 0,
-                "output_messages": napalm.base.helpers.as_number(
-                    bgp_neigh["msg_total_out"]
-                )
-                if bgp_neigh["msg_total_out"]
-                else 0,
-                "input_updates": napalm.base.helpers.as_number(
-                    bgp_neigh["msg_update_in"]
-                )
-                if bgp_neigh["msg_update_in"]
-                else 0,
-                "output_updates": napalm.base.helpers.as_number(
-                    bgp_neigh["msg_update_out"]
+
+        raw_bgp_neighs = {}
+        if neighbor_address:
+            bgp_sum = [
+                neigh for neigh in bgp_sum if neigh["neighbor"] == neighbor_address
+            ]
+        else:
+            # one command per address family instead of one per neighbor
+            for neigh in bgp_sum:
+                afi = neigh["addr_family"]
+                if afi in raw_bgp_neighs:
+                    continue
+                raw_bgp_neighs[afi] = self._split_bgp_neighbors(
+                    self._send_command(
+                        "show ip bgp {} neigh".format(AFI_COMMAND_MAP[afi])
+                    )
                 )
-                if bgp_neigh["msg_update_out"]
-                else 0,
-                "messages_queued_out": napalm.base.helpers.as_number(neigh["out_q"]),
-                "connection_state": bgp_neigh["bgp_state"],
-                "previous_connection_state": "",
-                "last_event": "",
-                "suppress_4byte_as": (
-                    bgp_neigh["four_byte_as"] != "advertised and received"
-                    if bgp_neigh["four_byte_as"]
-                    else False
-                ),
-                "local_as_prepend": False,
-                "holdtime": napalm.base.helpers.as_number(bgp_neigh["holdtime"])
-                if bgp_neigh["holdtime"]
-                else 0,
-                "configured_holdtime": 0,
-                "keepalive": napalm.base.helpers.as_number(bgp_neigh["keepalive"])
-                if bgp_neigh["keepalive"]
-                else 0,
-                "configured_keepalive": 0,
-                "active_prefix_count": 0,
-                "received_prefix_count": 0,
-                "accepted_prefix_count": 0,
-                "suppressed_prefix_count": 0,
-                "advertised_prefix_count": 0,
-                "flap_count": 0,
-            }
 
-            bgp_neigh_afi = napalm.base.helpers.textfsm_extractor(
-                self, "ip_bgp_neigh_afi", raw_bgp_neigh
+        for neigh in bgp_sum:
+            outputs = raw_bgp_neighs.get(neigh["addr_family"], {}).get(
+                neigh["neighbor"]
             )
-            if len(bgp_neigh_afi) > 1:
-                bgp_neigh_afi = bgp_neigh_afi[1]
-                details.update(
-                    {
-                        "local_address_configured": bgp_neigh_afi["local_addr_conf"]
-                        != "",
-                        "multipath": bgp_neigh_afi["multipaths"] != "0",
-                        "import_policy": bgp_neigh_afi["policy_in"],
-                        "export_policy": bgp_neigh_afi["policy_out"],
-                        "last_event": (
-                            bgp_neigh_afi["last_event"]
-                            if bgp_neigh_afi["last_event"] != "never"
-                            else ""
-                        ),
-                        "active_prefix_count": napalm.base.helpers.as_number(
-                            bgp_neigh_afi["bestpaths"]
-                        ),
-                        "received_prefix_count": napalm.base.helpers.as_number(
-                            bgp_neigh_afi["prefix_curr_in"]
-                        )
-                        + napalm.base.helpers.as_number(
-                            bgp_neigh_afi["rejected_prefix_in"]
-                        ),
-                        "accepted_prefix_count": napalm.base.helpers.as_number(
-                            bgp_neigh_afi["prefix_curr_in"]
-                        ),
-                        "suppressed_prefix_count": napalm.base.helpers.as_number(
-                            bgp_neigh_afi["rejected_prefix_in"]
-                        ),
-                        "advertised_prefix_count": napalm.base.helpers.as_number(
-                            bgp_neigh_afi["prefix_curr_out"]
-                        ),
-                        "flap_count": napalm.base.helpers.as_number(
-                            bgp_neigh_afi["flap_count"]
-                        ),
-                    }
-                )
+            if outputs:
+                raw_bgp_neigh = outputs.pop(0)
             else:
-                bgp_neigh_afi = bgp_neigh_afi[0]
-                details.update(
-                    {
-                        "import_policy": bgp_neigh_afi["policy_in"],
-                        "export_policy": bgp_neigh_afi["policy_out"],
-                    }
+                raw_bgp_neigh = self._send_command(
+                    "show ip bgp {} neigh {}".format(
+                        AFI_COMMAND_MAP[neigh["addr_family"]], neigh["neighbor"]
+                    )
                 )
+            details = self._bgp_neighbor_detail(neigh, raw_bgp_neigh)
             bgp_detail[details["routing_table"]][details["remote_as"]].append(details)
         return bgp_detail
 
@@ -2444,7 +2582,60 @@ class IOSDriver(NetworkDriver):
             * ip_address (str)
             * rtt (float)
         """
-        ping_dict = {}
+        command = self._ping_command(
+            destination,
+            source=source,
+            ttl=ttl,
+            timeout=timeout,
+            size=size,
+            count=count,
+            vrf=vrf,
+        )
+        output = self._send_command(command)
+        return self._parse_ping_output(output, destination)
+
+    def ping_many(
+        self,
+        destinations,
+        source=C.PING_SOURCE,
+        ttl=C.PING_TTL,
+        timeout=C.PING_TIMEOUT,
+        size=C.PING_SIZE,
+        count=C.PING_COUNT,
+        vrf=C.PING_VRF,
+        workers=C.PROBE_WORKERS,
+    ):
+        """
+        Execute ping towards several destinations, using up to `workers` SSH sessions.
+
+        Returns a dictionary keyed by destination, having the same structure as `ping`.
+        """
+        commands = [
+            self._ping_command(
+                destination,
+                source=source,
+                ttl=ttl,
+                timeout=timeout,
+                size=size,
+                count=count,
+                vrf=vrf,
+            )
+            for destination in destinations
+        ]
+        try:
+            outputs = self._netmiko_send_parallel(commands, workers)
+        except (socket.error, EOFError) as e:
+            raise ConnectionClosedException(str(e))
+        return {
+            destination: self._parse_ping_output(
+                self._send_command_postprocess(output), destination
+            )
+            for destination, output in zip(destinations, outputs)
+        }
+
+    @staticmethod
+    def _ping_command(destination, source, ttl, timeout, size, count, vrf):
+        """Build the ping command for a single destination."""
         # vrf needs to be right after the ping command
         if vrf:
             command = "ping vrf {} {}".format(vrf, destination)
@@ -2455,8 +2646,12 @@ class IOSDriver(NetworkDriver):
         command += " repeat {}".format(count)
         if source != "":
             command += " source {}".format(source)
+        return command
 
-        output = self._send_command(command)
+    @staticmethod
+    def _parse_ping_output(output, destination):
+        """Parse the output of the ping command into the napalm ping structure."""
+        ping_dict = {}
         if "%" in output:
             ping_dict["error"] = output
         elif "Sending" in output:
@@ -2528,7 +2723,48 @@ class IOSDriver(NetworkDriver):
             * ip_address (str)
             * host_name (str)
         """
+        command = self._traceroute_command(
+            destination, source=source, ttl=ttl, timeout=timeout, vrf=vrf
+        )
+        output = self.device.send_command(
+            command, max_loops=self._traceroute_max_loops(ttl, timeout)
+        )
+        return self._parse_traceroute_output(output, destination)
+
+    def traceroute_many(
+        self,
+        destinations,
+        source=C.TRACEROUTE_SOURCE,
+        ttl=C.TRACEROUTE_TTL,
+        timeout=C.TRACEROUTE_TIMEOUT,
+        vrf=C.TRACEROUTE_VRF,
+        workers=C.PROBE_WORKERS,
+    ):
+        """
+        Execute traceroute towards several destinations, using up to `workers` SSH sessions.
+
+        Returns a dictionary keyed by destination, having the same structure as `traceroute`.
+        """
+        commands = [
+            self._traceroute_command(
+                destination, source=source, ttl=ttl, timeout=timeout, vrf=vrf
+            )
+            for destination in destinations
+        ]
+        try:
+            outputs = self._netmiko_send_parallel(
+                commands, workers, max_loops=self._traceroute_max_loops(ttl, timeout)
+            )
+        except (socket.error, EOFError) as e:
+            raise ConnectionClosedException(str(e))
+        return {
+            destination: self._parse_traceroute_output(output, destination)
+            for destination, output in zip(destinations, outputs)
+        }
 
+    @staticmethod
+    def _traceroute_command(destination, source, ttl, timeout, vrf):
+        """Build the traceroute command for a single destination."""
         # vrf needs to be right after the traceroute command
         if vrf:
             command = "traceroute vrf {} {}".format(vrf, destination)
@@ -2543,14 +2779,21 @@ class IOSDriver(NetworkDriver):
             # Timeout should be an integer between 1 and 3600
             if isinstance(timeout, int) and 1 <= timeout <= 3600:
                 command += " timeout {}".format(str(timeout))
+        return command
 
+    @staticmethod
+    def _traceroute_max_loops(ttl, timeout):
+        """Number of send_command loops to wait for the traceroute to complete."""
         # Calculation to leave enough time for traceroute to complete assumes send_command
         # delay of .2 seconds.
         max_loops = (5 * ttl * timeout) + 150
         if max_loops < 500:  # Make sure max_loops isn't set artificially low
             max_loops = 500
-        output = self.device.send_command(command, max_loops=max_loops)
+        return max_loops
 
+    @staticmethod
+    def _parse_traceroute_output(output, destination):
+        """Parse the output of the traceroute command into the napalm traceroute structure."""
         # Prepare return dict
         traceroute_dict = dict()
         if re.search("Unrecognized host or address", output):
@@ -2679,7 +2922,7 @@ class IOSDriver(NetworkDriver):
             }
         return instances if not name else instances[name]
 
-    def get_config(self, retrieve="all"):
+    def get_config(self, retrieve="all", section=None):
         """Implementation of get_config for IOS.
 
         Returns the startup or/and running configuration as dictionary.
@@ -2689,14 +2932,16 @@ class IOSDriver(NetworkDriver):
         """
 
         configs = {"startup": "", "running": "", "candidate": ""}
+        # the sections are filtered by the device
+        pipe = " | section {}".format(section) if section else ""
 
         if retrieve in ("startup", "all"):
-            command = "show startup-config"
+            command = "show startup-config" + pipe
             output = self._send_command(command)
             configs["startup"] = output
 
         if retrieve in ("running", "all"):
-            command = "show running-config"
+            command = "show running-config" + pipe
             output = self._send_command(command)
             configs["running"] = output
 
@@ -4,6 +4,9 @@ from __future__ import unicode_literals
 
 from napalm.base.constants import *  # noqa
 
+# get_bgp_neighbors retrieves all the VRFs in a single request up to this number of neighbors
+BGP_BULK_MAX_NEIGHBORS = 500
+
 SR_638170159_SOLVED = False
 # this flag says if the Cisco TAC SR 638170159
 # has been solved
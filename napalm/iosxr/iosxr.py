@@ -18,6 +18,7 @@ from __future__ import unicode_literals
 # import stdlib
 import re
 import copy
+from io import BytesIO
 from collections import defaultdict
 
 # import third party lib
@@ -47,6 +48,12 @@ from napalm.base.utils.py23_compat import text_type
 class IOSXRDriver(NetworkDriver):
     """IOS-XR driver class: inherits NetworkDriver from napalm.base."""
 
+    _TRACED_TRANSPORT_METHODS = (
+        "make_rpc_call",
+        "_execute_show",
+        "_execute_config_show",
+    )
+
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         self.hostname = hostname
         self.username = username
@@ -57,6 +64,9 @@ class IOSXRDriver(NetworkDriver):
         if optional_args is None:
             optional_args = {}
         self.lock_on_connect = optional_args.get("config_lock", False)
+        self.bgp_bulk_max_neighbors = optional_args.get(
+            "bgp_bulk_max_neighbors", C.BGP_BULK_MAX_NEIGHBORS
+        )
 
         self.netmiko_optional_args = netmiko_args(optional_args)
         try:
@@ -357,6 +367,160 @@ class IOSXRDriver(NetworkDriver):
 
         return interface_counters
 
+    @staticmethod
+    def _get_bgp_vrf_neighbors(vrf_node):
+        """
+        Extract the router ID and the neighbors of a VRF from its ``DefaultVRF`` or ``VRF``
+        node of the BGP ``InstanceActive`` operational data.
+        """
+        this_vrf = {
+            "router_id": napalm.base.helpers.convert(
+                text_type,
+                napalm.base.helpers.find_txt(
+                    vrf_node, "GlobalProcessInfo/VRF/RouterID"
+                ),
+            ),
+            "peers": {},
+        }
+        for neighbor in vrf_node.xpath("NeighborTable/Neighbor"):
+            this_neighbor = {}
+            this_neighbor["local_as"] = napalm.base.helpers.convert(
+                int, napalm.base.helpers.find_txt(neighbor, "LocalAS")
+            )
+            this_neighbor["remote_as"] = napalm.base.helpers.convert(
+                int, napalm.base.helpers.find_txt(neighbor, "RemoteAS")
+            )
+            this_neighbor["remote_id"] = napalm.base.helpers.convert(
+                text_type, napalm.base.helpers.find_txt(neighbor, "RouterID")
+            )
+
+            try:
+                this_neighbor["description"] = napalm.base.helpers.convert(
+                    text_type, napalm.base.helpers.find_txt(neighbor, "Description")
+                )
+            except AttributeError:
+                this_neighbor["description"] = ""
+
+            this_neighbor["is_enabled"] = (
+                napalm.base.helpers.find_txt(neighbor, "ConnectionAdminStatus") == "1"
+            )
+
+            if (
+                str(napalm.base.helpers.find_txt(neighbor, "ConnectionState"))
+                == "BGP_ST_ESTAB"
+            ):
+                this_neighbor["is_up"] = True
+                this_neighbor["uptime"] = napalm.base.helpers.convert(
+                    int,
+                    napalm.base.helpers.find_txt(neighbor, "ConnectionEstablishedTime"),
+                )
+            else:
+                this_neighbor["is_up"] = False
+                this_neighbor["uptime"] = -1
+
+            this_neighbor["address_family"] = {}
+
+            if (
+                napalm.base.helpers.find_txt(neighbor, "ConnectionRemoteAddress/AFI")
+                == "IPv4"
+            ):
+                this_afi = "ipv4"
+            elif (
+                napalm.base.helpers.find_txt(neighbor, "ConnectionRemoteAddress/AFI")
+                == "IPv6"
+            ):
+                this_afi = "ipv6"
+            else:
+                this_afi = napalm.base.helpers.find_txt(
+                    neighbor, "ConnectionRemoteAddress/AFI"
+                )
+
+            this_neighbor["address_family"][this_afi] = {}
+
+            try:
+                this_neighbor["address_family"][this_afi][
+                    "received_prefixes"
+                ] = napalm.base.helpers.convert(
+                    int,
+                    napalm.base.helpers.find_txt(
+                        neighbor, "AFData/Entry/PrefixesAccepted"
+                    ),
+                    0,
+                ) + napalm.base.helpers.convert(
+                    int,
+                    napalm.base.helpers.find_txt(
+                        neighbor, "AFData/Entry/PrefixesDenied"
+                    ),
+                    0,
+                )
+                this_neighbor["address_family"][this_afi][
+                    "accepted_prefixes"
+                ] = napalm.base.helpers.convert(
+                    int,
+                    napalm.base.helpers.find_txt(
+                        neighbor, "AFData/Entry/PrefixesAccepted"
+                    ),
+                    0,
+                )
+                this_neighbor["address_family"][this_afi][
+                    "sent_prefixes"
+                ] = napalm.base.helpers.convert(
+                    int,
+                    napalm.base.helpers.find_txt(
+                        neighbor, "AFData/Entry/PrefixesAdvertised"
+                    ),
+                    0,
+                )
+            except AttributeError:
+                this_neighbor["address_family"][this_afi]["received_prefixes"] = -1
+                this_neighbor["address_family"][this_afi]["accepted_prefixes"] = -1
+                this_neighbor["address_family"][this_afi]["sent_prefixes"] = -1
+
+            neighbor_ip = napalm.base.helpers.ip(
+                napalm.base.helpers.find_txt(
+                    neighbor, "Naming/NeighborAddress/IPV4Address"
+                )
+                or napalm.base.helpers.find_txt(
+                    neighbor, "Naming/NeighborAddress/IPV6Address"
+                )
+            )
+
+            this_vrf["peers"][neighbor_ip] = this_neighbor
+        return this_vrf
+
+    def _get_bgp_neighbors_bulk(self):
+        """
+        Retrieve the BGP neighbors of the default VRF and of all the VRFs in a single request.
+        The reply is parsed incrementally, one VRF at a time, discarding each VRF once parsed.
+        """
+        rpc_command = (
+            "<Get><Operational><BGP><InstanceTable><Instance><Naming>"
+            "<InstanceName>default</InstanceName></Naming><InstanceActive>"
+            "<DefaultVRF><GlobalProcessInfo></GlobalProcessInfo><NeighborTable>"
+            "</NeighborTable></DefaultVRF>"
+            "<VRFTable><VRF><GlobalProcessInfo></GlobalProcessInfo><NeighborTable>"
+            "</NeighborTable></VRF></VRFTable>"
+            "</InstanceActive></Instance></InstanceTable></BGP></Operational></Get>"
+        )
+        reply = self.device.make_rpc_call(rpc_command)
+        if isinstance(reply, text_type):
+            reply = reply.encode("utf-8")
+
+        result = {}
+        for _, node in ETREE.iterparse(BytesIO(reply), tag=("DefaultVRF", "VRF")):
+            if node.tag == "DefaultVRF":
+                result["global"] = self._get_bgp_vrf_neighbors(node)
+            elif node.getparent().tag == "VRFTable":
+                vrf_name = napalm.base.helpers.find_txt(node, "Naming/VRFName")
+                result[vrf_name] = self._get_bgp_vrf_neighbors(node)
+            else:
+                # GlobalProcessInfo/VRF, part of the VRF being parsed
+                continue
+            node.clear()
+            while node.getprevious() is not None:
+                del node.getparent()[0]
+        return result
+
     def get_bgp_neighbors(self):
         def generate_vrf_query(vrf_name):
             """
@@ -396,163 +560,32 @@ class IOSXRDriver(NetworkDriver):
         for node in result_tree.xpath(".//ConfigVRF"):
             active_vrfs.append(napalm.base.helpers.find_txt(node, "Naming/VRFName"))
 
+        # The size of the operational data grows with the number of neighbors: as long as the
+        #   VRFs have less than `bgp_bulk_max_neighbors` neighbors configured, request the whole
+        #   InstanceActive subtree at once instead of one request per VRF.
+        vrf_neighbors = result_tree.xpath(
+            ".//ConfigVRF//EntityConfiguration[Naming/EntityType='Neighbor']"
+        )
+        if len(active_vrfs) > 1 and len(vrf_neighbors) <= self.bgp_bulk_max_neighbors:
+            result = self._get_bgp_neighbors_bulk()
+            # the VRFs configured without operational data, as in the per-VRF requests
+            for vrf in active_vrfs:
+                result.setdefault(vrf, {"router_id": "", "peers": {}})
+            return result
+
         result = {}
 
         for vrf in active_vrfs:
             rpc_command = generate_vrf_query(vrf)
             result_tree = ETREE.fromstring(self.device.make_rpc_call(rpc_command))
-
-            this_vrf = {}
-            this_vrf["peers"] = {}
-
             if vrf == "global":
-                this_vrf["router_id"] = napalm.base.helpers.convert(
-                    text_type,
-                    napalm.base.helpers.find_txt(
-                        result_tree,
-                        "Get/Operational/BGP/InstanceTable/Instance/InstanceActive/DefaultVRF"
-                        "/GlobalProcessInfo/VRF/RouterID",
-                    ),
-                )
+                vrf_nodes = result_tree.xpath(".//InstanceActive/DefaultVRF")
             else:
-                this_vrf["router_id"] = napalm.base.helpers.convert(
-                    text_type,
-                    napalm.base.helpers.find_txt(
-                        result_tree,
-                        "Get/Operational/BGP/InstanceTable/Instance/InstanceActive/VRFTable/VRF"
-                        "/GlobalProcessInfo/VRF/RouterID",
-                    ),
-                )
-
-            neighbors = {}
-
-            for neighbor in result_tree.xpath(".//Neighbor"):
-                this_neighbor = {}
-                this_neighbor["local_as"] = napalm.base.helpers.convert(
-                    int, napalm.base.helpers.find_txt(neighbor, "LocalAS")
-                )
-                this_neighbor["remote_as"] = napalm.base.helpers.convert(
-                    int, napalm.base.helpers.find_txt(neighbor, "RemoteAS")
-                )
-                this_neighbor["remote_id"] = napalm.base.helpers.convert(
-                    text_type, napalm.base.helpers.find_txt(neighbor, "RouterID")
-                )
-
-                if (
-                    napalm.base.helpers.find_txt(neighbor, "ConnectionAdminStatus")
-                    is "1"
-                ):
-                    this_neighbor["is_enabled"] = True
-                try:
-                    this_neighbor["description"] = napalm.base.helpers.convert(
-                        text_type, napalm.base.helpers.find_txt(neighbor, "Description")
-                    )
-                except AttributeError:
-                    this_neighbor["description"] = ""
-
-                this_neighbor["is_enabled"] = (
-                    napalm.base.helpers.find_txt(neighbor, "ConnectionAdminStatus")
-                    == "1"
-                )
-
-                if (
-                    str(napalm.base.helpers.find_txt(neighbor, "ConnectionAdminStatus"))
-                    is "1"
-                ):
-                    this_neighbor["is_enabled"] = True
-                else:
-                    this_neighbor["is_enabled"] = False
-
-                if (
-                    str(napalm.base.helpers.find_txt(neighbor, "ConnectionState"))
-                    == "BGP_ST_ESTAB"
-                ):
-                    this_neighbor["is_up"] = True
-                    this_neighbor["uptime"] = napalm.base.helpers.convert(
-                        int,
-                        napalm.base.helpers.find_txt(
-                            neighbor, "ConnectionEstablishedTime"
-                        ),
-                    )
-                else:
-                    this_neighbor["is_up"] = False
-                    this_neighbor["uptime"] = -1
-
-                this_neighbor["address_family"] = {}
-
-                if (
-                    napalm.base.helpers.find_txt(
-                        neighbor, "ConnectionRemoteAddress/AFI"
-                    )
-                    == "IPv4"
-                ):
-                    this_afi = "ipv4"
-                elif (
-                    napalm.base.helpers.find_txt(
-                        neighbor, "ConnectionRemoteAddress/AFI"
-                    )
-                    == "IPv6"
-                ):
-                    this_afi = "ipv6"
-                else:
-                    this_afi = napalm.base.helpers.find_txt(
-                        neighbor, "ConnectionRemoteAddress/AFI"
-                    )
-
-                this_neighbor["address_family"][this_afi] = {}
-
-                try:
-                    this_neighbor["address_family"][this_afi][
-                        "received_prefixes"
-                    ] = napalm.base.helpers.convert(
-                        int,
-                        napalm.base.helpers.find_txt(
-                            neighbor, "AFData/Entry/PrefixesAccepted"
-                        ),
-                        0,
-                    ) + napalm.base.helpers.convert(
-                        int,
-                        napalm.base.helpers.find_txt(
-                            neighbor, "AFData/Entry/PrefixesDenied"
-                        ),
-                        0,
-                    )
-                    this_neighbor["address_family"][this_afi][
-                        "accepted_prefixes"
-                    ] = napalm.base.helpers.convert(
-                        int,
-                        napalm.base.helpers.find_txt(
-                            neighbor, "AFData/Entry/PrefixesAccepted"
-                        ),
-                        0,
-                    )
-                    this_neighbor["address_family"][this_afi][
-                        "sent_prefixes"
-                    ] = napalm.base.helpers.convert(
-                        int,
-                        napalm.base.helpers.find_txt(
-                            neighbor, "AFData/Entry/PrefixesAdvertised"
-                        ),
-                        0,
-                    )
-                except AttributeError:
-                    this_neighbor["address_family"][this_afi]["received_prefixes"] = -1
-                    this_neighbor["address_family"][this_afi]["accepted_prefixes"] = -1
-                    this_neighbor["address_family"][this_afi]["sent_prefixes"] = -1
-
-                neighbor_ip = napalm.base.helpers.ip(
-                    napalm.base.helpers.find_txt(
-                        neighbor, "Naming/NeighborAddress/IPV4Address"
-                    )
-                    or napalm.base.helpers.find_txt(
-                        neighbor, "Naming/NeighborAddress/IPV6Address"
-                    )
-                )
-
-                neighbors[neighbor_ip] = this_neighbor
-
-            this_vrf["peers"] = neighbors
-            result[vrf] = this_vrf
+                vrf_nodes = result_tree.xpath(".//InstanceActive/VRFTable/VRF")
+            if vrf_nodes:
+                result[vrf] = self._get_bgp_vrf_neighbors(vrf_nodes[0])
+            else:
+                result[vrf] = {"router_id": "", "peers": {}}
 
         return result
 
@@ -1631,7 +1664,7 @@ class IOSXRDriver(NetworkDriver):
 
         return mac_table
 
-    def get_route_to(self, destination="", protocol=""):
+    def get_route_to(self, destination="", protocol="", vrf=""):
 
         routes = {}
 
@@ -1656,166 +1689,272 @@ class IOSXRDriver(NetworkDriver):
         except AddrFormatError:
             raise TypeError("Wrong destination IP Address!")
 
+        vrfs = self._route_to_vrfs(vrf)
+        route_info_rpc_command = self._route_to_rpc(
+            ipv,
+            vrfs,
+            "<Route><Naming><Address>{network}</Address>{prefix}</Naming></Route>".format(
+                network=network, prefix=prefix_tag
+            ),
+        )
+
+        routes_tree = ETREE.fromstring(
+            self.device.make_rpc_call(route_info_rpc_command)
+        )
+
+        for route in routes_tree.xpath(".//Route"):
+            route_details = self._route_to_details(route, protocol, vrfs[0])
+            if route_details is None:
+                continue
+            destination, destination_routes = route_details
+            routes.setdefault(destination, []).extend(destination_routes)
+
+        return routes
+
+    def iter_routes(self, destination="", protocol="", vrf=""):
+        """
+        Yield the routes to a destination, or all the routes when no destination is specified.
+        The reply of the device is parsed incrementally, discarding each route once yielded.
+        """
+        if not isinstance(destination, py23_compat.string_types):
+            raise TypeError("Please specify a valid destination!")
+
+        protocol = protocol.lower()
+        if protocol == "direct":
+            protocol = "connected"
+
+        vrfs = self._route_to_vrfs(vrf)
+        if destination:
+            dest_split = destination.split("/")
+            prefix_tag = ""
+            if len(dest_split) == 2:
+                prefix_tag = "<PrefixLength>{prefix_length}</PrefixLength>".format(
+                    prefix_length=dest_split[1]
+                )
+            try:
+                ipv = IPAddress(dest_split[0]).version
+            except AddrFormatError:
+                raise TypeError("Wrong destination IP Address!")
+            lookups = [
+                (
+                    ipv,
+                    "<Route><Naming><Address>{network}</Address>{prefix}</Naming>"
+                    "</Route>".format(network=dest_split[0], prefix=prefix_tag),
+                )
+            ]
+        else:
+            # the whole IPv4 and IPv6 routing tables
+            lookups = [(4, ""), (6, "")]
+
+        for ipv, route_filter in lookups:
+            reply = self.device.make_rpc_call(
+                self._route_to_rpc(ipv, vrfs, route_filter)
+            )
+            if isinstance(reply, text_type):
+                reply = reply.encode("utf-8")
+            for _, route in ETREE.iterparse(BytesIO(reply), tag="Route"):
+                route_details = self._route_to_details(route, protocol, vrfs[0])
+                route.clear()
+                while route.getprevious() is not None:
+                    del route.getparent()[0]
+                if route_details is None:
+                    continue
+                destination, destination_routes = route_details
+                for route_detail in destination_routes:
+                    yield destination, route_detail
+
+    @staticmethod
+    def _route_to_vrfs(vrf):
+        """Return the list of VRFs to look the routes up in, the default VRF by default."""
+        if not vrf:
+            return ["default"]
+        elif isinstance(vrf, py23_compat.string_types):
+            return [vrf]
+        return list(vrf)
+
+    @staticmethod
+    def _route_to_rpc(ipv, vrfs, route_filter):
+        """
+        Build the request retrieving the routes matching `route_filter` from the RIB of all the
+        VRFs, in a single request. An empty filter matches all the routes.
+        """
         if ipv == 6:
             route_info_rpc_command = (
-                "<Get><Operational><IPV6_RIB><VRFTable><VRF><Naming><VRFName>"
-                "default</VRFName></Naming><AFTable><AF><Naming><AFName>IPv6</AFName></Naming>"
+                "<Get><Operational><IPV6_RIB><VRFTable>{vrfs}</VRFTable></IPV6_RIB>"
+                "</Operational></Get>"
+            )
+            vrf_rpc_command = (
+                "<VRF><Naming><VRFName>"
+                "{vrf}</VRFName></Naming><AFTable><AF><Naming><AFName>IPv6</AFName></Naming>"
                 "<SAFTable>"
                 "<SAF><Naming><SAFName>Unicast</SAFName></Naming><IP_RIBRouteTable><IP_RIBRoute>"
                 "<Naming>"
-                "<RouteTableName>default</RouteTableName></Naming><RouteTable><Route><Naming>"
-                "<Address>"
-                "{network}</Address>{prefix}</Naming></Route></RouteTable></IP_RIBRoute>"
-                "</IP_RIBRouteTable></SAF></SAFTable></AF></AFTable></VRF></VRFTable></IPV6_RIB>"
-                "</Operational></Get>"
-            ).format(network=network, prefix=prefix_tag)
+                "<RouteTableName>default</RouteTableName></Naming><RouteTable>{route}"
+                "</RouteTable></IP_RIBRoute>"
+                "</IP_RIBRouteTable></SAF></SAFTable></AF></AFTable></VRF>"
+            )
         else:
             route_info_rpc_command = (
-                "<Get><Operational><RIB><VRFTable><VRF><Naming><VRFName>"
-                "default"
+                "<Get><Operational><RIB><VRFTable>{vrfs}</VRFTable></RIB>"
+                "</Operational></Get>"
+            )
+            vrf_rpc_command = (
+                "<VRF><Naming><VRFName>"
+                "{vrf}"
                 "</VRFName></Naming><AFTable><AF><Naming><AFName>IPv4</AFName></Naming>"
                 "<SAFTable><SAF>"
                 "<Naming><SAFName>Unicast</SAFName></Naming><IP_RIBRouteTable><IP_RIBRoute>"
                 "<Naming>"
-                "<RouteTableName>default</RouteTableName></Naming><RouteTable><Route><Naming>"
-                "<Address>"
-                "{network}</Address>{prefix}</Naming></Route></RouteTable></IP_RIBRoute>"
+                "<RouteTableName>default</RouteTableName></Naming><RouteTable>{route}"
+                "</RouteTable></IP_RIBRoute>"
                 "</IP_RIBRouteTable>"
-                "</SAF></SAFTable></AF></AFTable></VRF></VRFTable></RIB></Operational></Get>"
-            ).format(network=network, prefix=prefix_tag)
-
-        routes_tree = ETREE.fromstring(
-            self.device.make_rpc_call(route_info_rpc_command)
+                "</SAF></SAFTable></AF></AFTable></VRF>"
+            )
+        return route_info_rpc_command.format(
+            vrfs="".join(
+                vrf_rpc_command.format(vrf=_vrf, route=route_filter) for _vrf in vrfs
+            )
         )
 
-        for route in routes_tree.xpath(".//Route"):
-            route_protocol = napalm.base.helpers.convert(
-                text_type, napalm.base.helpers.find_txt(route, "ProtocolName").lower()
-            )
-            if protocol and route_protocol != protocol:
-                continue  # ignore routes learned via a different protocol
-                # only in case the user requested a certain protocol
-            route_details = {}
-            address = napalm.base.helpers.find_txt(route, "Prefix")
-            length = napalm.base.helpers.find_txt(route, "PrefixLength")
+    def _route_to_details(self, route, protocol, default_vrf):
+        """
+        Parse a <Route> element of the RIB, returning the prefix and the list of its routes,
+        or None when the route was learned via a different protocol than `protocol`.
+        """
+        route_protocol = napalm.base.helpers.convert(
+            text_type, napalm.base.helpers.find_txt(route, "ProtocolName").lower()
+        )
+        if protocol and route_protocol != protocol:
+            return None  # ignore routes learned via a different protocol
+            # only in case the user requested a certain protocol
+        route_details = {}
+        address = napalm.base.helpers.find_txt(route, "Prefix")
+        length = napalm.base.helpers.find_txt(route, "PrefixLength")
+
+        priority = napalm.base.helpers.convert(
+            int, napalm.base.helpers.find_txt(route, "Priority")
+        )
+        age = napalm.base.helpers.convert(
+            int, napalm.base.helpers.find_txt(route, "RouteAge")
+        )
+        destination = napalm.base.helpers.convert(
+            text_type, "{prefix}/{length}".format(prefix=address, length=length)
+        )
+        routes = []
+        routing_table = (
+            napalm.base.helpers.find_txt(route, "ancestor::VRF/Naming/VRFName")
+            or default_vrf
+        )
 
-            priority = napalm.base.helpers.convert(
-                int, napalm.base.helpers.find_txt(route, "Priority")
-            )
-            age = napalm.base.helpers.convert(
-                int, napalm.base.helpers.find_txt(route, "RouteAge")
-            )
-            destination = napalm.base.helpers.convert(
-                text_type, "{prefix}/{length}".format(prefix=address, length=length)
-            )
-            if destination not in routes.keys():
-                routes[destination] = []
-
-            route_details = {
-                "current_active": False,
-                "last_active": False,
-                "age": age,
-                "next_hop": "",
-                "protocol": route_protocol,
-                "outgoing_interface": "",
-                "preference": priority,
-                "selected_next_hop": False,
-                "inactive_reason": "",
-                "routing_table": "default",
-                "protocol_attributes": {},
-            }
+        route_details = {
+            "current_active": False,
+            "last_active": False,
+            "age": age,
+            "next_hop": "",
+            "protocol": route_protocol,
+            "outgoing_interface": "",
+            "preference": priority,
+            "selected_next_hop": False,
+            "inactive_reason": "",
+            "routing_table": routing_table,
+            "protocol_attributes": {},
+        }
 
-            # from BGP will try to get some more information
-            if route_protocol == "bgp" and C.SR_638170159_SOLVED:
-                # looks like IOS-XR does not filter correctly
-                # !IMPORTANT
-                bgp_route_info_rpc_command = "<Get><Operational><BGP><Active><DefaultVRF><AFTable>\
-                <AF><Naming><AFName>IPv4Unicast</AFName></Naming><PathTable><Path><Naming><Network>\
-                <IPV4Address>{network}</IPV4Address><IPV4PrefixLength>{prefix_len}\
-                </IPV4PrefixLength></Network></Naming></Path></PathTable></AF></AFTable>\
-                </DefaultVRF></Active></BGP></Operational></Get>".format(
-                    network=network, prefix_len=dest_split[-1]
-                )
-                bgp_route_tree = ETREE.fromstring(
-                    self.device.make_rpc_call(bgp_route_info_rpc_command)
-                )
-                for bgp_path in bgp_route_tree.xpath(".//Path"):
-                    single_route_details = route_details.copy()
-                    if "NotFound" not in bgp_path.keys():
-                        best_path = (
-                            napalm.base.helpers.find_txt(
-                                bgp_path, "PathInformation/IsBestPath"
-                            )
-                            == "true"
-                        )
-                        local_preference = napalm.base.helpers.convert(
-                            int,
-                            napalm.base.helpers.find_txt(
-                                bgp_path,
-                                "AttributesAfterPolicyIn/CommonAttributes/LocalPreference",
-                            ),
-                            0,
+        # from BGP will try to get some more information
+        if (
+            route_protocol == "bgp"
+            and routing_table == "default"
+            and C.SR_638170159_SOLVED
+        ):
+            # looks like IOS-XR does not filter correctly
+            # !IMPORTANT
+            bgp_route_info_rpc_command = "<Get><Operational><BGP><Active><DefaultVRF><AFTable>\
+            <AF><Naming><AFName>IPv4Unicast</AFName></Naming><PathTable><Path><Naming><Network>\
+            <IPV4Address>{network}</IPV4Address><IPV4PrefixLength>{prefix_len}\
+            </IPV4PrefixLength></Network></Naming></Path></PathTable></AF></AFTable>\
+            </DefaultVRF></Active></BGP></Operational></Get>".format(
+                network=address, prefix_len=length
+            )
+            bgp_route_tree = ETREE.fromstring(
+                self.device.make_rpc_call(bgp_route_info_rpc_command)
+            )
+            for bgp_path in bgp_route_tree.xpath(".//Path"):
+                single_route_details = route_details.copy()
+                if "NotFound" not in bgp_path.keys():
+                    best_path = (
+                        napalm.base.helpers.find_txt(
+                            bgp_path, "PathInformation/IsBestPath"
                         )
-                        local_preference = napalm.base.helpers.convert(
-                            int,
-                            napalm.base.helpers.find_txt(
-                                bgp_path,
-                                "AttributesAfterPolicyIn/CommonAttributes/LocalPreference",
-                            ),
-                            0,
+                        == "true"
+                    )
+                    local_preference = napalm.base.helpers.convert(
+                        int,
+                        napalm.base.helpers.find_txt(
+                            bgp_path,
+                            "AttributesAfterPolicyIn/CommonAttributes/LocalPreference",
+                        ),
+                        0,
+                    )
+                    local_preference = napalm.base.helpers.convert(
+                        int,
+                        napalm.base.helpers.find_txt(
+                            bgp_path,
+                            "AttributesAfterPolicyIn/CommonAttributes/LocalPreference",
+                        ),
+                        0,
+                    )
+                    remote_as = napalm.base.helpers.convert(
+                        int,
+                        napalm.base.helpers.find_txt(
+                            bgp_path,
+                            "AttributesAfterPolicyIn/CommonAttributes/NeighborAS",
+                        ),
+                        0,
+                    )
+                    remote_address = napalm.base.helpers.ip(
+                        napalm.base.helpers.find_txt(
+                            bgp_path, "PathInformation/NeighborAddress/IPV4Address"
                         )
-                        remote_as = napalm.base.helpers.convert(
-                            int,
-                            napalm.base.helpers.find_txt(
-                                bgp_path,
-                                "AttributesAfterPolicyIn/CommonAttributes/NeighborAS",
-                            ),
-                            0,
+                        or napalm.base.helpers.find_txt(
+                            bgp_path, "PathInformation/NeighborAddress/IPV6Address"
                         )
-                        remote_address = napalm.base.helpers.ip(
-                            napalm.base.helpers.find_txt(
-                                bgp_path, "PathInformation/NeighborAddress/IPV4Address"
-                            )
-                            or napalm.base.helpers.find_txt(
-                                bgp_path, "PathInformation/NeighborAddress/IPV6Address"
+                    )
+                    as_path = " ".join(
+                        [
+                            bgp_as.text
+                            for bgp_as in bgp_path.xpath(
+                                "AttributesAfterPolicyIn/CommonAttributes/NeighborAS/Entry"
                             )
-                        )
-                        as_path = " ".join(
-                            [
-                                bgp_as.text
-                                for bgp_as in bgp_path.xpath(
-                                    "AttributesAfterPolicyIn/CommonAttributes/NeighborAS/Entry"
-                                )
-                            ]
-                        )
-                        next_hop = napalm.base.helpers.find_txt(
-                            bgp_path, "PathInformation/NextHop/IPV4Address"
-                        ) or napalm.base.helpers.find_txt(
-                            bgp_path, "PathInformation/NextHop/IPV6Address"
-                        )
-                        single_route_details["current_active"] = best_path
-                        single_route_details["next_hop"] = next_hop
-                        single_route_details["protocol_attributes"] = {
-                            "local_preference": local_preference,
-                            "as_path": as_path,
-                            "remote_as": remote_as,
-                            "remote_address": remote_address,
-                        }
-                    routes[destination].append(single_route_details)
-            else:
-                first_route = True
-                for route_entry in route.xpath("RoutePath/Entry"):
-                    # get all possible entries
-                    next_hop = napalm.base.helpers.find_txt(route_entry, "Address")
-                    single_route_details = {}
-                    single_route_details.update(route_details)
-                    single_route_details.update(
-                        {"current_active": first_route, "next_hop": next_hop}
+                        ]
+                    )
+                    next_hop = napalm.base.helpers.find_txt(
+                        bgp_path, "PathInformation/NextHop/IPV4Address"
+                    ) or napalm.base.helpers.find_txt(
+                        bgp_path, "PathInformation/NextHop/IPV6Address"
                     )
-                    routes[destination].append(single_route_details)
-                    first_route = False
+                    single_route_details["current_active"] = best_path
+                    single_route_details["next_hop"] = next_hop
+                    single_route_details["protocol_attributes"] = {
+                        "local_preference": local_preference,
+                        "as_path": as_path,
+                        "remote_as": remote_as,
+                        "remote_address": remote_address,
+                    }
+                routes.append(single_route_details)
+        else:
+            first_route = True
+            for route_entry in route.xpath("RoutePath/Entry"):
+                # get all possible entries
+                next_hop = napalm.base.helpers.find_txt(route_entry, "Address")
+                single_route_details = {}
+                single_route_details.update(route_details)
+                single_route_details.update(
+                    {"current_active": first_route, "next_hop": next_hop}
+                )
+                routes.append(single_route_details)
+                first_route = False
 
-        return routes
+        return destination, routes
 
     def get_snmp_information(self):
 
@@ -2216,7 +2355,7 @@ class IOSXRDriver(NetworkDriver):
 
         return users
 
-    def get_config(self, retrieve="all"):
+    def get_config(self, retrieve="all", section=None):
 
         config = {"startup": "", "running": "", "candidate": ""}  # default values
 
@@ -2229,4 +2368,9 @@ class IOSXRDriver(NetworkDriver):
                 self.device._execute_config_show("show configuration merge")
             )
 
+        if section:
+            config = {
+                store: napalm.base.helpers.config_section(text, section)
+                for store, text in config.items()
+            }
         return config
@@ -60,6 +60,8 @@ log = logging.getLogger(__file__)
 class JunOSDriver(NetworkDriver):
     """JunOSDriver class - inherits NetworkDriver from napalm.base."""
 
+    _TRACED_TRANSPORT_METHODS = ("execute", "cli")
+
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         """
         Initialise JunOS driver.
@@ -601,6 +603,17 @@ class JunOSDriver(NetworkDriver):
         else:
             return value
 
+    @staticmethod
+    def _bgp_neighbors_provide_instance(neighbor_data):
+        """
+        Whether the routing instance of every BGP neighbor is available (``peer-fwd-rti``), so
+        the neighbors of all the routing instances can be retrieved with a single request. The
+        uptimes are not part of it: see get_bgp_neighbors.
+        """
+        return bool(neighbor_data) and all(
+            dict(bgp_neighbor[1]).get("peer_fwd_rti") for bgp_neighbor in neighbor_data
+        )
+
     def get_bgp_neighbors(self):
         """Return BGP neighbors details."""
         bgp_neighbor_data = {}
@@ -628,16 +641,11 @@ class JunOSDriver(NetworkDriver):
                 ).items()
             return uptime_table_lookup[instance]
 
-        def _get_bgp_neighbors_core(
-            neighbor_data, instance=None, uptime_table_items=None
-        ):
+        def _get_bgp_neighbors_core(neighbor_data, instance=None):
             """
-            Make sure to execute a simple request whenever using
-            junos > 13. This is a helper used to avoid code redundancy
-            and reuse the function also when iterating through the list
-            BGP neighbors under a specific routing instance,
-            also when the device is capable to return the routing
-            instance name at the BGP neighbor level.
+            Parse a list of BGP neighbors. When `instance` is not specified, the routing
+            instance of each neighbor is read from its details (``peer-fwd-rti``), i.e. the
+            neighbors of all the routing instances have been retrieved in a single request.
             """
             for bgp_neighbor in neighbor_data:
                 peer_ip = napalm.base.helpers.ip(bgp_neighbor[0].split("+")[0])
@@ -649,17 +657,14 @@ class JunOSDriver(NetworkDriver):
                         if elem[1] is not None
                     }
                 )
-                if not instance:
-                    # not instance, means newer Junos version,
-                    # as we request everything in a single request
-                    peer_fwd_rti = neighbor_details.pop("peer_fwd_rti")
-                    instance = peer_fwd_rti
-                else:
-                    # instance is explicitly requests,
-                    # thus it's an old Junos, so we retrieve the BGP neighbors
-                    # under a certain routing instance
-                    peer_fwd_rti = neighbor_details.pop("peer_fwd_rti", "")
-                instance_name = "global" if instance == "master" else instance
+                peer_fwd_rti = neighbor_details.pop("peer_fwd_rti", "")
+                neighbor_instance = instance or peer_fwd_rti
+                if neighbor_instance.startswith("__"):
+                    # junos internal instances
+                    continue
+                instance_name = (
+                    "global" if neighbor_instance == "master" else neighbor_instance
+                )
                 if instance_name not in bgp_neighbor_data:
                     bgp_neighbor_data[instance_name] = {}
                 if "router_id" not in bgp_neighbor_data[instance_name]:
@@ -675,61 +680,45 @@ class JunOSDriver(NetworkDriver):
                 peer["local_as"] = napalm.base.helpers.as_number(peer["local_as"])
                 peer["remote_as"] = napalm.base.helpers.as_number(peer["remote_as"])
                 peer["address_family"] = self._parse_route_stats(
-                    neighbor_details, instance
+                    neighbor_details, neighbor_instance
                 )
                 if "peers" not in bgp_neighbor_data[instance_name]:
                     bgp_neighbor_data[instance_name]["peers"] = {}
                 bgp_neighbor_data[instance_name]["peers"][peer_ip] = peer
-                if not uptime_table_items:
-                    uptime_table_items = _get_uptime_table(instance)
-                for neighbor, uptime in uptime_table_items:
-                    normalized_neighbor = napalm.base.helpers.ip(neighbor)
-                    if (
-                        normalized_neighbor
-                        not in bgp_neighbor_data[instance_name]["peers"]
-                    ):
-                        bgp_neighbor_data[instance_name]["peers"][
-                            normalized_neighbor
-                        ] = {}
-                    bgp_neighbor_data[instance_name]["peers"][normalized_neighbor][
-                        "uptime"
-                    ] = uptime[0][1]
-
-        # Commenting out the following sections, till Junos
-        #   will provide a way to identify the routing instance name
-        #   from the details of the BGP neighbor
-        #   currently, there are Junos 15 version having a field called `peer_fwd_rti`
-        #   but unfortunately, this is not consistent.
-        # Junos 17 might have this fixed, but this needs to be revisited later.
-        # In the definition below, `old_junos` means a version that does not provide
-        #   the forwarding RTI information.
-        #
-        # old_junos = napalm.base.helpers.convert(
-        #     int, self.device.facts.get('version', '0.0').split('.')[0], 0) < 15
-
-        # if old_junos:
-        instances = junos_views.junos_route_instance_table(self.device).get()
-        for instance, instance_data in instances.items():
-            if instance.startswith("__"):
-                # junos internal instances
-                continue
-            bgp_neighbor_data[instance] = {"peers": {}}
-            instance_neighbors = bgp_neighbors_table.get(instance=instance).items()
-            uptime_table_items = uptime_table.get(instance=instance).items()
-            _get_bgp_neighbors_core(
-                instance_neighbors,
-                instance=instance,
-                uptime_table_items=uptime_table_items,
-            )
-        # If the OS provides the `peer_fwd_rti` or any way to identify the
-        #   routing instance name (see above), the performances of this getter
-        #   can be significantly improved, as we won't execute one request
-        #   for each an every RT.
-        # However, this improvement would only be beneficial for multi-VRF envs.
-        #
-        # else:
-        #     instance_neighbors = bgp_neighbors_table.get().items()
-        #     _get_bgp_neighbors_core(instance_neighbors)
+
+        def _set_uptimes(instance, uptime_table_items):
+            instance_name = "global" if instance == "master" else instance
+            peers = bgp_neighbor_data[instance_name].setdefault("peers", {})
+            for neighbor, uptime in uptime_table_items:
+                peer = peers.setdefault(napalm.base.helpers.ip(neighbor), {})
+                peer["uptime"] = dict(uptime)["uptime"]
+
+        # Junos versions providing the routing instance of the neighbors (`peer_fwd_rti`)
+        #   let us retrieve the neighbors of all the routing instances with a single request.
+        #   The uptimes still take one summary request per routing instance having neighbors:
+        #   the summary of all the routing instances does not identify the routing instance
+        #   of each neighbor. That is 1 + N requests, N the number of instances with
+        #   neighbors, instead of listing the routing instances then sending 2 requests for
+        #   each and every one of them.
+        neighbor_data = bgp_neighbors_table.get().items()
+        if self._bgp_neighbors_provide_instance(neighbor_data):
+            _get_bgp_neighbors_core(neighbor_data)
+            for instance_name in list(bgp_neighbor_data):
+                instance = "master" if instance_name == "global" else instance_name
+                _set_uptimes(instance, _get_uptime_table(instance))
+        else:
+            # Older Junos versions: request the neighbors under each routing instance.
+            instances = junos_views.junos_route_instance_table(self.device).get()
+            for instance, instance_data in instances.items():
+                if instance.startswith("__"):
+                    # junos internal instances
+                    continue
+                bgp_neighbor_data[instance] = {"peers": {}}
+                instance_neighbors = bgp_neighbors_table.get(instance=instance).items()
+                if not instance_neighbors:
+                    continue
+                _get_bgp_neighbors_core(instance_neighbors, instance=instance)
+                _set_uptimes(instance, _get_uptime_table(instance))
         bgp_tmp_dict = {}
         for k, v in bgp_neighbor_data.items():
             if bgp_neighbor_data[k]["peers"]:
@@ -1286,7 +1275,8 @@ class JunOSDriver(NetworkDriver):
             as in get_bgp_neighbors: iterate through the list of network instances
             then execute one request for each and every routing instance.
             For newer junos, this is not necessary as the routing instance is available
-            and we can get everything solve in a single request.
+            and we can get everything solve in a single request: `instance` is not
+            specified and the routing instance is read from the details of each neighbor.
             """
             for bgp_neighbor in neighbor_data:
                 remote_as = int(bgp_neighbor[0])
@@ -1298,12 +1288,14 @@ class JunOSDriver(NetworkDriver):
                         if elem[1] is not None
                     }
                 )
-                if not instance:
-                    peer_fwd_rti = neighbor_details.pop("peer_fwd_rti")
-                    instance = peer_fwd_rti
-                else:
-                    peer_fwd_rti = neighbor_details.pop("peer_fwd_rti", "")
-                instance_name = "global" if instance == "master" else instance
+                peer_fwd_rti = neighbor_details.pop("peer_fwd_rti", "")
+                neighbor_instance = instance or peer_fwd_rti
+                if neighbor_instance.startswith("__"):
+                    # junos internal instances
+                    continue
+                instance_name = (
+                    "global" if neighbor_instance == "master" else neighbor_instance
+                )
                 options = neighbor_details.pop("options", "")
                 if isinstance(options, str):
                     options_list = options.split()
@@ -1368,11 +1360,17 @@ class JunOSDriver(NetworkDriver):
                 neighbor_details.update(neighbor_rib_details)
                 bgp_neighbors[instance_name][remote_as].append(neighbor_details)
 
-        # old_junos = napalm.base.helpers.convert(
-        #     int, self.device.facts.get('version', '0.0').split('.')[0], 0) < 15
         bgp_neighbors_table = junos_views.junos_bgp_neighbors_table(self.device)
 
-        # if old_junos:
+        neighbor_data = bgp_neighbors_table.get(
+            neighbor_address=str(neighbor_address)
+        ).items()
+        if self._bgp_neighbors_provide_instance(neighbor_data):
+            # the neighbors of all the routing instances, in a single request
+            _bgp_iter_core(neighbor_data)
+            return bgp_neighbors
+
+        # Older Junos versions: request the neighbors under each routing instance.
         instances = junos_views.junos_route_instance_table(self.device)
         for instance, instance_data in instances.get().items():
             if instance.startswith("__"):
@@ -1382,10 +1380,6 @@ class JunOSDriver(NetworkDriver):
                 instance=instance, neighbor_address=str(neighbor_address)
             ).items()
             _bgp_iter_core(neighbor_data, instance=instance)
-        # else:
-        #     bgp_neighbors_table = junos_views.junos_bgp_neighbors_table(self.device)
-        #     neighbor_data = bgp_neighbors_table.get(neighbor_address=neighbor_address).items()
-        #     _bgp_iter_core(neighbor_data)
         return bgp_neighbors
 
     def get_arp_table(self):
@@ -1591,13 +1585,21 @@ class JunOSDriver(NetworkDriver):
 
         return mac_address_table
 
-    def get_route_to(self, destination="", protocol=""):
+    def get_route_to(self, destination="", protocol="", vrf=""):
         """Return route details to a specific destination, learned from a certain protocol."""
         routes = {}
 
         if not isinstance(destination, py23_compat.string_types):
             raise TypeError("Please specify a valid destination!")
 
+        if not vrf:
+            vrfs = []
+        elif isinstance(vrf, py23_compat.string_types):
+            vrfs = [vrf]
+        else:
+            vrfs = list(vrf)
+        vrfs = ["default" if _vrf == "master" else _vrf for _vrf in vrfs]
+
         if protocol and isinstance(destination, py23_compat.string_types):
             protocol = protocol.lower()
 
@@ -1645,6 +1647,9 @@ class JunOSDriver(NetworkDriver):
         rt_kargs = {"destination": destination}
         if protocol and isinstance(destination, py23_compat.string_types):
             rt_kargs["protocol"] = protocol
+        if len(vrfs) == 1 and vrfs[0] != "default":
+            # matches all the tables of the routing instance, e.g. VRF.inet.0 and VRF.inet6.0
+            rt_kargs["table"] = vrfs[0]
 
         try:
             routes_table.get(**rt_kargs)
@@ -1693,6 +1698,8 @@ class JunOSDriver(NetworkDriver):
             route_protocol = d.get("protocol").lower()
             if protocol and protocol != route_protocol:
                 continue
+            if vrfs and self._route_table_instance(d.get("routing_table")) not in vrfs:
+                continue
             communities = d.get("communities")
             if communities is not None and type(communities) is not list:
                 d["communities"] = [communities]
@@ -1713,6 +1720,21 @@ class JunOSDriver(NetworkDriver):
 
         return routes
 
+    def iter_routes(self, destination="", protocol="", vrf=""):
+        """Yield the routes to a destination, looking the routing table up in chunks."""
+        return self._iter_routes_paged(
+            destination, lambda page: self.get_route_to(page, protocol, vrf)
+        )
+
+    @staticmethod
+    def _route_table_instance(table):
+        """Return the routing instance of a routing table, e.g. VRF for VRF.inet.0."""
+        table = table or ""
+        if table.count(".") < 2:
+            # inet.0, inet6.0 etc. belong to the master instance
+            return "default"
+        return table.rsplit(".", 2)[0]
+
     def get_snmp_information(self):
         """Return the SNMP configuration."""
         snmp_information = {}
@@ -2220,17 +2242,23 @@ class JunOSDriver(NetworkDriver):
 
         return optics_detail
 
-    def get_config(self, retrieve="all"):
+    def get_config(self, retrieve="all", section=None):
+        # the section is a hierarchy, not the regular expression of the other platforms
+        if section and not re.match(r"^[\w-]+(/[\w-]+)*$", section):
+            raise ValueError(
+                "section must be a configuration hierarchy, e.g. protocols/bgp: "
+                "{}".format(section)
+            )
         rv = {"startup": "", "running": "", "candidate": ""}
 
         options = {"format": "text", "database": "candidate"}
 
         if retrieve in ("candidate", "all"):
-            config = self.device.rpc.get_config(filter_xml=None, options=options)
+            config = self.device.rpc.get_config(filter_xml=section, options=options)
             rv["candidate"] = py23_compat.text_type(config.text)
         if retrieve in ("running", "all"):
             options["database"] = "committed"
-            config = self.device.rpc.get_config(filter_xml=None, options=options)
+            config = self.device.rpc.get_config(filter_xml=section, options=options)
             rv["running"] = py23_compat.text_type(config.text)
         return rv
 
@@ -23,24 +23,27 @@ import time
 import tempfile
 import uuid
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
 # import third party lib
 from requests.exceptions import ConnectionError
 from netaddr import IPAddress
 from netaddr.core import AddrFormatError
-from netmiko import file_transfer
+from netmiko import FileTransfer
 from nxapi_plumbing import Device as NXOSDevice
 from nxapi_plumbing import NXAPIAuthError, NXAPIConnectionError, NXAPICommandError
 
 # import NAPALM Base
 import napalm.base.helpers
 from napalm.base import NetworkDriver
+from napalm.base.cache import UploadCache
+from napalm.base.config_tree import ConfigTree
 from napalm.base.utils import py23_compat
 from napalm.base.exceptions import ConnectionException
 from napalm.base.exceptions import MergeConfigException
 from napalm.base.exceptions import CommandErrorException
 from napalm.base.exceptions import ReplaceConfigException
-from napalm.base.netmiko_helpers import netmiko_args
+from napalm.base.netmiko_helpers import config_transfer, netmiko_args
 import napalm.base.constants as c
 
 
@@ -68,6 +71,8 @@ def ensure_netmiko_conn(func):
 class NXOSDriverBase(NetworkDriver):
     """Common code shared between nx-api and nxos_ssh."""
 
+    _SAVE_CONFIG_METHOD = "_copy_run_start"
+
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         if optional_args is None:
             optional_args = {}
@@ -79,9 +84,17 @@ class NXOSDriverBase(NetworkDriver):
         self.loaded = False
         self.changed = False
         self.merge_candidate = ""
+        # maximum number of commands sent at once when committing a merge, None for all
+        self.merge_chunk_size = optional_args.get("merge_chunk_size", None)
+        # parsed running config, kept until the config changes
+        self._running_config_tree = None
         self.candidate_cfg = "candidate_config.txt"
         self.rollback_cfg = "rollback_config.txt"
         self._dest_file_system = optional_args.pop("dest_file_system", "bootflash:")
+        # MD5 of the files uploaded, to skip uploading the same candidate again
+        self.upload_cache = UploadCache.from_optional_arg(
+            optional_args.get("upload_cache")
+        )
         self.netmiko_optional_args = netmiko_args(optional_args)
         self.device = None
 
@@ -93,24 +106,11 @@ class NXOSDriverBase(NetworkDriver):
                 "filename or config parameter must be provided."
             )
 
-        if not filename:
-            tmp_file = self._create_tmp_file(config)
-            filename = tmp_file
-        else:
-            if not os.path.isfile(filename):
-                raise ReplaceConfigException("File {} not found".format(filename))
+        if filename and not os.path.isfile(filename):
+            raise ReplaceConfigException("File {} not found".format(filename))
 
         try:
-            transfer_result = file_transfer(
-                self._netmiko_device,
-                source_file=filename,
-                dest_file=self.candidate_cfg,
-                file_system=self._dest_file_system,
-                direction="put",
-                overwrite_file=True,
-            )
-            if not transfer_result["file_exists"]:
-                raise ValueError()
+            self._upload_candidate(filename, config)
         except Exception:
             msg = (
                 "Could not transfer file. There was an error "
@@ -121,8 +121,53 @@ class NXOSDriverBase(NetworkDriver):
 
         self.replace = True
         self.loaded = True
-        if config and os.path.isfile(tmp_file):
-            os.remove(tmp_file)
+
+    def _upload_candidate(self, filename=None, config=None):
+        """
+        Upload the candidate config to the device, `config` being streamed from memory.
+
+        The upload is skipped when the file on the device has the same MD5 or, with the upload
+        cache, when the same file was uploaded last.
+        """
+        file_system = self._dest_file_system
+        if not filename:
+            transfer = config_transfer(
+                self._netmiko_device, config, self.candidate_cfg, file_system
+            )
+        else:
+            transfer = FileTransfer(
+                self._netmiko_device,
+                source_file=filename,
+                dest_file=self.candidate_cfg,
+                file_system=file_system,
+                direction="put",
+            )
+        if self.upload_cache is not None:
+            uploaded_md5 = self.upload_cache.get(
+                self.hostname, file_system, self.candidate_cfg
+            )
+            if uploaded_md5 == transfer.source_md5:
+                return
+            # uploading, the file is changed whatever the outcome
+            self.upload_cache.invalidate(self.hostname, file_system, self.candidate_cfg)
+
+        with transfer:
+            # the remote MD5 is only checked when unknown, being slow to compute
+            if (
+                self.upload_cache is None
+                and transfer.check_file_exists()
+                and transfer.compare_md5()
+            ):
+                return
+            if not transfer.verify_space_available():
+                raise ValueError("Insufficient space available on remote device")
+            transfer.transfer_file()
+            if not transfer.verify_file():
+                raise ValueError("MD5 failure between source and destination files")
+        if self.upload_cache is not None:
+            self.upload_cache.set(
+                self.hostname, file_system, self.candidate_cfg, transfer.source_md5
+            )
 
     def load_merge_candidate(self, filename=None, config=None):
         if not filename and not config:
@@ -140,11 +185,31 @@ class NXOSDriverBase(NetworkDriver):
     def _send_command(self, command, raw_text=False):
         raise NotImplementedError
 
+    def _send_command_parallel(self, commands, workers):
+        """Execute a list of commands concurrently and return the raw text outputs in order."""
+        raise NotImplementedError
+
+    def _merge_commands(self):
+        """Yield the (indentation, command) of the lines of the merge candidate."""
+        for line in self.merge_candidate.splitlines():
+            command = line.strip()
+            if command:
+                yield len(line) - len(line.lstrip()), command
+
     def _commit_merge(self):
+        """
+        Apply the merge candidate, rolling back on error.
+
+        With the `merge_chunk_size` optional argument, the candidate is sent in chunks of at most
+        that many commands, each of them checked for errors before the next one is sent.
+        """
         try:
-            output = self._send_config(self.merge_candidate)
-            if output and "Invalid command" in output:
-                raise MergeConfigException("Error while applying config!")
+            for chunk in napalm.base.helpers.config_chunks(
+                self._merge_commands(), self.merge_chunk_size
+            ):
+                output = self._send_config(chunk)
+                if output and "Invalid command" in output:
+                    raise MergeConfigException("Error while applying config!")
         except Exception as e:
             self.changed = True
             self.rollback()
@@ -163,15 +228,18 @@ class NXOSDriverBase(NetworkDriver):
         https://github.com/napalm-automation/napalm-nxos/issues/59
         therefore this method will return the real diff (but not necessarily what is
         being sent by the merge_load_config()
+
+        The lines are looked up in their section of the running config, retrieved once until
+        the config is changed.
         """
-        diff = []
-        running_config = self.get_config(retrieve="running")["running"]
-        running_lines = running_config.splitlines()
-        for line in self.merge_candidate.splitlines():
-            if line not in running_lines and line:
-                if line[0].strip() != "!":
-                    diff.append(line)
-        return "\n".join(diff)
+        candidate = ConfigTree.parse(self.merge_candidate)
+        return "\n".join(self._get_running_config_tree().merge_diff(candidate))
+
+    def _get_running_config_tree(self):
+        if self._running_config_tree is None:
+            running_config = self.get_config(retrieve="running")["running"]
+            self._running_config_tree = ConfigTree.parse(running_config)
+        return self._running_config_tree
 
     def _get_diff(self):
         """Get a diff between running config and a proposed file."""
@@ -216,12 +284,14 @@ class NXOSDriverBase(NetworkDriver):
             # Create checkpoint from current running-config
             self._save_to_checkpoint(self.rollback_cfg)
 
+            self._running_config_tree = None
             if self.replace:
                 self._load_cfg_from_checkpoint()
             else:
                 self._commit_merge()
 
-            self._copy_run_start()
+            if self._save_on_commit:
+                self._copy_run_start()
             self.loaded = False
         else:
             raise ReplaceConfigException("No config loaded.")
@@ -277,17 +347,65 @@ class NXOSDriverBase(NetworkDriver):
             * ip_address (str)
             * rtt (float)
         """
-        ping_dict = {}
+        command = self._ping_command(
+            destination,
+            source=source,
+            ttl=ttl,
+            timeout=timeout,
+            size=size,
+            count=count,
+            vrf=vrf,
+        )
+        output = self._send_command(command, raw_text=True)
+        return self._parse_ping_output(output, destination)
+
+    def ping_many(
+        self,
+        destinations,
+        source=c.PING_SOURCE,
+        ttl=c.PING_TTL,
+        timeout=c.PING_TIMEOUT,
+        size=c.PING_SIZE,
+        count=c.PING_COUNT,
+        vrf=c.PING_VRF,
+        workers=c.PROBE_WORKERS,
+    ):
+        """
+        Execute ping towards several destinations, running up to `workers` probes concurrently.
 
-        version = ""
+        Returns a dictionary keyed by destination, having the same structure as `ping`.
+        """
+        commands = [
+            self._ping_command(
+                destination,
+                source=source,
+                ttl=ttl,
+                timeout=timeout,
+                size=size,
+                count=count,
+                vrf=vrf,
+            )
+            for destination in destinations
+        ]
+        outputs = self._send_command_parallel(commands, workers)
+        return {
+            destination: self._parse_ping_output(output, destination)
+            for destination, output in zip(destinations, outputs)
+        }
+
+    @staticmethod
+    def _ip_version(destination):
+        """Return '6' for IPv6 destinations, empty string otherwise."""
         try:
-            version = "6" if IPAddress(destination).version == 6 else ""
+            return "6" if IPAddress(destination).version == 6 else ""
         except AddrFormatError:
             # Allow use of DNS names
-            pass
+            return ""
 
+    def _ping_command(self, destination, source, ttl, timeout, size, count, vrf):
+        """Build the ping command for a single destination."""
         command = "ping{version} {destination}".format(
-            version=version, destination=destination
+            version=self._ip_version(destination), destination=destination
         )
         command += " timeout {}".format(timeout)
         command += " packet-size {}".format(size)
@@ -297,7 +415,12 @@ class NXOSDriverBase(NetworkDriver):
 
         if vrf != "":
             command += " vrf {}".format(vrf)
-        output = self._send_command(command, raw_text=True)
+        return command
+
+    def _parse_ping_output(self, output, destination):
+        """Parse the output of the ping command into the napalm ping structure."""
+        ping_dict = {}
+        version = self._ip_version(destination)
 
         if "connect:" in output:
             ping_dict["error"] = output
@@ -385,7 +508,63 @@ class NXOSDriverBase(NetworkDriver):
         timeout=c.TRACEROUTE_TIMEOUT,
         vrf=c.TRACEROUTE_VRF,
     ):
+        command = self._traceroute_command(destination, source=source)
+        try:
+            traceroute_raw_output = self._send_command(command, raw_text=True)
+        except CommandErrorException:
+            return {
+                "error": "Cannot execute traceroute on the device: {}".format(command)
+            }
+        return self._parse_traceroute_output(traceroute_raw_output)
+
+    def traceroute_many(
+        self,
+        destinations,
+        source=c.TRACEROUTE_SOURCE,
+        ttl=c.TRACEROUTE_TTL,
+        timeout=c.TRACEROUTE_TIMEOUT,
+        vrf=c.TRACEROUTE_VRF,
+        workers=c.PROBE_WORKERS,
+    ):
+        """
+        Execute traceroute towards several destinations, running up to `workers` probes
+        concurrently.
+
+        Returns a dictionary keyed by destination, having the same structure as `traceroute`.
+        """
+        commands = [
+            self._traceroute_command(destination, source=source)
+            for destination in destinations
+        ]
+        try:
+            outputs = self._send_command_parallel(commands, workers)
+        except CommandErrorException:
+            # find out which of the destinations cannot be traced
+            return super().traceroute_many(
+                destinations, source=source, ttl=ttl, timeout=timeout, vrf=vrf
+            )
+        return {
+            destination: self._parse_traceroute_output(output)
+            for destination, output in zip(destinations, outputs)
+        }
+
+    def _traceroute_command(self, destination, source):
+        """Build the traceroute command for a single destination."""
+        version = self._ip_version(destination)
+        if source:
+            source_opt = "source {source}".format(source=source)
+            command = "traceroute{version} {destination} {source_opt}".format(
+                version=version, destination=destination, source_opt=source_opt
+            )
+        else:
+            command = "traceroute{version} {destination}".format(
+                version=version, destination=destination
+            )
+        return command
 
+    @staticmethod
+    def _parse_traceroute_output(traceroute_raw_output):
+        """Parse the output of the traceroute command into the napalm traceroute structure."""
         _HOP_ENTRY_PROBE = [
             r"\s+",
             r"(",  # beginning of host_name (ip_address) RTT group
@@ -408,30 +587,6 @@ class NXOSDriverBase(NetworkDriver):
         timeout = 5  # seconds
         probes = 3  # 3 probes/jop and this cannot be changed on NXOS!
 
-        version = ""
-        try:
-            version = "6" if IPAddress(destination).version == 6 else ""
-        except AddrFormatError:
-            # Allow use of DNS names
-            pass
-
-        if source:
-            source_opt = "source {source}".format(source=source)
-            command = "traceroute{version} {destination} {source_opt}".format(
-                version=version, destination=destination, source_opt=source_opt
-            )
-        else:
-            command = "traceroute{version} {destination}".format(
-                version=version, destination=destination
-            )
-
-        try:
-            traceroute_raw_output = self._send_command(command, raw_text=True)
-        except CommandErrorException:
-            return {
-                "error": "Cannot execute traceroute on the device: {}".format(command)
-            }
-
         hop_regex = "".join(_HOP_ENTRY + _HOP_ENTRY_PROBE * probes)
         traceroute_result["success"] = {}
         if traceroute_raw_output:
@@ -499,6 +654,10 @@ class NXOSDriverBase(NetworkDriver):
         self._send_command_list(commands)
 
     def _delete_file(self, filename):
+        if self.upload_cache is not None:
+            self.upload_cache.invalidate(
+                self.hostname, self._dest_file_system, filename
+            )
         commands = [
             "terminal dont-ask",
             "delete {}".format(filename),
@@ -518,16 +677,18 @@ class NXOSDriverBase(NetworkDriver):
     def _disable_confirmation(self):
         self._send_command_list(["terminal dont-ask"])
 
-    def get_config(self, retrieve="all"):
+    def get_config(self, retrieve="all", section=None):
         config = {"startup": "", "running": "", "candidate": ""}  # default values
+        # the sections are filtered by the device
+        pipe = " | section {}".format(section) if section else ""
 
         if retrieve.lower() in ("running", "all"):
-            command = "show running-config"
+            command = "show running-config" + pipe
             config["running"] = py23_compat.text_type(
                 self._send_command(command, raw_text=True)
             )
         if retrieve.lower() in ("startup", "all"):
-            command = "show startup-config"
+            command = "show startup-config" + pipe
             config["startup"] = py23_compat.text_type(
                 self._send_command(command, raw_text=True)
             )
@@ -595,6 +756,9 @@ class NXOSDriverBase(NetworkDriver):
 
 
 class NXOSDriver(NXOSDriverBase):
+
+    _TRACED_TRANSPORT_METHODS = ("show", "show_list", "config", "config_list")
+
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         super().__init__(
             hostname, username, password, timeout=timeout, optional_args=optional_args
@@ -615,6 +779,7 @@ class NXOSDriver(NXOSDriverBase):
         self.platform = "nxos"
 
     def open(self):
+        self._running_config_tree = None
         try:
             self.device = NXOSDevice(
                 host=self.hostname,
@@ -645,6 +810,20 @@ class NXOSDriver(NXOSDriverBase):
     def _send_command_list(self, commands):
         return self.device.config_list(commands)
 
+    def _send_command_parallel(self, commands, workers):
+        """Execute the commands using up to `workers` concurrent NX-API requests."""
+        workers = max(1, min(workers, len(commands)))
+        if workers == 1:
+            return [self._send_command(command, raw_text=True) for command in commands]
+        pool = ThreadPool(workers)
+        try:
+            return pool.map(
+                lambda command: self._send_command(command, raw_text=True), commands
+            )
+        finally:
+            pool.close()
+            pool.join()
+
     def _send_config(self, commands):
         if isinstance(commands, py23_compat.string_types):
             # Has to be a list generator and not generator expression (not JSON serializable)
@@ -763,6 +942,7 @@ class NXOSDriver(NXOSDriverBase):
 
     def rollback(self):
         if self.changed:
+            self._running_config_tree = None
             self.device.rollback(self.rollback_cfg)
             self._copy_run_start()
             self.changed = False
@@ -405,13 +405,25 @@ def bgp_summary_parser(bgp_summary):
 
 
 class NXOSSSHDriver(NXOSDriverBase):
+
+    _TRACED_TRANSPORT_METHODS = (
+        "send_command",
+        "send_command_timing",
+        "send_command_expect",
+        "send_config_set",
+    )
+    _PARSE_CACHE_METHODS = ("_send_command",)
+
     def __init__(self, hostname, username, password, timeout=60, optional_args=None):
         super().__init__(
             hostname, username, password, timeout=timeout, optional_args=optional_args
         )
         self.platform = "nxos_ssh"
+        if optional_args and optional_args.get("parse_cache", False):
+            self.enable_parse_cache()
 
     def open(self):
+        self._running_config_tree = None
         self.device = self._netmiko_open(
             device_type="cisco_nxos", netmiko_optional_args=self.netmiko_optional_args
         )
@@ -436,6 +448,10 @@ class NXOSSSHDriver(NXOSDriverBase):
             )
         return output
 
+    def _send_command_parallel(self, commands, workers):
+        """Execute the commands using up to `workers` concurrent SSH sessions."""
+        return self._netmiko_send_parallel(commands, workers)
+
     def _send_config(self, commands):
         if isinstance(commands, py23_compat.string_types):
             commands = (command for command in commands.splitlines() if command)
@@ -516,6 +532,7 @@ class NXOSSSHDriver(NXOSDriverBase):
 
     def rollback(self):
         if self.changed:
+            self._running_config_tree = None
             command = "rollback running-config file {}".format(self.rollback_cfg)
             result = self._send_command(command)
             if "completed" not in result.lower():
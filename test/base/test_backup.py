@@ -0,0 +1,92 @@
+"""Tests for the incremental backups of the configurations."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import tempfile
+
+import pytest
+
+from napalm.base import backup as backup_module
+from napalm.base.backup import ConfigBackup
+
+
+CONFIG = "".join("interface Ethernet{}\n   shutdown\n!\n".format(i) for i in range(50))
+
+
+class FakeDevice(object):
+    hostname = "pe01"
+
+    def __init__(self, configs):
+        self.configs = configs
+
+    def get_config(self, retrieve="all", section=None):
+        config = {"running": "", "startup": "", "candidate": ""}
+        config[retrieve] = self.configs[retrieve]
+        return config
+
+
+@pytest.fixture
+def backup():
+    directory = tempfile.mkdtemp()
+    store = ConfigBackup(os.path.join(directory, "backups.sqlite"), snapshot_interval=3)
+    yield store
+    store.close()
+
+
+def test_delta():
+    old = ["a\n", "b\n", "c\n", "d\n"]
+    new = ["a\n", "c\n", "x\n", "d\n", "e\n"]
+    ops = backup_module.delta(old, new)
+    assert backup_module.patch(old, ops) == new
+    assert ["-", ["b\n"]] in ops
+
+
+def test_versions(backup):
+    configs = [CONFIG]
+    for i in range(6):
+        configs.append(configs[-1].replace("Ethernet{}\n   shutdown".format(i), "X"))
+    for timestamp, config in enumerate(configs):
+        assert backup.save("pe01", config, timestamp=timestamp)["changed"]
+    # unchanged
+    assert backup.save("pe01", configs[-1], timestamp=10) == {
+        "version": 7,
+        "sha1": backup.versions("pe01")[-1]["sha1"],
+        "changed": False,
+    }
+    assert [version["version"] for version in backup.versions("pe01", since=4)] == [
+        6,
+        7,
+    ]
+    # rebuilt from the full copies and the deltas
+    for timestamp, config in enumerate(configs):
+        assert backup.get("pe01", at=timestamp) == config
+    assert backup.get("pe01") == configs[-1]
+    assert backup.get("pe01", at=-1) is None
+    assert backup.get("pe02") is None
+
+
+def test_changes(backup):
+    backup.save("pe01", CONFIG, timestamp=1)
+    backup.save("pe01", CONFIG + "ntp server 192.0.2.1\n", timestamp=2)
+    changes = backup.changes("pe01", since=0)
+    assert changes[0]["added"] == CONFIG.splitlines(True)
+    assert changes[1] == {
+        "version": 2,
+        "timestamp": 2,
+        "added": ["ntp server 192.0.2.1\n"],
+        "removed": [],
+    }
+    assert backup.changes("pe01", since=2) == []
+
+
+def test_backup(backup):
+    device = FakeDevice({"running": CONFIG, "startup": CONFIG})
+    result = backup.backup(device, stores=("running", "startup"))
+    assert result["running"]["changed"] and result["startup"]["changed"]
+    assert result["running"]["sha1"] == result["startup"]["sha1"]
+    # identical configurations share their copy
+    assert backup._db.execute("SELECT COUNT(*) FROM configs").fetchone() == (1,)
+    assert backup.get("pe01", store="startup") == CONFIG
@@ -0,0 +1,148 @@
+"""Tests for the persistent cache of the getters."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+
+import mock
+
+from napalm.base.base import NetworkDriver
+from napalm.base.cache import UploadCache
+
+
+class FakeDriver(NetworkDriver):
+    def __init__(self, hostname="fake"):
+        self.hostname = hostname
+        self.platform = "fake"
+        self.calls = 0
+        self.candidate = ""
+
+    def get_facts(self):
+        self.calls += 1
+        return {"hostname": self.hostname, "uptime": self.calls}
+
+    def get_users(self):
+        self.calls += 1
+        return {}
+
+    def get_interfaces(self):
+        self.calls += 1
+        return {}
+
+    def get_config(self, retrieve="all", section=None):
+        self.calls += 1
+        return {"running": "", "startup": "", "candidate": self.candidate}
+
+    def get_bgp_neighbors_detail(self, neighbor_address=""):
+        self.calls += 1
+        return {"global": {65001: []}}
+
+    def load_merge_candidate(self, filename=None, config=None):
+        self.candidate = config
+
+    def commit_config(self, message=""):
+        pass
+
+
+class TestGetterCache(object):
+    def test_cached(self, tmpdir):
+        path = os.path.join(str(tmpdir), "cache", "getters.sqlite")
+        d = FakeDriver()
+        cache = d.enable_getter_cache(path, ttls={"get_facts": 60})
+
+        assert d.get_facts() == d.get_facts() == {"hostname": "fake", "uptime": 1}
+        # only the getters having a TTL are cached
+        d.get_interfaces()
+        d.get_interfaces()
+        assert d.calls == 3
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_shared(self, tmpdir):
+        path = str(tmpdir.join("getters.sqlite"))
+        first = FakeDriver()
+        first.enable_getter_cache(path)
+        first.get_facts()
+
+        second = FakeDriver()
+        second.enable_getter_cache(path)
+        other = FakeDriver("other")
+        other.enable_getter_cache(path)
+
+        assert second.get_facts() == {"hostname": "fake", "uptime": 1}
+        assert second.calls == 0
+        # the results are per device
+        assert other.get_facts() == {"hostname": "other", "uptime": 1}
+
+    def test_enabled_twice(self, tmpdir):
+        d = FakeDriver()
+        cache = d.enable_getter_cache(str(tmpdir.join("getters.sqlite")))
+        with mock.patch("napalm.base.cache.GetterCache") as getter_cache:
+            assert d.enable_getter_cache(str(tmpdir.join("other.sqlite"))) is cache
+        assert not getter_cache.called
+
+        # the getters are not wrapped twice
+        d.get_facts()
+        d.get_facts()
+        assert d.calls == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expired(self, tmpdir):
+        d = FakeDriver()
+        d.enable_getter_cache(str(tmpdir.join("getters.sqlite")))
+        d.get_facts()
+
+        with mock.patch("time.time", return_value=10 ** 10):
+            assert d.get_facts()["uptime"] == 2
+
+    def test_invalidated_after_commit(self, tmpdir):
+        d = FakeDriver()
+        cache = d.enable_getter_cache(str(tmpdir.join("getters.sqlite")))
+        d.get_facts()
+        d.get_users()
+        cache.set("other", "fake", "get_facts", {"uptime": 10})
+
+        d.commit_config()
+
+        assert d.get_facts()["uptime"] == 3
+        assert cache.get("other", "fake", "get_facts") == {"uptime": 10}
+
+    def test_config_invalidated_after_load(self, tmpdir):
+        d = FakeDriver()
+        d.enable_getter_cache(str(tmpdir.join("getters.sqlite")))
+        d.get_facts()
+        assert d.get_config(retrieve="candidate")["candidate"] == ""
+
+        d.load_merge_candidate(config="hostname r1")
+
+        assert d.get_config(retrieve="candidate")["candidate"] == "hostname r1"
+        # the other getters are still cached
+        d.get_facts()
+        assert d.calls == 3
+
+    def test_not_json_serializable(self, tmpdir):
+        d = FakeDriver()
+        d.enable_getter_cache(
+            str(tmpdir.join("getters.sqlite")), ttls={"get_bgp_neighbors_detail": 60}
+        )
+
+        # the integer keys would be strings once loaded from JSON
+        assert d.get_bgp_neighbors_detail() == {"global": {65001: []}}
+        assert d.get_bgp_neighbors_detail() == {"global": {65001: []}}
+        assert d.calls == 2
+
+
+class TestUploadCache(object):
+    def test_record(self, tmpdir):
+        path = os.path.join(str(tmpdir), "getters.sqlite")
+        cache = UploadCache.from_optional_arg(path)
+
+        assert cache.get("r1", "flash:", "candidate_config.txt") is None
+        cache.set("r1", "flash:", "candidate_config.txt", "abc")
+        cache.set("r2", "flash:", "candidate_config.txt", "def")
+        assert UploadCache(path).get("r1", "flash:", "candidate_config.txt") == "abc"
+        cache.invalidate("r1", "flash:", "candidate_config.txt")
+        assert cache.get("r1", "flash:", "candidate_config.txt") is None
+        assert cache.get("r2", "flash:", "candidate_config.txt") == "def"
+        assert UploadCache.from_optional_arg(False) is None
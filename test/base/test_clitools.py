@@ -0,0 +1,319 @@
+"""Tests for the helpers of the napalm CLI."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import sys
+
+import mock
+import pytest
+
+from napalm.base.clitools import cl_napalm
+from napalm.base.clitools import helpers
+from napalm.base.clitools.helpers import load_inventory
+
+MOCK_PATH = os.path.join(os.path.dirname(__file__), "test_mock_driver")
+
+
+def _main(*argv):
+    """Run the CLI against the mock driver, return its exit status."""
+    argv = [
+        "napalm",
+        "--user",
+        "vagrant",
+        "--password",
+        "vagrant",
+        "--vendor",
+        "mock",
+        "--optional_args",
+        "path='{}'".format(MOCK_PATH),
+    ] + list(argv)
+    with mock.patch.object(sys, "argv", argv), mock.patch.object(
+        helpers, "configure_logging"
+    ):
+        try:
+            cl_napalm.main()
+        except SystemExit as e:
+            return e.code
+    return 0
+
+
+def test_load_inventory_csv(tmpdir):
+    path = str(tmpdir.join("inventory.csv"))
+    with io.open(path, "w") as stream:
+        stream.write(
+            "hostname,vendor,transport,optional_args\n"
+            "pe01,eos\n"
+            " pe02 , junos ,, port=830\n"
+        )
+
+    assert load_inventory(path) == [
+        # the fields missing from the short row default to the command line
+        {"hostname": "pe01", "vendor": "eos"},
+        {"hostname": "pe02", "vendor": "junos", "optional_args": {"port": 830}},
+    ]
+
+
+def test_load_inventory_unknown_field(tmpdir):
+    path = str(tmpdir.join("inventory.csv"))
+    with io.open(path, "w") as stream:
+        stream.write("hostname,vendor,transport\npe01,eos,https\n")
+
+    with pytest.raises(ValueError):
+        load_inventory(path)
+
+
+def test_json_dumps():
+    # the integer keys of the getters, e.g. the AS numbers of get_bgp_neighbors_detail
+    assert helpers.json_dumps({65001: [1.5, None]}) == '{"65001":[1.5,null]}'
+    # integers too large for orjson fall back to the standard library
+    assert helpers.json_dumps({"a": 2 ** 70}) == '{"a":1180591620717411303424}'
+    assert helpers.json_dumps({"a": 1}, pretty=True) == '{\n    "a": 1\n}'
+
+
+def test_json_dumps_orjson():
+    orjson = pytest.importorskip("orjson")
+    with mock.patch.object(helpers.orjson, "dumps", wraps=orjson.dumps) as dumps:
+        assert helpers.json_dumps({1: "a"}) == '{"1":"a"}'
+    assert dumps.call_args[1]["option"] == orjson.OPT_NON_STR_KEYS
+
+
+def test_write_result_msgpack():
+    stream = mock.Mock()
+    packb = mock.Mock(return_value=b"\x81\xa1a\x01")
+    with mock.patch.object(helpers, "msgpack", mock.Mock(packb=packb)):
+        helpers.write_result({"a": 1}, "msgpack", stream=stream)
+
+    # the bytes go to the binary buffer of the text stream
+    stream.buffer.write.assert_called_once_with(b"\x81\xa1a\x01")
+    packb.assert_called_once_with({"a": 1}, use_bin_type=True, default=str)
+    with mock.patch.object(helpers, "msgpack", None):
+        with pytest.raises(RuntimeError):
+            helpers.write_result({"a": 1}, "msgpack", stream=stream)
+
+
+def test_write_result_jsonl():
+    stream = io.StringIO()
+    helpers.write_result(
+        {"Ethernet1": {"is_up": True}, "Ethernet2": {}}, "jsonl", stream
+    )
+
+    assert sorted(stream.getvalue().splitlines()) == [
+        '{"Ethernet1":{"is_up":true}}',
+        '{"Ethernet2":{}}',
+    ]
+
+
+@pytest.mark.parametrize(
+    "fmt, lines_per_host", [(None, 1), ("compact", 1), ("jsonl", 1), ("json", None)]
+)
+def test_format_multiple_hosts(capsys, fmt, lines_per_host):
+    argv = ["--format", fmt] if fmt else []
+    assert _main(*(argv + ["pe01,pe02", "call", "get_facts"])) == 0
+
+    out = capsys.readouterr().out
+    if lines_per_host:
+        outputs = [json.loads(line) for line in out.splitlines()]
+    else:
+        # indented documents, one per host
+        decoder = json.JSONDecoder()
+        outputs, position = [], 0
+        while out[position:].strip():
+            position += len(out[position:]) - len(out[position:].lstrip())
+            output, position = decoder.raw_decode(out, position)
+            outputs.append(output)
+        assert len(out.splitlines()) > 2
+    assert sorted(o["hostname"] for o in outputs) == ["pe01", "pe02"]
+    assert all(o["result"]["hostname"] == "localhost" for o in outputs)
+
+
+def test_format_single_host(capsys):
+    assert _main("pe01", "call", "get_facts") == 0
+    assert json.loads(capsys.readouterr().out)["hostname"] == "localhost"
+
+    assert _main("--format", "compact", "pe01", "call", "get_facts") == 0
+    assert len(capsys.readouterr().out.splitlines()) == 1
+
+
+def test_timings(capsys):
+    assert _main("--timings", "pe01", "call", "get_facts") == 0
+
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["hostname"] == "localhost"
+    # one line per traced method, on stderr
+    methods = [line.split()[0] for line in captured.err.splitlines()]
+    assert methods == ["open", "get_facts", "close"]
+
+
+def test_timings_multiple_hosts(capsys):
+    assert _main("--timings", "pe01,pe02", "call", "get_facts") == 0
+
+    outputs = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(outputs) == 2
+    for output in outputs:
+        assert sorted(output["timings"]) == ["close", "get_facts", "open"]
+        assert sorted(output["timings"]["get_facts"]) == [
+            "count",
+            "parse_cpu_time",
+            "payload_size",
+            "transport_calls",
+            "transport_time",
+            "wall_time",
+        ]
+        assert output["timings"]["get_facts"]["count"] == 1
+
+
+def test_profile(capsys, tmpdir):
+    path = str(tmpdir.join("get_facts.prof"))
+    assert _main("--profile", path, "pe01", "call", "get_facts") == 0
+
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["hostname"] == "localhost"
+    # the cProfile table of the most expensive functions, sorted by cumulative time
+    assert "Ordered by: cumulative time" in captured.err
+    assert "ncalls" in captured.err
+    assert "(call_getter)" in captured.err
+    assert os.path.getsize(path) > 0
+
+
+def test_profile_multiple_hosts(capsys, tmpdir):
+    path = str(tmpdir.join("get_facts.prof"))
+    assert _main("--profile", path, "pe01,pe02", "call", "get_facts") == 2
+    assert "--profile is only supported for a single host" in capsys.readouterr().err
+
+
+def test_load_inventory_yaml(tmpdir):
+    mapping = str(tmpdir.join("inventory.yml"))
+    with io.open(mapping, "w") as stream:
+        stream.write(
+            "pe01:\n"
+            "pe02:\n"
+            "  vendor: junos\n"
+            "  username: netconf\n"
+            "  password: secret\n"
+            "  optional_args:\n"
+            "    port: 830\n"
+        )
+    listing = str(tmpdir.join("inventory.yaml"))
+    with io.open(listing, "w") as stream:
+        stream.write("- pe01\n- hostname: pe02\n  vendor: junos\n")
+
+    assert load_inventory(mapping) == [
+        {"hostname": "pe01"},
+        {
+            "hostname": "pe02",
+            "vendor": "junos",
+            "username": "netconf",
+            "password": "secret",
+            "optional_args": {"port": 830},
+        },
+    ]
+    assert load_inventory(listing) == [
+        {"hostname": "pe01"},
+        {"hostname": "pe02", "vendor": "junos"},
+    ]
+    assert helpers.parse_hosts(listing) == load_inventory(listing)
+    assert helpers.parse_hosts("pe01, pe02,") == [
+        {"hostname": "pe01"},
+        {"hostname": "pe02"},
+    ]
+
+
+def test_inventory_overrides(tmpdir):
+    path = str(tmpdir.join("inventory.yml"))
+    with io.open(path, "w") as stream:
+        stream.write(
+            "pe01:\n"
+            "pe02:\n"
+            "  vendor: eos\n"
+            "  username: admin\n"
+            "  password: secret\n"
+            "  optional_args:\n"
+            "    port: 12443\n"
+        )
+    with mock.patch.object(
+        sys, "argv", ["napalm", "-u", "vagrant", "-p", "vagrant", "-v", "ios", path]
+    ):
+        args = cl_napalm.build_help()
+    driver = mock.Mock()
+
+    with mock.patch.object(
+        cl_napalm, "get_network_driver", return_value=driver
+    ) as get_network_driver:
+        with mock.patch.object(
+            helpers, "parse_optional_args", return_value={"global_delay_factor": 2}
+        ):
+            for host in args.hosts:
+                cl_napalm.instantiate_host(args, host)
+
+    # the command line fills in what the inventory does not set
+    assert get_network_driver.call_args_list == [mock.call("ios"), mock.call("eos")]
+    assert driver.call_args_list == [
+        mock.call(
+            "pe01",
+            "vagrant",
+            password="vagrant",
+            timeout=60,
+            optional_args={"global_delay_factor": 2},
+        ),
+        mock.call(
+            "pe02",
+            "admin",
+            password="secret",
+            timeout=60,
+            optional_args={"port": 12443},
+        ),
+    ]
+
+
+def test_workers(capsys):
+    hosts = ",".join("pe{:02}".format(i) for i in range(6))
+    with mock.patch.object(
+        cl_napalm, "ThreadPool", wraps=cl_napalm.ThreadPool
+    ) as thread_pool:
+        assert _main("--workers", "4", hosts, "call", "get_facts") == 0
+    # never more workers than hosts
+    with mock.patch.object(
+        cl_napalm, "ThreadPool", wraps=cl_napalm.ThreadPool
+    ) as small_pool:
+        assert _main("--workers", "4", "pe01,pe02", "call", "get_facts") == 0
+
+    thread_pool.assert_called_once_with(4)
+    small_pool.assert_called_once_with(2)
+    outputs = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(o["hostname"] for o in outputs[:6]) == hosts.split(",")
+    assert all(o["error"] is None for o in outputs)
+
+
+def test_workers_invalid(capsys):
+    assert _main("--workers", "0", "pe01,pe02", "call", "get_facts") == 2
+    assert "--workers must be at least 1" in capsys.readouterr().err
+
+
+def test_failed_hosts(tmpdir, capsys):
+    path = str(tmpdir.join("inventory.yml"))
+    with io.open(path, "w") as stream:
+        stream.write(
+            "pe01:\n"
+            "pe02:\n"
+            "  optional_args:\n"
+            "    path: '{}'\n"
+            "    fail_on_open: true\n".format(MOCK_PATH)
+        )
+
+    assert _main(path, "call", "get_facts") == 1
+
+    outputs = {
+        o["hostname"]: o
+        for o in (json.loads(line) for line in capsys.readouterr().out.splitlines())
+    }
+    assert outputs["pe01"]["error"] is None
+    assert outputs["pe01"]["result"]["hostname"] == "localhost"
+    assert outputs["pe02"]["result"] is None
+    assert outputs["pe02"]["error"] == "ConnectionException: You told me to do this"
+    # the mock data of this getter is missing: every host fails
+    assert _main(path, "call", "get_bgp_neighbors_detail") == 1
@@ -0,0 +1,127 @@
+"""Tests for the commits running in the background."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+import pytest
+
+from napalm.base.base import NetworkDriver
+
+
+class FakeDriver(NetworkDriver):
+    _SAVE_CONFIG_METHOD = "_save_config"
+
+    def __init__(self, hostname, fail=None):
+        self.hostname = hostname
+        self.fail = fail
+        self.calls = []
+
+    def _call(self, name):
+        self.calls.append(name)
+        if name == self.fail:
+            raise ValueError("{} failed".format(name))
+
+    def commit_config(self, message=""):
+        self._call("commit_config")
+        if self._save_on_commit:
+            self._save_config()
+
+    def _save_config(self):
+        self._call("save_config")
+
+    def rollback(self):
+        self._call("rollback")
+
+
+def healthy(device):
+    return True
+
+
+def unhealthy(device):
+    return False
+
+
+def test_commit_async():
+    device = FakeDriver("pe01")
+    handle = device.commit_config_async(health_checks=[healthy])
+    assert handle.result(timeout=5) == "committed"
+    assert handle.done()
+    # saved once verified only
+    assert device.calls == ["commit_config", "save_config"]
+    assert sorted(handle.timings) == ["checks", "commit", "save"]
+    assert device._save_on_commit
+
+
+def test_commit_async_unhealthy():
+    device = FakeDriver("pe01")
+    handle = device.commit_config_async(health_checks=[healthy, unhealthy])
+    assert handle.result(timeout=5) == "rolled_back"
+    assert device.calls == ["commit_config", "rollback"]
+    assert "save" not in handle.timings
+
+    device = FakeDriver("pe02")
+    handle = device.commit_config_async(
+        health_checks=[unhealthy], rollback_unhealthy=False
+    )
+    assert handle.result(timeout=5) == "unhealthy"
+    assert device.calls == ["commit_config"]
+
+
+def test_commit_async_failed():
+    device = FakeDriver("pe01", fail="commit_config")
+    handle = device.commit_config_async(health_checks=[healthy])
+    with pytest.raises(ValueError):
+        handle.result(timeout=5)
+    assert handle.status == "failed"
+    assert device.calls == ["commit_config"]
+    assert device._save_on_commit
+
+
+def test_commit_async_rollback():
+    device = FakeDriver("pe01")
+    handle = device.commit_config_async()
+    handle.rollback()
+    assert handle.status == "rolled_back"
+    assert device.calls == ["commit_config", "save_config", "rollback"]
+
+
+def test_commit_async_concurrent():
+    started = threading.Barrier(3) if hasattr(threading, "Barrier") else None
+
+    def check(device):
+        if started is not None:
+            # all the devices are verified at the same time
+            started.wait(timeout=5)
+        return True
+
+    devices = [FakeDriver("pe0{}".format(i)) for i in range(3)]
+    handles = [device.commit_config_async(health_checks=[check]) for device in devices]
+    assert [handle.result(timeout=10) for handle in handles] == ["committed"] * 3
+
+
+def test_commit_async_save_failed():
+    device = FakeDriver("pe01", fail="save_config")
+    handle = device.commit_config_async(health_checks=[healthy])
+    with pytest.raises(ValueError):
+        handle.result(timeout=5)
+    # committed, but not saved
+    assert handle.status == "save_failed"
+    assert device.calls == ["commit_config", "save_config"]
+
+
+def test_commit_async_rollback_failed():
+    device = FakeDriver("pe01", fail="rollback")
+    handle = device.commit_config_async(health_checks=[unhealthy])
+    with pytest.raises(ValueError):
+        handle.result(timeout=5)
+    assert handle.status == "rollback_failed"
+    assert device.calls == ["commit_config", "rollback"]
+
+
+def test_commit_async_not_daemon():
+    handle = FakeDriver("pe01").commit_config_async()
+    assert not handle._thread.daemon
+    handle.wait()
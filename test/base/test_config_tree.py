@@ -0,0 +1,122 @@
+"""Tests for the hierarchical model of the configurations."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from napalm.base.config_tree import ConfigTree
+
+
+RUNNING = """!Command: show running-config
+hostname spine1
+
+interface Ethernet1/1
+  description uplink
+  no shutdown
+interface Ethernet1/2
+  shutdown
+router bgp 65001
+  neighbor 192.0.2.1
+    remote-as 65002
+"""
+
+
+class TestConfigTree(object):
+    def test_parse(self):
+        tree = ConfigTree.parse(RUNNING)
+
+        assert list(tree.children) == [
+            "hostname spine1",
+            "interface Ethernet1/1",
+            "interface Ethernet1/2",
+            "router bgp 65001",
+        ]
+        bgp = tree.children["router bgp 65001"]
+        assert list(bgp.children["neighbor 192.0.2.1"].children) == ["remote-as 65002"]
+        assert list(tree.lines())[-3:] == [
+            "router bgp 65001",
+            "  neighbor 192.0.2.1",
+            "    remote-as 65002",
+        ]
+
+    def test_merge_diff(self):
+        running = ConfigTree.parse(RUNNING)
+        candidate = ConfigTree.parse(
+            """
+hostname spine1
+interface Ethernet1/1
+    description uplink
+    mtu 9216
+interface Ethernet1/2
+  no shutdown
+interface Ethernet1/3
+  description new
+router bgp 65001
+  neighbor 192.0.2.1
+    remote-as 65002
+"""
+        )
+
+        # the lines are compared within their section only
+        assert running.merge_diff(candidate) == [
+            "interface Ethernet1/1",
+            "  mtu 9216",
+            "interface Ethernet1/2",
+            "  no shutdown",
+            "interface Ethernet1/3",
+            "  description new",
+        ]
+        assert running.merge_diff(running) == []
+
+    def test_replace_diff(self):
+        running = ConfigTree.parse(RUNNING)
+        candidate = ConfigTree.parse(
+            RUNNING.replace("  shutdown\n", "  description spare\n").replace(
+                "hostname spine1\n", ""
+            )
+        )
+
+        assert running.replace_diff(candidate) == [
+            "interface Ethernet1/2",
+            "  +description spare",
+            "-hostname spine1",
+            "interface Ethernet1/2",
+            "  -shutdown",
+        ]
+
+    def test_merge_changes(self):
+        running = ConfigTree.parse(RUNNING)
+        candidate = ConfigTree.parse(
+            """
+interface Ethernet1/1
+  no description uplink
+  no shutdown
+  mtu 9216
+no router bgp 65001
+no feature bgp
+"""
+        )
+
+        assert running.merge_changes(candidate) == [
+            "interface Ethernet1/1",
+            "  -description uplink",
+            "  +mtu 9216",
+            "-router bgp 65001",
+            "  -neighbor 192.0.2.1",
+            "    -remote-as 65002",
+        ]
+
+    def test_banner(self):
+        tree = ConfigTree.parse(
+            "banner motd ^C\n  Authorized\n access only\n^C\n"
+            "banner exec ^C single line ^C\n"
+            "banner login\nWelcome\nEOF\n"
+            "hostname spine1\n"
+        )
+
+        assert list(tree.children) == [
+            "banner motd ^C\n  Authorized\n access only\n^C",
+            "banner exec ^C single line ^C",
+            "banner login\nWelcome\nEOF",
+            "hostname spine1",
+        ]
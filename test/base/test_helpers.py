@@ -382,6 +382,87 @@ class TestBaseHelpers(unittest.TestCase):
             napalm.base.helpers.ip("2001:0DB8::0003", version=6), "2001:db8::3"
         )
 
+    def test_prefix_pages(self):
+        """Test the prefix_pages helper function."""
+        self.assertEqual(
+            napalm.base.helpers.prefix_pages("10.0.0.0/7"), ["10.0.0.0/8", "11.0.0.0/8"]
+        )
+        self.assertEqual(
+            napalm.base.helpers.prefix_pages("10.1.0.0/16"), ["10.1.0.0/16"]
+        )
+        self.assertEqual(napalm.base.helpers.prefix_pages("10.1.2.3"), ["10.1.2.3"])
+        self.assertEqual(
+            napalm.base.helpers.prefix_pages("2001:db8::/31", {4: 8, 6: 32}),
+            ["2001:db8::/32", "2001:db9::/32"],
+        )
+        pages = napalm.base.helpers.prefix_pages("")
+        self.assertEqual(len(pages), 256 + 1024)
+        self.assertEqual((pages[0], pages[256]), ("0.0.0.0/8", "::/10"))
+
+    def test_config_chunks(self):
+        """Test the config_chunks helper function."""
+        commands = [
+            (0, "hostname r1"),
+            (0, "router bgp 65000"),
+            (2, "vrf blue"),
+            (4, "neighbor 192.0.2.1"),
+            (6, "remote-as 65001"),
+            (2, "neighbor 192.0.2.2"),
+            (0, "feature bgp"),
+        ]
+        self.assertEqual(
+            list(napalm.base.helpers.config_chunks(commands)),
+            [[command for _, command in commands]],
+        )
+        self.assertEqual(
+            list(napalm.base.helpers.config_chunks(commands, size=3)),
+            [
+                ["hostname r1", "router bgp 65000", "vrf blue"],
+                [
+                    "router bgp 65000",
+                    "vrf blue",
+                    "neighbor 192.0.2.1",
+                    "remote-as 65001",
+                    "neighbor 192.0.2.2",
+                ],
+                ["feature bgp"],
+            ],
+        )
+        self.assertEqual(list(napalm.base.helpers.config_chunks([], size=3)), [[]])
+        # a flat configuration is not split, its sections are unknown
+        flat = [(0, "interface Ethernet1"), (0, "description uplink"), (0, "shutdown")]
+        self.assertEqual(
+            list(napalm.base.helpers.config_chunks(iter(flat), size=1)),
+            [[command for _, command in flat]],
+        )
+
+    def test_config_section(self):
+        """Test the config_section helper function."""
+        config = (
+            "hostname r1\n"
+            "!\n"
+            "interface Ethernet1\n"
+            "   description uplink\n"
+            "   !\n"
+            "interface Ethernet2\n"
+            "   shutdown\n"
+            "!\n"
+            "router bgp 65000\n"
+            "   neighbor 192.0.2.1 remote-as 65001\n"
+            "!\n"
+            "end\n"
+        )
+        self.assertEqual(
+            napalm.base.helpers.config_section(config, "router bgp"),
+            "router bgp 65000\n   neighbor 192.0.2.1 remote-as 65001\n",
+        )
+        self.assertEqual(
+            napalm.base.helpers.config_section(config, r"interface Ethernet\d$"),
+            "interface Ethernet1\n   description uplink\n   !\n"
+            "interface Ethernet2\n   shutdown\n",
+        )
+        self.assertEqual(napalm.base.helpers.config_section(config, "ntp"), "")
+
     def test_as_number(self):
         """Test the as_number helper function."""
         self.assertEqual(napalm.base.helpers.as_number("64001"), 64001)
@@ -93,16 +93,16 @@ class TestMockDriver(object):
         d.open()
 
         with pytest.raises(TypeError) as excinfo:
-            d.get_route_to(1, 2, 3)
+            d.get_route_to(1, 2, 3, 4)
         assert (
-            "get_route_to: expected at most 3 arguments, got 4"
+            "get_route_to: expected at most 4 arguments, got 5"
             in py23_compat.text_type(excinfo.value)
         )
 
         with pytest.raises(TypeError) as excinfo:
-            d.get_route_to(1, 1, protocol=2)
+            d.get_route_to(1, 1, 1, protocol=2)
         assert (
-            "get_route_to: expected at most 3 arguments, got 3"
+            "get_route_to: expected at most 4 arguments, got 4"
             in py23_compat.text_type(excinfo.value)
         )
 
@@ -115,6 +115,32 @@ class TestMockDriver(object):
 
         d.close()
 
+    def test_iter_routes_paged(self):
+        d = driver("blah", "bleh", "blih", optional_args=optional_args)
+        d.open()
+
+        default_route = {"routing_table": "default", "next_hop": "192.0.2.1"}
+        pages = []
+
+        def get_page(page):
+            pages.append(page)
+            if page == "10.0.0.0/8":
+                raise napalm.base.exceptions.CommandTimeoutException("Too many routes!")
+            routes = {"0.0.0.0/0": [default_route]}
+            if page == "11.0.0.0/8":
+                routes["11.1.0.0/16"] = [{"routing_table": "default", "next_hop": ""}]
+            return routes
+
+        routes = list(d._iter_routes_paged("10.0.0.0/7", get_page))
+
+        assert pages == ["10.0.0.0/8", "10.0.0.0/9", "10.128.0.0/9", "11.0.0.0/8"]
+        assert routes == [
+            ("0.0.0.0/0", default_route),
+            ("11.1.0.0/16", {"routing_table": "default", "next_hop": ""}),
+        ]
+
+        d.close()
+
     def test_mock_error(self):
         d = driver("blah", "bleh", "blih", optional_args=optional_args)
         d.open()
@@ -0,0 +1,158 @@
+"""Tests for the change detection of the getters."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import copy
+
+from napalm.base.base import NetworkDriver
+from napalm.base.polling import ChangePoller, apply_delta, normalize
+
+
+BGP_NEIGHBORS = {
+    "global": {
+        "router_id": "192.0.2.254",
+        "peers": {
+            "192.0.2.1": {"is_up": True, "uptime": 100, "remote_as": 65001},
+            "192.0.2.3": {"is_up": True, "uptime": 200, "remote_as": 65003},
+        },
+    }
+}
+
+ARP_TABLE = [
+    {
+        "interface": "Ethernet1",
+        "ip": "10.0.0.1",
+        "mac": "00:00:00:00:00:01",
+        "age": 1.0,
+    },
+    {
+        "interface": "Ethernet1",
+        "ip": "10.0.0.2",
+        "mac": "00:00:00:00:00:02",
+        "age": 2.0,
+    },
+]
+
+
+class FakeDriver(NetworkDriver):
+    def __init__(self):
+        self.hostname = "fake"
+        self.bgp_neighbors = copy.deepcopy(BGP_NEIGHBORS)
+        self.arp_table = copy.deepcopy(ARP_TABLE)
+        self.calls = 0
+
+    def get_bgp_neighbors(self):
+        self.calls += 1
+        return copy.deepcopy(self.bgp_neighbors)
+
+    def get_arp_table(self, vrf=""):
+        return copy.deepcopy(self.arp_table)
+
+
+class TestChangePoller(object):
+    def test_unchanged(self):
+        d = FakeDriver()
+        poller = ChangePoller(d, ignore_keys=())
+
+        assert poller.poll("get_bgp_neighbors") == {"added": BGP_NEIGHBORS}
+        assert poller.poll("get_bgp_neighbors") == {}
+
+    def test_delta(self):
+        d = FakeDriver()
+        poller = ChangePoller(d, ignore_keys=())
+        poller.poll("get_bgp_neighbors")
+
+        peers = d.bgp_neighbors["global"]["peers"]
+        peers["192.0.2.1"].update({"is_up": False, "uptime": -1})
+        peers["192.0.2.2"] = {"is_up": True, "uptime": 10, "remote_as": 65002}
+        del peers["192.0.2.3"]
+
+        assert poller.poll("get_bgp_neighbors") == {
+            "added": {
+                "global": {
+                    "peers": {
+                        "192.0.2.2": {"is_up": True, "uptime": 10, "remote_as": 65002}
+                    }
+                }
+            },
+            "removed": {"global": {"peers": {"192.0.2.3": None}}},
+            "changed": {
+                "global": {"peers": {"192.0.2.1": {"is_up": False, "uptime": -1}}}
+            },
+        }
+
+    def test_volatile_ignored(self):
+        d = FakeDriver()
+        poller = ChangePoller(d)
+        assert poller.poll("get_bgp_neighbors") == {
+            "added": {
+                "global": {
+                    "router_id": "192.0.2.254",
+                    "peers": {
+                        "192.0.2.1": {"is_up": True, "remote_as": 65001},
+                        "192.0.2.3": {"is_up": True, "remote_as": 65003},
+                    },
+                }
+            }
+        }
+        poller.poll("get_arp_table")
+
+        d.bgp_neighbors["global"]["peers"]["192.0.2.1"]["uptime"] = 160
+        d.arp_table[0]["age"] = 61.0
+
+        assert poller.poll("get_bgp_neighbors") == {}
+        assert poller.poll("get_arp_table") == {}
+
+        d.bgp_neighbors["global"]["peers"]["192.0.2.1"]["is_up"] = False
+
+        assert poller.poll("get_bgp_neighbors") == {
+            "changed": {"global": {"peers": {"192.0.2.1": {"is_up": False}}}}
+        }
+
+    def test_records_indexed(self):
+        d = FakeDriver()
+        deltas = []
+        poller = ChangePoller(d, callback=lambda getter, delta: deltas.append(getter))
+        poller.poll("get_arp_table")
+
+        d.arp_table[1]["mac"] = "00:00:00:00:00:03"
+
+        assert poller.poll("get_arp_table") == {
+            "changed": {"Ethernet1|10.0.0.2": {"mac": "00:00:00:00:00:03"}}
+        }
+        assert poller.poll("get_arp_table") == {}
+        # the arguments of the getter are part of the snapshot key
+        assert "added" in poller.poll("get_arp_table", vrf="mgmt")
+        assert deltas == ["get_arp_table", "get_arp_table", "get_arp_table"]
+
+    def test_apply_delta(self):
+        d = FakeDriver()
+        poller = ChangePoller(d, ignore_keys=())
+        state = apply_delta(None, poller.poll("get_bgp_neighbors"))
+
+        peers = d.bgp_neighbors["global"]["peers"]
+        peers["192.0.2.1"]["uptime"] = 160
+        peers["192.0.2.2"] = {"is_up": True, "uptime": 10, "remote_as": 65002}
+        del peers["192.0.2.3"]
+        state = apply_delta(state, poller.poll("get_bgp_neighbors"))
+
+        assert state == normalize(d.bgp_neighbors)
+
+    def test_watch(self):
+        d = FakeDriver()
+        poller = ChangePoller(d)
+
+        changes = list(poller.watch(["get_bgp_neighbors"], interval=0, count=3))
+
+        assert [getter for getter, _ in changes] == ["get_bgp_neighbors"]
+        assert d.calls == 3
+
+    def test_reset(self):
+        d = FakeDriver()
+        poller = ChangePoller(d, ignore_keys=())
+        poller.poll("get_bgp_neighbors")
+        poller.reset("get_bgp_neighbors")
+
+        assert poller.poll("get_bgp_neighbors") == {"added": BGP_NEIGHBORS}
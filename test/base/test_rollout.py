@@ -0,0 +1,178 @@
+"""Tests for the staged rollout of configuration changes."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+from napalm.base.base import NetworkDriver
+from napalm.base.rollout import Rollout, dry_run
+
+
+class FakeDriver(NetworkDriver):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def __init__(self, hostname, running="", fail=None):
+        self.hostname = hostname
+        self.running = running
+        self.fail = fail
+        self.candidate = None
+        self.previous = None
+        self.calls = []
+
+    def _call(self, name):
+        self.calls.append(name)
+        if name == self.fail:
+            raise ValueError("{} failed".format(name))
+
+    def open(self):
+        self._call("open")
+        with self.lock:
+            FakeDriver.in_flight += 1
+            FakeDriver.max_in_flight = max(FakeDriver.max_in_flight, self.in_flight)
+
+    def close(self):
+        self._call("close")
+        with self.lock:
+            FakeDriver.in_flight -= 1
+
+    def load_merge_candidate(self, filename=None, config=None):
+        self._call("load_merge_candidate")
+        self.candidate = config
+
+    def compare_config(self):
+        self._call("compare_config")
+        return "" if self.candidate in self.running else "+" + self.candidate
+
+    def discard_config(self):
+        self._call("discard_config")
+        self.candidate = None
+
+    def commit_config(self, message=""):
+        self._call("commit_config")
+        self.previous, self.running = self.running, self.running + self.candidate
+
+    def rollback(self):
+        self._call("rollback")
+        self.running = self.previous
+
+    def get_facts(self):
+        return {"healthy": self.fail != "get_facts"}
+
+
+def healthy(device):
+    return device.get_facts()["healthy"]
+
+
+def devices(count, **failing):
+    return [
+        FakeDriver("r{}".format(i), fail=failing.get("r{}".format(i)))
+        for i in range(count)
+    ]
+
+
+class TestRollout(object):
+    def test_plan(self):
+        rollout = Rollout(devices(25), "ntp server 192.0.2.1\n")
+
+        assert [len(wave) for wave in rollout.plan()] == [1, 3, 21]
+        rollout.waves = (2, 5)
+        assert [len(wave) for wave in rollout.plan()] == [2, 5, 18]
+
+    def test_success(self):
+        fleet = devices(20)
+        fleet[3].running = "ntp server 192.0.2.1\n"
+        FakeDriver.max_in_flight = 0
+        waves = []
+        rollout = Rollout(
+            fleet,
+            "ntp server 192.0.2.1\n",
+            max_in_flight=4,
+            health_checks=[healthy],
+            callback=lambda index, wave: waves.append(index),
+        )
+
+        result = rollout.run()
+
+        assert result["completed"]
+        assert waves == [0, 1, 2]
+        assert FakeDriver.max_in_flight <= 4
+        assert result["devices"]["r0"] == {
+            "status": "committed",
+            "diff": "+ntp server 192.0.2.1\n",
+            "error": None,
+        }
+        assert result["devices"]["r3"]["status"] == "unchanged"
+        assert "commit_config" not in fleet[3].calls
+        assert all(device.running for device in fleet)
+
+    def test_canary_failure(self):
+        fleet = devices(10, r0="commit_config")
+
+        result = Rollout(fleet, "ntp server 192.0.2.1\n").run()
+
+        assert not result["completed"]
+        assert result["waves"] == [
+            {"hosts": ["r0"], "failures": 1, "rolled_back": True}
+        ]
+        assert fleet[0].calls[-3:] == ["open", "rollback", "close"]
+        assert result["devices"]["r0"]["status"] == "rolled_back"
+        assert result["devices"]["r0"]["error"] == "ValueError: commit_config failed"
+        # the following waves are not started
+        assert result["devices"]["r1"]["status"] == "skipped"
+        assert fleet[1].calls == []
+
+    def test_unhealthy_wave(self):
+        fleet = devices(10, r2="get_facts", r3="get_facts")
+
+        result = Rollout(
+            fleet,
+            "ntp server 192.0.2.1\n",
+            waves=(1, 4),
+            max_in_flight=1,
+            health_checks=[healthy],
+            max_failures=1,
+        ).run()
+
+        assert not result["completed"]
+        assert [wave["rolled_back"] for wave in result["waves"]] == [False, True]
+        statuses = [result["devices"][d.hostname]["status"] for d in fleet]
+        # the wave stops once too many devices failed, the devices changed are rolled back
+        assert statuses == ["committed"] + ["rolled_back"] * 3 + ["skipped"] * 6
+        assert result["devices"]["r2"]["error"] == "healthy failed"
+        assert fleet[0].running and not fleet[1].running
+
+    def test_load_failure(self):
+        fleet = devices(3, r1="load_merge_candidate")
+
+        result = Rollout(fleet, "ntp server 192.0.2.1\n", max_failures=1).run()
+
+        assert result["completed"]
+        assert result["devices"]["r1"]["status"] == "failed"
+        assert fleet[1].calls == [
+            "open",
+            "load_merge_candidate",
+            "discard_config",
+            "close",
+        ]
+
+
+class TestDryRun(object):
+    def test_groups(self):
+        fleet = devices(6, r4="compare_config")
+        fleet[1].running = fleet[2].running = "ntp server 192.0.2.1\n"
+
+        report = dry_run(fleet, "ntp server 192.0.2.1\n", max_in_flight=3)
+
+        assert [(group["hosts"], group["diff"]) for group in report["diffs"]] == [
+            (["r0", "r3", "r5"], "+ntp server 192.0.2.1\n"),
+            (["r1", "r2"], ""),
+        ]
+        assert report["diffs"][1]["hash"] == "da39a3ee5e6b4b0d3255bfef95601890afd80709"
+        assert report["errors"] == {"r4": "ValueError: compare_config failed"}
+        for device in fleet:
+            assert "commit_config" not in device.calls
+            assert device.calls[-2:] == ["discard_config", "close"]
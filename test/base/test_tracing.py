@@ -0,0 +1,159 @@
+"""Tests for the timing instrumentation."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import mock
+import pytest
+
+from napalm.base import tracing
+from napalm.base.base import NetworkDriver
+from napalm.base.tracing import payload_size
+
+
+class FakeDevice(object):
+    def run_commands(self, commands):
+        if "bad command" in commands:
+            raise ValueError("invalid command")
+        return [{"output": "x" * 10} for _ in commands]
+
+
+class FakeDriver(NetworkDriver):
+
+    _TRACED_TRANSPORT_METHODS = ("run_commands",)
+
+    def __init__(self):
+        self.hostname = "fake"
+        self.device = None
+
+    def open(self):
+        self.device = FakeDevice()
+
+    def close(self):
+        self.device = None
+
+    def get_facts(self):
+        output = self.device.run_commands(["show version", "show hostname"])
+        self.device.run_commands(["show interfaces"])
+        return {"hostname": output[0]["output"]}
+
+    def get_interfaces(self):
+        self.get_facts()
+        return {}
+
+    def cli(self, commands):
+        return self.device.run_commands(commands)
+
+
+class TestTracing(object):
+    def test_getter_record(self):
+        d = FakeDriver()
+        d.open()
+        with d.trace() as tracer:
+            assert d.get_facts() == {"hostname": "x" * 10}
+
+        assert len(tracer.records) == 1
+        record = tracer.records[0]
+        assert record["hostname"] == "fake"
+        assert record["method"] == "get_facts"
+        assert record["error"] is None
+        assert [call["command"] for call in record["calls"]] == [
+            ["show version", "show hostname"],
+            ["show interfaces"],
+        ]
+        assert record["payload_size"] == sum(
+            call["payload_size"] for call in record["calls"]
+        )
+        assert record["wall_time"] >= record["transport_time"]
+        assert record["parse_time"] >= 0.0
+        assert tracer.summary()["get_facts"]["transport_calls"] == 2
+
+    def test_uninstalled_after_block(self):
+        d = FakeDriver()
+        d.open()
+        with d.trace():
+            pass
+        assert "get_facts" not in vars(d)
+        assert "run_commands" not in vars(d.device)
+
+    def test_nested_getters_and_reopen(self):
+        records = []
+        d = FakeDriver()
+        d.add_trace_callback(records.append)
+        d.open()
+        d.get_interfaces()
+        d.remove_trace_callback(records.append)
+
+        assert [r["method"] for r in records] == ["open", "get_interfaces"]
+        assert len(records[1]["calls"]) == 2
+
+    def test_error(self):
+        d = FakeDriver()
+        d.open()
+        with d.trace() as tracer:
+            with pytest.raises(ValueError):
+                d.cli(["bad command"])
+        assert tracer.records[0]["error"] == "ValueError: invalid command"
+        assert tracer.records[0]["calls"][0]["error"] == "ValueError: invalid command"
+
+    def test_payload_size(self):
+        assert payload_size(None) == 0
+        assert payload_size("abc") == 3
+        assert payload_size(b"abcd") == 4
+        assert payload_size({"a": 1}) == len('{"a": 1}')
+
+    def test_payload_sized_outside_timings(self):
+        d = FakeDriver()
+        d.open()
+        events = []
+        real_time = tracing.time.time
+
+        def timed():
+            events.append("time")
+            return real_time()
+
+        def sized(payload):
+            events.append("size")
+            return 7
+
+        with mock.patch.object(tracing.time, "time", side_effect=timed):
+            with mock.patch.object(tracing, "payload_size", side_effect=sized):
+                with d.trace() as tracer:
+                    d.get_facts()
+
+        # the payloads are sized once the getter and its calls have been timed
+        assert events[-2:] == ["size", "size"]
+        assert "size" not in events[:-2]
+        assert [call["payload_size"] for call in tracer.records[0]["calls"]] == [7, 7]
+        assert "_payload" not in tracer.records[0]["calls"][0]
+
+    def test_remove_unknown_callback(self):
+        d = FakeDriver()
+        d.remove_trace_callback(print)
+        d.add_trace_callback(print)
+        d.remove_trace_callback(len)
+        d.remove_trace_callback(print)
+        assert "get_facts" not in vars(d)
+
+    def test_uninstall_keeps_later_wrappers(self):
+        records = []
+        d = FakeDriver()
+        d.open()
+        d.add_trace_callback(records.append)
+        traced = d.get_facts
+
+        def rewrapped():
+            return traced()
+
+        d.get_facts = rewrapped
+        d.remove_trace_callback(records.append)
+
+        assert d.get_facts is rewrapped
+        assert "get_interfaces" not in vars(d)
+        # the tracing wrapper left under the other one is disabled
+        d.add_trace_callback(records.append)
+        d.get_facts()
+        d.remove_trace_callback(records.append)
+        assert [r["method"] for r in records] == ["get_facts"]
+        assert len(records[0]["calls"]) == 2
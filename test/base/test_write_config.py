@@ -0,0 +1,69 @@
+"""Tests for writing the configurations of a device to file-like objects."""
+
+# Python3 support
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import gzip
+import hashlib
+import io
+
+from napalm.base import constants as c
+from napalm.base.base import NetworkDriver
+
+
+RUNNING = "hostname r1\ninterface Ethernet1\n   description uplink\n"
+
+
+class FakeDriver(NetworkDriver):
+    def __init__(self, configs):
+        self.configs = configs
+        self.retrieved = []
+
+    def get_config(self, retrieve="all", section=None):
+        self.retrieved.append((retrieve, section))
+        config = {"running": "", "startup": "", "candidate": ""}
+        config[retrieve] = self.configs[retrieve]
+        return config
+
+
+def test_write_config(monkeypatch):
+    # several chunks per configuration
+    monkeypatch.setattr(c, "CONFIG_WRITE_CHUNK_SIZE", 7)
+    device = FakeDriver({"running": RUNNING, "startup": "hostname r0\n"})
+    running, startup = io.BytesIO(), io.BytesIO()
+    written = device.write_config({"running": running, "startup": startup})
+    assert running.getvalue() == RUNNING.encode("utf-8")
+    assert startup.getvalue() == b"hostname r0\n"
+    assert written["running"] == {
+        "sha1": hashlib.sha1(RUNNING.encode("utf-8")).hexdigest(),
+        "size": len(RUNNING),
+        "same_as": None,
+    }
+    # retrieved one at a time
+    assert device.retrieved == [("running", None), ("startup", None)]
+
+
+def test_write_config_deduplicated():
+    device = FakeDriver({"running": RUNNING, "startup": RUNNING, "candidate": ""})
+    sinks = {"running": io.BytesIO(), "startup": io.BytesIO()}
+    written = device.write_config(sinks, section="interface")
+    assert written["startup"]["same_as"] == "running"
+    assert written["startup"]["sha1"] == written["running"]["sha1"]
+    assert sinks["startup"].getvalue() == b""
+    assert "candidate" not in written
+    assert device.retrieved == [("running", "interface"), ("startup", "interface")]
+
+
+def test_write_config_compressed():
+    device = FakeDriver({"running": RUNNING})
+    sinks = [io.BytesIO(), io.BytesIO()]
+    for sink in sinks:
+        written = device.write_config({"running": sink}, compress=True)
+    assert written["running"]["size"] == len(RUNNING)
+    compressed = sinks[0].getvalue()
+    assert gzip.GzipFile(fileobj=io.BytesIO(compressed)).read() == RUNNING.encode(
+        "utf-8"
+    )
+    # identical configurations are compressed identically
+    assert sinks[1].getvalue() == compressed
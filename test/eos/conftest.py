@@ -37,6 +37,8 @@ class PatchedEOSDriver(eos.EOSDriver):
 
         self.patched_attrs = ["device"]
         self.device = FakeEOSDevice()
+        # the mocked data, hence the VRFs of the device, change between test cases
+        self.vrf_cache_ttl = 0
 
 
 class FakeEOSDevice(BaseTestDouble):
@@ -0,0 +1,36 @@
+"""Tests for the sections of get_config."""
+import mock
+import pytest
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestGetConfigSection(object):
+    def _get_config(self, **kwargs):
+        with mock.patch.object(
+            self.device.device,
+            "run_commands",
+            side_effect=lambda commands, encoding: [
+                {"output": "router bgp 65000\n"} for _ in commands
+            ],
+        ) as run_commands:
+            result = self.device.get_config(**kwargs)
+        return result, [c for call in run_commands.call_args_list for c in call[0][0]]
+
+    def test_section_filtered_by_device(self):
+        result, commands = self._get_config(section="router bgp")
+
+        assert commands == [
+            "show startup-config | section router bgp",
+            "show running-config section router bgp",
+        ]
+        assert result == {
+            "startup": "router bgp 65000\n",
+            "running": "router bgp 65000\n",
+            "candidate": "",
+        }
+
+    def test_section_single_store(self):
+        result, commands = self._get_config(retrieve="running", section="ntp")
+
+        assert commands == ["show running-config section ntp"]
+        assert result["running"] == "router bgp 65000\n"
@@ -0,0 +1,91 @@
+"""Tests for the configuration loaded in chunks in the config session."""
+from textwrap import dedent
+
+import mock
+import pyeapi
+import pytest
+
+from napalm.base.exceptions import MergeConfigException
+
+CONFIG = dedent(
+    """\
+    hostname vEOS
+    !
+    ip access-list standard test1
+       comment
+       First ACL
+       EOF
+       permit host 192.0.2.1
+    !
+    ip access-list standard test2
+       comment
+       Second ACL
+       EOF
+       permit host 192.0.2.2
+       permit host 192.0.2.3
+    !
+    router bgp 65000
+       vrf blue
+          neighbor 192.0.2.1 remote-as 65001
+          neighbor 192.0.2.2 remote-as 65002
+       neighbor 192.0.2.3 remote-as 65003
+    !
+    """
+)
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestLoadConfig(object):
+    def test_chunks(self):
+        self.device.device.run_commands = mock.MagicMock()
+        self.device.config_chunk_size = 4
+        try:
+            with mock.patch.object(self.device, "_lock"):
+                self.device._load_config(config=CONFIG, replace=False)
+        finally:
+            self.device.config_chunk_size = None
+
+        session = "configure session {}".format(self.device.config_session)
+        assert [c[0][0] for c in self.device.device.run_commands.call_args_list] == [
+            [
+                session,
+                "hostname vEOS",
+                "ip access-list standard test1",
+                {"cmd": "comment", "input": "First ACL"},
+                "permit host 192.0.2.1",
+            ],
+            [
+                session,
+                "ip access-list standard test2",
+                {"cmd": "comment", "input": "Second ACL"},
+                "permit host 192.0.2.2",
+                "permit host 192.0.2.3",
+            ],
+            # the sections of the first command are entered again
+            [
+                session,
+                "router bgp 65000",
+                "vrf blue",
+                "neighbor 192.0.2.1 remote-as 65001",
+                "neighbor 192.0.2.2 remote-as 65002",
+            ],
+            [session, "router bgp 65000", "neighbor 192.0.2.3 remote-as 65003"],
+        ]
+
+    def test_stop_on_error(self):
+        run_commands = mock.MagicMock(
+            side_effect=[None, pyeapi.eapilib.CommandError(1002, "invalid command")]
+        )
+        self.device.config_chunk_size = 4
+        try:
+            with mock.patch.object(self.device, "_lock"), mock.patch.object(
+                self.device.device, "run_commands", run_commands
+            ), mock.patch.object(self.device, "discard_config") as discard_config:
+                with pytest.raises(MergeConfigException):
+                    self.device._load_config(config=CONFIG, replace=False)
+        finally:
+            self.device.config_chunk_size = None
+
+        # the following chunks are not sent
+        assert run_commands.call_count == 2
+        discard_config.assert_called_once_with()
@@ -0,0 +1,67 @@
+"""Tests for the ping_many and traceroute_many methods."""
+import mock
+import pyeapi
+import pytest
+
+
+UNREACHABLE = """PING {0} ({0}) 72(100) bytes of data.
+
+--- {0} ping statistics ---
+5 packets transmitted, 0 received, 100% packet loss, time 8ms
+"""
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestProbes(object):
+    def test_ping_many_batched(self):
+        self.device.device.current_test = "test_ping"
+        self.device.device.current_test_case = "normal"
+        expected = self.device.ping("8.8.8.8")
+        run_commands = self.device.device.run_commands
+        calls = []
+
+        def _run_commands(commands, **kwargs):
+            calls.append(commands)
+            # the captured output for 8.8.8.8, a different one for the other destinations
+            return [
+                run_commands([command], **kwargs)[0]
+                if "8.8.8.8" in command
+                else {"output": UNREACHABLE.format(command.split()[1])}
+                for command in commands
+            ]
+
+        with mock.patch.object(self.device.device, "run_commands", _run_commands):
+            result = self.device.ping_many(["192.0.2.1", "8.8.8.8", "192.0.2.2"])
+
+        # a single request, each output going to its destination
+        assert len(calls) == 1
+        assert result["8.8.8.8"] == expected == self.device.device.expected_result
+        for destination in ("192.0.2.1", "192.0.2.2"):
+            assert result[destination]["success"]["packet_loss"] == 5
+            assert result[destination]["success"]["results"] == []
+
+    def test_ping_many_failed_batch(self):
+        self.device.device.current_test = "test_ping"
+        self.device.device.current_test_case = "normal"
+        run_commands = self.device.device.run_commands
+        calls = []
+
+        def _run_commands(commands, **kwargs):
+            calls.append(commands)
+            if len(commands) > 1 or "unreachable" in commands[0]:
+                raise pyeapi.eapilib.CommandError(1002, "invalid command")
+            return run_commands(commands, **kwargs)
+
+        with mock.patch.object(self.device.device, "run_commands", _run_commands):
+            result = self.device.ping_many(["8.8.8.8", "unreachable"])
+
+        # the batch, then one probe at a time
+        assert len(calls) == 3
+        assert result["8.8.8.8"] == self.device.device.expected_result
+        assert "error" in result["unreachable"]
+
+    def test_probes_many_no_destination(self):
+        with mock.patch.object(self.device.device, "run_commands") as run_commands:
+            assert self.device.ping_many([]) == {}
+            assert self.device.traceroute_many([]) == {}
+        assert not run_commands.called
@@ -0,0 +1,146 @@
+"""Tests for the VRF handling of get_route_to."""
+import json
+
+import mock
+import pytest
+
+
+def _use_mocked_data(device, test, test_case="normal"):
+    device.current_test = test
+    device.current_test_case = test_case
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestRouteTo(object):
+    def _get_route_to(self, **kwargs):
+        self.device._vrfs_cache = None
+        with mock.patch.object(
+            self.device.device, "run_commands", wraps=self.device.device.run_commands
+        ) as run_commands:
+            result = self.device.get_route_to("1.0.4.0/24", "bgp", **kwargs)
+        commands = [c for call in run_commands.call_args_list for c in call[0][0]]
+        return json.loads(json.dumps(result)), commands
+
+    def test_vrf_subset(self):
+        _use_mocked_data(self.device.device, "test_get_route_to")
+        expected = self.device.device.expected_result
+
+        result, commands = self._get_route_to(vrf=["TEST"])
+
+        assert result == {
+            prefix: [route for route in routes if route["routing_table"] == "TEST"]
+            for prefix, routes in expected.items()
+        }
+        assert "show vrf" not in commands
+
+    def test_vrf_list_cached(self):
+        _use_mocked_data(self.device.device, "test_get_route_to")
+
+        with mock.patch.object(self.device, "vrf_cache_ttl", 300):
+            self._get_route_to()
+            with mock.patch.object(
+                self.device, "_show_vrf", wraps=self.device._show_vrf
+            ) as show_vrf:
+                self.device.get_route_to("1.0.4.0/24", "bgp")
+                assert show_vrf.call_count == 0
+                with mock.patch.object(self.device, "vrf_cache_ttl", 0):
+                    self.device.get_route_to("1.0.4.0/24", "bgp")
+                assert show_vrf.call_count == 1
+
+    def test_concurrent_batches(self):
+        _use_mocked_data(self.device.device, "test_get_route_to")
+        expected = self.device.device.expected_result
+
+        with mock.patch.object(
+            self.device, "route_to_batch_size", 1
+        ), mock.patch.object(self.device, "route_to_workers", 4), mock.patch.object(
+            self.device, "_new_device", return_value=self.device.device
+        ) as new_device:
+            result, commands = self._get_route_to()
+
+            # the additional connection is reused by the next calls
+            assert self._get_route_to()[0] == expected
+            extra_devices = list(self.device._route_to_devices)
+            self.device.close()
+        assert self.device._route_to_devices == []
+
+        assert result == expected
+        # one worker per batch of VRFs: default and TEST
+        assert new_device.call_count == 1
+        assert extra_devices == [self.device.device]
+        assert [c for c in commands if c.startswith("show ip route")] == [
+            "show ip route vrf TEST 1.0.4.0/24 bgp detail",
+            "show ip route vrf default 1.0.4.0/24 bgp detail",
+        ]
+
+    def test_iter_routes(self):
+        _use_mocked_data(self.device.device, "test_iter_routes")
+        expected = self.device.device.expected_result
+
+        with mock.patch.object(
+            self.device.device, "run_commands", wraps=self.device.device.run_commands
+        ) as run_commands:
+            result = list(self.device.iter_routes("0.0.0.0/7", "bgp"))
+
+        assert json.loads(json.dumps(result)) == expected
+        # one chunk of the routing table at a time
+        assert [c for call in run_commands.call_args_list for c in call[0][0]][1:] == [
+            "show ip route vrf TEST 0.0.0.0/8 longer-prefixes bgp detail",
+            "show ip route vrf default 0.0.0.0/8 longer-prefixes bgp detail",
+            "show ip route vrf TEST 1.0.0.0/8 longer-prefixes bgp detail",
+            "show ip route vrf default 1.0.0.0/8 longer-prefixes bgp detail",
+            "show ip bgp 1.0.4.0/24 detail vrf TEST",
+            "show ip bgp 1.0.4.0/24 detail vrf default",
+        ]
+
+    def test_bgp_prefixes_in_chunks(self):
+        prefixes = ["1.0.{}.0/24".format(i) for i in range(5)]
+        requests = []
+
+        def _run_commands(commands, **kwargs):
+            requests.append(commands)
+            if commands[0].startswith("show ip route"):
+                routes = {
+                    prefix: {
+                        "routeType": "eBGP",
+                        "preference": 200,
+                        "metric": 0,
+                        "vias": [{"nexthopAddr": "10.0.0.1", "interface": "Et1"}],
+                    }
+                    for prefix in prefixes
+                }
+                return [{"vrfs": {"default": {"routes": routes}}}]
+            return [
+                {
+                    "vrfs": {
+                        "default": {
+                            "asn": "65000",
+                            "bgpRouteEntries": {
+                                command.split()[3]: {
+                                    "bgpRoutePaths": [
+                                        {
+                                            "asPathEntry": {"asPath": "65001"},
+                                            "nextHop": "10.0.0.1",
+                                            "routeDetail": {
+                                                "peerEntry": {"peerAddr": "10.0.0.1"}
+                                            },
+                                            "routeType": {"active": True},
+                                        }
+                                    ]
+                                }
+                            },
+                        }
+                    }
+                }
+                for command in commands
+            ]
+
+        with mock.patch.object(
+            self.device.device, "run_commands", _run_commands
+        ), mock.patch.object(self.device, "route_to_batch_size", 2):
+            result = self.device.get_route_to("1.0.0.0/8", "bgp", vrf="default")
+
+        assert sorted(result) == prefixes
+        assert all(routes[0]["next_hop"] == "10.0.0.1" for routes in result.values())
+        # the BGP details of at most two prefixes per request
+        assert [len(commands) for commands in requests] == [1, 2, 2, 1]
@@ -0,0 +1,69 @@
+"""End-to-end tests of the driver, against the stand-in eAPI server."""
+import json
+import os
+from multiprocessing.pool import ThreadPool
+
+import pytest
+
+from napalm.base.exceptions import ConnectionException
+from napalm.base.test.getters import dict_diff
+from napalm.base.test.servers import EOSServer
+from napalm.eos import eos
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+
+
+def _expected_result(test, test_case="normal"):
+    with open(os.path.join(MOCKED_DATA, test, test_case, "expected_result.json")) as f:
+        return json.load(f)
+
+
+def _open(server, password="admin"):
+    device = eos.EOSDriver(
+        "127.0.0.1",
+        "admin",
+        password,
+        optional_args={"transport": "http", "port": server.port},
+    )
+    device.open()
+    return device
+
+
+class TestServer(object):
+    def test_getter(self):
+        with EOSServer(MOCKED_DATA, "test_get_facts") as server:
+            device = _open(server)
+            result = device.get_facts()
+            device.close()
+
+        assert not dict_diff(
+            json.loads(json.dumps(result)), _expected_result("test_get_facts")
+        )
+        assert server.commands == [
+            "show clock",
+            "show version",
+            "show hostname",
+            "show interfaces",
+        ]
+
+    def test_concurrent_devices(self):
+        with EOSServer(
+            MOCKED_DATA, "test_get_interfaces", latency=0.01, jitter=0.01
+        ) as server:
+            pool = ThreadPool(8)
+            try:
+                results = pool.map(lambda _: _open(server).get_interfaces(), range(16))
+            finally:
+                pool.close()
+                pool.join()
+
+        expected = _expected_result("test_get_interfaces")
+        assert all(json.loads(json.dumps(r)) == expected for r in results)
+        # one request to open each connection, one for the getter
+        assert server.requests == 32
+
+    def test_authentication(self):
+        with EOSServer(MOCKED_DATA, username="admin", password="admin") as server:
+            _open(server)
+            with pytest.raises(ConnectionException):
+                _open(server, password="wrong")
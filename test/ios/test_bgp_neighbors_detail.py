@@ -0,0 +1,67 @@
+"""Tests for the bulk and per-neighbor modes of get_bgp_neighbors_detail."""
+import json
+
+import mock
+import pytest
+
+
+def _use_mocked_data(device, test, test_case="normal"):
+    device.current_test = test
+    device.current_test_case = test_case
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestBgpNeighborsDetail(object):
+    def test_one_command_per_address_family(self):
+        _use_mocked_data(self.device.device, "test_get_bgp_neighbors_detail")
+        expected = self.device.device.expected_result
+
+        with mock.patch.object(
+            self.device, "_send_command", wraps=self.device._send_command
+        ) as send_command:
+            result = self.device.get_bgp_neighbors_detail()
+
+        assert json.loads(json.dumps(result)) == expected
+        assert [c[0][0] for c in send_command.call_args_list] == [
+            "show ip bgp all sum",
+            "show ip bgp ipv4 unicast neigh",
+            "show ip bgp ipv6 unicast neigh",
+            "show ip bgp vpnv4 all neigh",
+        ]
+
+    def test_neighbor_address(self):
+        _use_mocked_data(self.device.device, "test_get_bgp_neighbors_detail")
+        expected = self.device.device.expected_result
+
+        with mock.patch.object(
+            self.device, "_send_command", wraps=self.device._send_command
+        ) as send_command:
+            result = self.device.get_bgp_neighbors_detail(neighbor_address="3.3.3.3")
+
+        assert result == {"global": {3: expected["global"]["3"]}}
+        assert [c[0][0] for c in send_command.call_args_list] == [
+            "show ip bgp all sum",
+            "show ip bgp ipv4 unicast neigh 3.3.3.3",
+        ]
+
+    def test_split_bgp_neighbors(self):
+        raw = "\n".join(
+            [
+                "",
+                "BGP neighbor is 10.0.0.1,  vrf A,  remote AS 1, internal link",
+                "  BGP state = Established",
+                "BGP neighbor is 10.0.0.1,  vrf B,  remote AS 1, internal link",
+                "BGP neighbor is 10.0.0.2,  remote AS 2, external link",
+            ]
+        )
+
+        neighbors = self.device._split_bgp_neighbors(raw)
+
+        assert neighbors == {
+            "10.0.0.1": [
+                "BGP neighbor is 10.0.0.1,  vrf A,  remote AS 1, internal link\n"
+                "  BGP state = Established",
+                "BGP neighbor is 10.0.0.1,  vrf B,  remote AS 1, internal link",
+            ],
+            "10.0.0.2": ["BGP neighbor is 10.0.0.2,  remote AS 2, external link"],
+        }
@@ -0,0 +1,22 @@
+"""Tests for the sections of get_config."""
+import mock
+import pytest
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestGetConfigSection(object):
+    def test_section_filtered_by_device(self):
+        with mock.patch.object(
+            self.device, "_send_command", return_value="router bgp 65000\n"
+        ) as send_command:
+            result = self.device.get_config(section="router bgp")
+
+        assert [call[0][0] for call in send_command.call_args_list] == [
+            "show startup-config | section router bgp",
+            "show running-config | section router bgp",
+        ]
+        assert result == {
+            "startup": "router bgp 65000\n",
+            "running": "router bgp 65000\n",
+            "candidate": "",
+        }
@@ -0,0 +1,66 @@
+"""Tests for the diffs computed offline by compare_config."""
+import mock
+import pytest
+
+
+def _use_mocked_data(device, test, test_case="normal"):
+    device.current_test = test
+    device.current_test_case = test_case
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestOfflineDiff(object):
+    def _compare_config(self, load, config):
+        self.device.offline_diff = True
+        self.device._running_config_tree = None
+        self.device._dest_file_system = "flash:"
+        with mock.patch.object(
+            self.device, "_load_candidate_wrapper", return_value=(True, "")
+        ):
+            load(config=config)
+        with mock.patch.object(
+            self.device, "get_config", wraps=self.device.get_config
+        ) as get_config:
+            diff = self.device.compare_config()
+            assert self.device.compare_config() == diff
+            # the running config is retrieved once
+            assert get_config.call_count == 1
+        self.device.offline_diff = False
+        return diff
+
+    def test_replace(self):
+        _use_mocked_data(self.device.device, "test_get_config")
+        running = self.device.get_config(retrieve="running")["running"]
+        candidate = running.replace(
+            " no ip address\n shutdown\n", " no ip address\n description spare\n"
+        )
+        candidate = candidate.replace(
+            "\nend", "\nbanner motd ^C\nAuthorized access only\n^C\nend"
+        )
+
+        diff = self._compare_config(self.device.load_replace_candidate, candidate)
+
+        assert diff == "\n".join(
+            [
+                "interface GigabitEthernet3",
+                " +description spare",
+                "+banner motd ^C",
+                "Authorized access only",
+                "^C",
+                "interface GigabitEthernet3",
+                " -shutdown",
+            ]
+        )
+
+    def test_merge(self):
+        _use_mocked_data(self.device.device, "test_get_config")
+
+        diff = self._compare_config(
+            self.device.load_merge_candidate,
+            "interface GigabitEthernet3\n no shutdown\n description spare\n"
+            "no ip http server\nno ip domain lookup\nend\n",
+        )
+
+        assert diff == "\n".join(
+            ["interface GigabitEthernet3", " -shutdown", " +description spare"]
+        )
@@ -0,0 +1,79 @@
+"""Tests for the reuse of the parsed results of the getters."""
+import json
+
+import mock
+import pytest
+
+
+def _use_mocked_data(device, test, test_case="normal"):
+    device.current_test = test
+    device.current_test_case = test_case
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestParseCache(object):
+    def _new_device(self):
+        device = self.patched_driver(
+            "hostname", "username", "password", optional_args={"parse_cache": True}
+        )
+        device.open()
+        return device
+
+    def _get_facts(self, device):
+        with mock.patch.object(
+            device.device, "send_command", wraps=device.device.send_command
+        ) as send_command:
+            result = device.get_facts()
+        return json.loads(json.dumps(result)), send_command.call_count
+
+    def test_unchanged_output(self):
+        device = self._new_device()
+        _use_mocked_data(device.device, "test_get_facts")
+        expected = device.device.expected_result
+
+        result, sent = self._get_facts(device)
+        assert result == expected
+        with mock.patch.object(device, "parse_uptime") as parse_uptime:
+            result, sent_again = self._get_facts(device)
+        assert result == expected
+        # the commands are sent again, but their output is not parsed
+        assert sent_again == sent
+        assert parse_uptime.call_count == 0
+        assert device.parse_cache.metrics() == {
+            "hits": 1,
+            "misses": 1,
+            "entries": 1,
+            "getters": {"get_facts": {"hits": 1, "misses": 1}},
+        }
+
+    def test_changed_output(self):
+        device = self._new_device()
+        _use_mocked_data(device.device, "test_get_facts")
+        _, sent = self._get_facts(device)
+
+        _use_mocked_data(device.device, "test_get_facts", "old-2950")
+        result, sent_again = self._get_facts(device)
+
+        assert result == device.device.expected_result
+        # the outputs retrieved to compare the fingerprints are parsed, not requested twice
+        assert sent_again == sent
+        assert device.parse_cache.metrics()["misses"] == 2
+
+    def test_result_copied(self):
+        device = self._new_device()
+        _use_mocked_data(device.device, "test_get_facts")
+        device.get_facts()["hostname"] = "changed"
+
+        assert device.get_facts()["hostname"] != "changed"
+
+    def test_trace(self):
+        device = self._new_device()
+        _use_mocked_data(device.device, "test_get_facts")
+        device.get_facts()
+
+        with device.trace() as tracer:
+            device.get_facts()
+        device.get_facts()
+
+        assert [record["method"] for record in tracer.records] == ["get_facts"]
+        assert device.parse_cache.metrics()["hits"] == 2
@@ -0,0 +1,83 @@
+"""Tests for the ping_many and traceroute_many methods."""
+import mock
+import pytest
+
+from napalm.base.test import helpers
+from napalm.base.test import models
+
+
+PING_OUTPUT = """Type escape sequence to abort.
+Sending 5, 100-byte ICMP Echos to {0}, timeout is 2 seconds:
+{1}
+Success rate is {2} percent ({3}/5), round-trip min/avg/max = 1/1/4 ms
+"""
+
+
+class _PingSession(object):
+    """Netmiko session answering a different ping output for each destination."""
+
+    def __init__(self):
+        self.commands = []
+        self.disconnected = False
+
+    def send_command(self, command, **kwargs):
+        self.commands.append(command)
+        destination = command.split()[1]
+        if destination == "8.8.8.8":
+            return PING_OUTPUT.format(destination, "!!!!!", 100, 5)
+        if destination == "192.0.2.1":
+            return PING_OUTPUT.format(destination, ".....", 0, 0)
+        return PING_OUTPUT.format(destination, "!.!.!", 60, 3)
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+def _use_mocked_data(device, test, test_case="normal"):
+    device.current_test = test
+    device.current_test_case = test_case
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestProbes(object):
+    def test_ping_many_single_session(self):
+        _use_mocked_data(self.device.device, "test_ping")
+        expected = self.device.device.expected_result
+
+        result = self.device.ping_many(["8.8.8.8"])
+
+        assert list(result.keys()) == ["8.8.8.8"]
+        assert result["8.8.8.8"] == expected
+        assert helpers.test_model(models.ping, result["8.8.8.8"]["success"])
+
+    def test_ping_many_parallel_sessions(self):
+        _use_mocked_data(self.device.device, "test_ping")
+        main_session, extra_session = _PingSession(), _PingSession()
+        self.device._netmiko_device_type = "cisco_ios"
+        self.device._netmiko_optional_args = {}
+
+        with mock.patch.object(self.device, "device", main_session), mock.patch.object(
+            self.device, "_netmiko_connect", return_value=extra_session
+        ) as connect:
+            result = self.device.ping_many(
+                ["8.8.8.8", "192.0.2.1", "192.0.2.2"], workers=2
+            )
+
+        connect.assert_called_once_with("cisco_ios", {})
+        # each destination gets the output of its own command, whichever session sent it
+        assert sorted(main_session.commands + extra_session.commands) == [
+            "ping 192.0.2.1 timeout 2 size 100 repeat 5",
+            "ping 192.0.2.2 timeout 2 size 100 repeat 5",
+            "ping 8.8.8.8 timeout 2 size 100 repeat 5",
+        ]
+        assert result["8.8.8.8"] == self.device.device.expected_result
+        assert result["192.0.2.1"]["success"]["packet_loss"] == 5
+        assert result["192.0.2.2"]["success"]["packet_loss"] == 2
+        assert extra_session.disconnected
+
+    def test_traceroute_many(self):
+        _use_mocked_data(self.device.device, "test_traceroute")
+
+        result = self.device.traceroute_many(["8.8.8.8"])
+
+        assert result["8.8.8.8"] == self.device.traceroute("8.8.8.8")
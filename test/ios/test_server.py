@@ -0,0 +1,54 @@
+"""End-to-end tests of the driver, against the stand-in SSH server."""
+import json
+import os
+from multiprocessing.pool import ThreadPool
+
+from napalm.base.test.getters import dict_diff
+from napalm.base.test.servers import SSHServer
+from napalm.ios import ios
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+
+
+def _expected_result(test, test_case="normal"):
+    with open(os.path.join(MOCKED_DATA, test, test_case, "expected_result.json")) as f:
+        return json.load(f)
+
+
+def _get_facts(server):
+    device = ios.IOSDriver(
+        "127.0.0.1", "admin", "admin", optional_args={"port": server.port}
+    )
+    device.open()
+    try:
+        return json.loads(json.dumps(device.get_facts()))
+    finally:
+        device.close()
+
+
+class TestServer(object):
+    def test_getter(self):
+        with SSHServer(
+            MOCKED_DATA, "test_get_facts", username="admin", password="admin"
+        ) as server:
+            result = _get_facts(server)
+
+        assert not dict_diff(result, _expected_result("test_get_facts"))
+        assert server.commands == [
+            "show version",
+            "show hosts",
+            "show ip interface brief",
+        ]
+
+    def test_concurrent_sessions(self):
+        with SSHServer(MOCKED_DATA, "test_get_facts", rate=100000) as server:
+            pool = ThreadPool(8)
+            try:
+                results = pool.map(lambda _: _get_facts(server), range(8))
+            finally:
+                pool.close()
+                pool.join()
+
+        expected = _expected_result("test_get_facts")
+        assert not any(dict_diff(result, expected) for result in results)
+        assert server.sessions == 8
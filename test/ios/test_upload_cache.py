@@ -0,0 +1,91 @@
+"""Tests for the uploads of the candidate config skipped by the upload cache."""
+import hashlib
+import os
+
+import mock
+import pytest
+
+from napalm.base.netmiko_helpers import config_transfer
+
+CONFIG = "hostname router1\nntp server 192.0.2.1\n"
+
+
+class FakeTransfer(object):
+    uploads = []
+
+    def __init__(self, ssh_conn, source_config, dest_file, file_system, direction):
+        self.source_md5 = hashlib.md5(source_config.encode("utf-8")).hexdigest()
+        self.dest_file = dest_file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def check_file_exists(self):
+        raise AssertionError("the file uploaded is known to be different")
+
+    def verify_space_available(self):
+        return True
+
+    def transfer_file(self):
+        self.uploads.append(self.dest_file)
+
+    def verify_file(self):
+        return True
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestUploadCache(object):
+    def test_skip_unchanged(self, tmpdir):
+        device = self.patched_driver(
+            "localhost",
+            "vagrant",
+            "vagrant",
+            optional_args={
+                "upload_cache": os.path.join(str(tmpdir), "cache.sqlite"),
+                "dest_file_system": "flash:",
+            },
+        )
+        device.open()
+        FakeTransfer.uploads = []
+        with mock.patch(
+            "napalm.ios.ios.config_transfer", FakeTransfer
+        ), mock.patch.object(
+            device.device,
+            "send_command_expect",
+            return_value="ip scp server enable",
+            create=True,
+        ), mock.patch.object(
+            device.device, "send_config_set", create=True
+        ):
+            device.load_replace_candidate(config=CONFIG)
+            device.load_replace_candidate(config=CONFIG)
+            device.load_merge_candidate(config=CONFIG)
+            assert FakeTransfer.uploads == ["candidate_config.txt", "merge_config.txt"]
+
+            device.load_replace_candidate(config=CONFIG + "end\n")
+            device.load_replace_candidate(config=CONFIG)
+            assert FakeTransfer.uploads[2:] == ["candidate_config.txt"] * 2
+
+            # the files are overwritten by discard_config
+            device.discard_config()
+            device.load_replace_candidate(config=CONFIG)
+            assert FakeTransfer.uploads[4:] == ["candidate_config.txt"]
+
+
+class TestConfigTransfer(object):
+    def test_streamed(self):
+        ssh_conn = mock.Mock(device_type="cisco_ios")
+        transfer = config_transfer(ssh_conn, CONFIG, "candidate_config.txt", "flash:")
+        transfer.scp_conn = mock.Mock()
+
+        transfer.transfer_file()
+
+        assert transfer.source_md5 == hashlib.md5(CONFIG.encode("utf-8")).hexdigest()
+        assert transfer.file_size == len(CONFIG)
+        fileobj, destination = transfer.scp_conn.scp_client.putfo.call_args[0]
+        assert destination == "flash:/candidate_config.txt"
+        assert fileobj.getvalue() == CONFIG.encode("utf-8")
+        transfer.scp_conn.close.assert_called_once_with()
@@ -0,0 +1,64 @@
+"""Tests for the bulk and per-VRF modes of get_bgp_neighbors."""
+import json
+
+import mock
+import pytest
+
+
+def _use_mocked_data(device, test, test_case="normal"):
+    device.current_test = test
+    device.current_test_case = test_case
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestBgpNeighbors(object):
+    def _get_bgp_neighbors(self):
+        with mock.patch.object(
+            self.device.device, "make_rpc_call", wraps=self.device.device.make_rpc_call
+        ) as make_rpc_call:
+            result = self.device.get_bgp_neighbors()
+        return json.loads(json.dumps(result)), make_rpc_call.call_count
+
+    def test_all_vrfs_in_one_request(self):
+        _use_mocked_data(self.device.device, "test_get_bgp_neighbors")
+        expected = self.device.device.expected_result
+
+        result, rpc_calls = self._get_bgp_neighbors()
+
+        assert result == expected
+        # the VRF list, then the operational data of all the VRFs
+        assert rpc_calls == 2
+
+    def test_one_request_per_vrf_above_max_neighbors(self):
+        _use_mocked_data(self.device.device, "test_get_bgp_neighbors")
+        expected = self.device.device.expected_result
+
+        with mock.patch.object(self.device, "bgp_bulk_max_neighbors", 0):
+            result, rpc_calls = self._get_bgp_neighbors()
+
+        assert result == expected
+        # the VRF list, then the global table, test and test2
+        assert rpc_calls == 4
+
+    def test_configured_vrf_missing_from_bulk_reply(self):
+        _use_mocked_data(self.device.device, "test_get_bgp_neighbors")
+        expected = self.device.device.expected_result
+        make_rpc_call = self.device.device.make_rpc_call
+
+        def _make_rpc_call(rpc_command):
+            reply = make_rpc_call(rpc_command)
+            if "ConfigInstanceVRFTable" in rpc_command:
+                # a VRF configured but without operational data
+                reply = reply.replace(
+                    b"</ConfigInstanceVRFTable>",
+                    b"<ConfigVRF><Naming><VRFName>missing</VRFName></Naming></ConfigVRF>"
+                    b"</ConfigInstanceVRFTable>",
+                )
+            return reply
+
+        with mock.patch.object(self.device.device, "make_rpc_call", _make_rpc_call):
+            result = self.device.get_bgp_neighbors()
+
+        # as with one request per VRF
+        assert result.pop("missing") == {"router_id": "", "peers": {}}
+        assert json.loads(json.dumps(result)) == expected
@@ -0,0 +1,45 @@
+"""Tests for iter_routes."""
+import json
+
+import mock
+import pytest
+
+
+def _use_mocked_data(device, test, test_case="normal"):
+    device.current_test = test
+    device.current_test_case = test_case
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestIterRoutes(object):
+    def _iter_routes(self, *args):
+        with mock.patch.object(
+            self.device.device, "make_rpc_call", wraps=self.device.device.make_rpc_call
+        ) as make_rpc_call:
+            result = list(self.device.iter_routes(*args))
+        rpc_calls = [call[0][0] for call in make_rpc_call.call_args_list]
+        return json.loads(json.dumps(result)), rpc_calls
+
+    def test_destination(self):
+        _use_mocked_data(self.device.device, "test_get_route_to", "SR638170159")
+        expected = self.device.device.expected_result
+
+        result, rpc_calls = self._iter_routes("1.0.4.0/24", "bgp")
+
+        assert result == [
+            [prefix, route] for prefix, routes in expected.items() for route in routes
+        ]
+        assert len(rpc_calls) == 1
+
+    def test_full_table(self):
+        _use_mocked_data(self.device.device, "test_get_route_to", "SR638170159")
+        expected = self.device.device.expected_result
+
+        result, rpc_calls = self._iter_routes()
+
+        assert result == [
+            [prefix, route] for prefix, routes in expected.items() for route in routes
+        ]
+        # the IPv4 and the IPv6 RIB, without filtering the routes
+        assert len(rpc_calls) == 2
+        assert all("<RouteTable></RouteTable>" in rpc_call for rpc_call in rpc_calls)
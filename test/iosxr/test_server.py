@@ -0,0 +1,28 @@
+"""End-to-end tests of the driver, against the stand-in SSH server."""
+import json
+import os
+
+from napalm.base.test.getters import dict_diff
+from napalm.base.test.servers import SSHServer
+from napalm.iosxr import iosxr
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+
+
+def _expected_result(test, test_case="normal"):
+    with open(os.path.join(MOCKED_DATA, test, test_case, "expected_result.json")) as f:
+        return json.load(f)
+
+
+class TestServer(object):
+    def test_xml_agent(self):
+        with SSHServer(MOCKED_DATA, "test_get_facts", platform="iosxr") as server:
+            device = iosxr.IOSXRDriver(
+                "127.0.0.1", "admin", "admin", optional_args={"port": server.port}
+            )
+            device.open()
+            result = json.loads(json.dumps(device.get_facts()))
+            device.close()
+
+        assert not dict_diff(result, _expected_result("test_get_facts"))
+        assert len(server.commands) == 2
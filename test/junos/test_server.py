@@ -0,0 +1,30 @@
+"""Tests of the NETCONF subsystem of the stand-in SSH server."""
+import os
+
+from ncclient import manager
+
+from napalm.base.test.servers import SSHServer
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+
+
+class TestServer(object):
+    def test_netconf(self):
+        with SSHServer(
+            MOCKED_DATA, "test_get_facts", platform="junos", latency=0.01
+        ) as server:
+            session = manager.connect(
+                host="127.0.0.1",
+                port=server.port,
+                username="admin",
+                password="admin",
+                hostkey_verify=False,
+                allow_agent=False,
+                look_for_keys=False,
+                device_params={"name": "junos"},
+            )
+            reply = session.rpc("<get-interface-information/>")
+            session.close_session()
+
+        assert reply.xpath("//physical-interface/name")[0].text == "ge-0/0/0"
+        assert server.commands == ["get-interface-information"]
@@ -0,0 +1,85 @@
+"""Tests for the merge candidate applied in chunks."""
+import mock
+import pytest
+
+from napalm.base.exceptions import MergeConfigException
+
+CANDIDATE = """
+feature bgp
+router bgp 65000
+  vrf blue
+    neighbor 192.0.2.1
+      remote-as 65001
+  neighbor 192.0.2.2
+    remote-as 65002
+ntp server 192.0.2.10
+"""
+
+CHUNKS = [
+    ["feature bgp", "router bgp 65000", "vrf blue"],
+    # the sections of the first command are entered again
+    [
+        "router bgp 65000",
+        "vrf blue",
+        "neighbor 192.0.2.1",
+        "remote-as 65001",
+        "neighbor 192.0.2.2",
+    ],
+    [
+        "router bgp 65000",
+        "neighbor 192.0.2.2",
+        "remote-as 65002",
+        "ntp server 192.0.2.10",
+    ],
+]
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestCommitMerge(object):
+    def _commit_merge(self, outputs, candidate=CANDIDATE):
+        self.device.merge_candidate = candidate
+        self.device.merge_chunk_size = 3
+        send_config = mock.Mock(side_effect=outputs)
+        rollback = mock.Mock()
+        try:
+            with mock.patch.object(
+                self.device, "_send_config", send_config
+            ), mock.patch.object(self.device, "rollback", rollback):
+                self.device._commit_merge()
+        finally:
+            self.device.merge_candidate = ""
+            self.device.merge_chunk_size = None
+            self.chunks = [c[0][0] for c in send_config.call_args_list]
+            self.rollback = rollback
+
+    def test_chunks(self):
+        self._commit_merge(["", "", ""])
+
+        assert self.chunks == CHUNKS
+        assert not self.rollback.called
+
+    def test_abort(self):
+        with pytest.raises(MergeConfigException):
+            self._commit_merge(["", "% Invalid command at '^' marker.", ""])
+
+        # the chunks following the error are not sent
+        assert self.chunks == CHUNKS[:2]
+        self.rollback.assert_called_once_with()
+
+    def test_flat_candidate_not_split(self):
+        # the description would be sent outside of its interface in another chunk
+        self._commit_merge(
+            [""],
+            candidate="interface Ethernet1\ndescription uplink\nno shutdown\n"
+            "interface Ethernet2\ndescription downlink\n",
+        )
+
+        assert self.chunks == [
+            [
+                "interface Ethernet1",
+                "description uplink",
+                "no shutdown",
+                "interface Ethernet2",
+                "description downlink",
+            ]
+        ]
@@ -0,0 +1,17 @@
+"""Tests for the sections of get_config."""
+import mock
+import pytest
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestGetConfigSection(object):
+    def test_section_filtered_by_device(self):
+        with mock.patch.object(
+            self.device, "_send_command", return_value="feature bgp\n"
+        ) as send_command:
+            result = self.device.get_config(retrieve="running", section="^feature")
+
+        send_command.assert_called_once_with(
+            "show running-config | section ^feature", raw_text=True
+        )
+        assert result == {"startup": "", "running": "feature bgp\n", "candidate": ""}
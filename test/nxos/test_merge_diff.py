@@ -0,0 +1,42 @@
+"""Tests for the merge diff of compare_config."""
+import mock
+import pytest
+
+
+def _use_mocked_data(device, test, test_case="normal"):
+    device.current_test = test
+    device.current_test_case = test_case
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestMergeDiff(object):
+    def test_merge_diff(self):
+        _use_mocked_data(self.device.device, "test_get_config")
+        self.device._running_config_tree = None
+        self.device.load_merge_candidate(
+            config="hostname nxos-spine1\nfeature bgp\nvdc nxos-spine1 id 1\n"
+            "  allocate interface Ethernet2/1-48\n  allocate interface Ethernet5/1-48\n"
+        )
+
+        with mock.patch.object(
+            self.device, "get_config", wraps=self.device.get_config
+        ) as get_config:
+            diff = self.device.compare_config()
+            assert self.device.compare_config() == diff
+            # the running config is retrieved once
+            assert get_config.call_count == 1
+
+            with mock.patch.object(
+                self.device, "_save_to_checkpoint"
+            ), mock.patch.object(self.device, "_commit_merge"), mock.patch.object(
+                self.device, "_copy_run_start"
+            ):
+                self.device.commit_config()
+            self.device.load_merge_candidate(config="feature bgp\n")
+            self.device.compare_config()
+            assert get_config.call_count == 2
+
+        assert diff == (
+            "feature bgp\nvdc nxos-spine1 id 1\n  allocate interface Ethernet5/1-48"
+        )
+        self.device.discard_config()
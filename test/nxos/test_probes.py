@@ -0,0 +1,38 @@
+"""Tests for the ping_many method."""
+import threading
+
+import mock
+import pytest
+
+from test.nxos_ssh.test_probes import PING_OUTPUT, UNREACHABLE
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestProbes(object):
+    def test_ping_many_parallel_requests(self):
+        threads = set()
+
+        def show(command, raw_text=False):
+            threads.add(threading.current_thread().name)
+            destination = command.split()[1]
+            if destination.startswith("192.0.2."):
+                return UNREACHABLE.format(destination)
+            return PING_OUTPUT.format(destination)
+
+        with mock.patch.object(self.device.device, "show", side_effect=show) as fake:
+            result = self.device.ping_many(
+                ["8.8.8.8", "192.0.2.1", "8.8.4.4"], workers=2
+            )
+
+        assert sorted(c[0][0] for c in fake.call_args_list) == [
+            "ping 192.0.2.1 timeout 2 packet-size 100 count 5",
+            "ping 8.8.4.4 timeout 2 packet-size 100 count 5",
+            "ping 8.8.8.8 timeout 2 packet-size 100 count 5",
+        ]
+        assert all(c[1] == {"raw_text": True} for c in fake.call_args_list)
+        # sent from the worker threads
+        assert threading.current_thread().name not in threads
+        for destination in ("8.8.8.8", "8.8.4.4"):
+            results = result[destination]["success"]["results"]
+            assert {probe["ip_address"] for probe in results} == {destination}
+        assert result["192.0.2.1"]["success"]["packet_loss"] == 5
@@ -0,0 +1,37 @@
+"""End-to-end tests of the driver, against the stand-in NX-API server."""
+import json
+import os
+
+from napalm.base.test.getters import dict_diff
+from napalm.base.test.servers import NXOSServer
+from napalm.nxos import nxos
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+
+
+def _expected_result(test, test_case="normal"):
+    with open(os.path.join(MOCKED_DATA, test, test_case, "expected_result.json")) as f:
+        return json.load(f)
+
+
+class TestServer(object):
+    def test_getters(self):
+        with NXOSServer(MOCKED_DATA, "test_get_facts") as server:
+            device = nxos.NXOSDriver(
+                "127.0.0.1",
+                "admin",
+                "admin",
+                optional_args={"transport": "http", "port": server.port},
+            )
+            device.open()
+            facts = device.get_facts()
+            server.use("test_get_lldp_neighbors")
+            neighbors = device.get_lldp_neighbors()
+            device.close()
+
+        assert not dict_diff(
+            json.loads(json.dumps(facts)), _expected_result("test_get_facts")
+        )
+        assert json.loads(json.dumps(neighbors)) == _expected_result(
+            "test_get_lldp_neighbors"
+        )
@@ -0,0 +1,40 @@
+"""Tests for the uploads of the candidate config skipped by the upload cache."""
+import os
+
+import mock
+import pytest
+
+from napalm.base.cache import UploadCache
+
+CONFIG = "hostname nxos-spine1\nfeature bgp\n"
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestUploadCache(object):
+    def test_skip_unchanged(self, tmpdir):
+        self.device.upload_cache = UploadCache(os.path.join(str(tmpdir), "c.sqlite"))
+        self.device._netmiko_device = mock.Mock()
+        transfers = []
+
+        def config_transfer(ssh_conn, source_config, dest_file, file_system):
+            transfer = mock.MagicMock(source_md5=source_config)
+            transfer.__enter__.return_value = transfer
+            transfers.append(transfer)
+            return transfer
+
+        with mock.patch(
+            "napalm.nxos.nxos.config_transfer", config_transfer
+        ), mock.patch.object(self.device, "_send_command_list"):
+            self.device.load_replace_candidate(config=CONFIG)
+            self.device.load_replace_candidate(config=CONFIG)
+            assert transfers[0].transfer_file.call_count == 1
+            assert transfers[1].__enter__.call_count == 0
+            # the remote MD5 is not checked before the upload
+            assert transfers[0].check_file_exists.call_count == 0
+
+            # the candidate file is deleted by discard_config
+            self.device.discard_config()
+            self.device.load_replace_candidate(config=CONFIG)
+            assert transfers[2].transfer_file.call_count == 1
+        self.device.upload_cache = None
+        self.device._netmiko_device = None
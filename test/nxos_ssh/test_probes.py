@@ -0,0 +1,87 @@
+"""Tests for the ping_many method."""
+import mock
+import pytest
+
+PING_OUTPUT = """PING {0} ({0}): 100 data bytes
+108 bytes from {0}: icmp_seq=0 ttl=57 time=18.411 ms
+108 bytes from {0}: icmp_seq=1 ttl=57 time=18.189 ms
+108 bytes from {0}: icmp_seq=2 ttl=57 time=18.13 ms
+108 bytes from {0}: icmp_seq=3 ttl=57 time=18.16 ms
+108 bytes from {0}: icmp_seq=4 ttl=57 time=18.104 ms
+
+--- {0} ping statistics ---
+5 packets transmitted, 5 packets received, 0.00% packet loss
+round-trip min/avg/max = 18.104/18.198/18.411 ms
+"""
+
+UNREACHABLE = """PING {0} ({0}): 100 data bytes
+Request 0 timed out
+Request 1 timed out
+Request 2 timed out
+Request 3 timed out
+Request 4 timed out
+
+--- {0} ping statistics ---
+5 packets transmitted, 0 packets received, 100.00% packet loss
+"""
+
+
+class _PingSession(object):
+    """Netmiko session answering a different ping output for each destination."""
+
+    def __init__(self):
+        self.commands = []
+        self.disconnected = False
+
+    def send_command(self, command, **kwargs):
+        self.commands.append(command)
+        destination = command.split()[1]
+        if destination.startswith("192.0.2."):
+            return UNREACHABLE.format(destination)
+        return PING_OUTPUT.format(destination)
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+@pytest.mark.usefixtures("set_device_parameters")
+class TestProbes(object):
+    def test_ping_many_parallel_sessions(self):
+        main_session, extra_session = _PingSession(), _PingSession()
+        self.device._netmiko_device_type = "cisco_nxos"
+        self.device._netmiko_optional_args = {}
+
+        with mock.patch.object(self.device, "device", main_session), mock.patch.object(
+            self.device, "_netmiko_connect", return_value=extra_session
+        ) as connect:
+            result = self.device.ping_many(
+                ["8.8.8.8", "192.0.2.1", "8.8.4.4", "192.0.2.2"], workers=3
+            )
+
+        # the current session and 2 additional ones, disconnected afterwards
+        assert connect.call_count == 2
+        assert extra_session.disconnected and not main_session.disconnected
+        assert len(main_session.commands + extra_session.commands) == 4
+        for destination in ("8.8.8.8", "8.8.4.4"):
+            success = result[destination]["success"]
+            assert success["packet_loss"] == 0
+            assert {probe["ip_address"] for probe in success["results"]} == {
+                destination
+            }
+        for destination in ("192.0.2.1", "192.0.2.2"):
+            assert result[destination]["success"]["packet_loss"] == 5
+
+    def test_ping_many_single_session(self):
+        session = _PingSession()
+        with mock.patch.object(self.device, "device", session), mock.patch.object(
+            self.device, "_netmiko_connect"
+        ) as connect:
+            result = self.device.ping_many(["8.8.8.8", "192.0.2.1"], workers=1)
+
+        assert not connect.called
+        assert session.commands == [
+            "ping 8.8.8.8 timeout 2 packet-size 100 count 5",
+            "ping 192.0.2.1 timeout 2 packet-size 100 count 5",
+        ]
+        assert result["8.8.8.8"]["success"]["packet_loss"] == 0
+        assert result["192.0.2.1"]["success"]["packet_loss"] == 5